@@ -6,7 +6,7 @@ import base64
 from security import *
 from pathlib import Path
 from jira_connector import *
-from utils import send_email_with_attachment
+from utils import send_email_with_attachment, start_project_warmup
 from security import get_global_smtp_configs
 from datetime import datetime
 import time
@@ -141,6 +141,9 @@ else:
                                                     st.session_state.active_connection = conn_details
                                                     st.session_state.jira_client = client
                                                     st.session_state.projects = projects
+                                                    # Começa já a buscar os projetos recentes, enquanto o utilizador navega
+                                                    recent_keys = [key for key in get_recent_projects(user) if key in projects.values()]
+                                                    start_project_warmup(client, user, recent_keys[:PROJECT_WARMUP_LIMIT])
                                                     st.success("Login bem-sucedido! A carregar...")
                                                     time.sleep(1)
                                                     st.switch_page("pages/2_🏠_Meu_Dashboard.py")
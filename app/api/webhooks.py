@@ -0,0 +1,59 @@
+import hashlib
+import hmac
+import os
+from typing import Annotated
+
+from fastapi import APIRouter, Header, HTTPException, Request, status
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from app.models.schemas import JiraWebhookEvent, WebhookResult
+from issue_webhooks import WebhookEventError, apply_issue_event
+
+router = APIRouter(prefix="/api/webhooks", tags=["webhooks"])
+
+# Segredo configurado no webhook do Jira (Configurações do sistema > WebHooks)
+WEBHOOK_SECRET_ENV = "GAUGE_JIRA_WEBHOOK_SECRET"
+
+
+def verify_signature(body: bytes, signature: str | None, secret: str) -> bool:
+    """Valida o cabeçalho X-Hub-Signature ("sha256=<hmac hex>") enviado pelo Jira."""
+    if not signature or "=" not in signature:
+        return False
+    algorithm, received = signature.split("=", 1)
+    if algorithm != "sha256":
+        return False
+    expected = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, received.strip())
+
+
+@router.post("/jira", response_model=WebhookResult)
+async def receive_jira_issue_event(
+    request: Request,
+    x_hub_signature: Annotated[str | None, Header()] = None,
+    server_url: str | None = None,
+) -> WebhookResult:
+    """Recebe eventos de issue criada/atualizada/apagada e aplica-os ao repositório local de issues.
+
+    `server_url` (opcional) indica o endereço do Jira usado pela aplicação, se for
+    diferente do que aparece no 'self' das issues.
+    """
+    secret = os.environ.get(WEBHOOK_SECRET_ENV)
+    if not secret:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Webhook do Jira não configurado.")
+
+    body = await request.body()
+    if not verify_signature(body, x_hub_signature, secret):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Assinatura do webhook inválida.")
+
+    try:
+        event = JiraWebhookEvent.model_validate_json(body)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+
+    try:
+        # O repositório é SQLite (bloqueante): corre fora do event loop
+        summary = await run_in_threadpool(apply_issue_event, event.model_dump(), None, server_url)
+    except WebhookEventError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return WebhookResult(**summary)
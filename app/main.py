@@ -0,0 +1,7 @@
+from fastapi import FastAPI
+
+from app.api.webhooks import router as webhooks_router
+
+# Executar com: uvicorn app.main:app
+app = FastAPI(title="Gauge Metrics API")
+app.include_router(webhooks_router)
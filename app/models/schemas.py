@@ -94,3 +94,23 @@ class DashboardChartSaveRequest(BaseModel):
 
 class JqlCountRequest(BaseModel):
     jql: str
+
+
+class JiraWebhookEvent(BaseModel):
+    """Evento de issue enviado pelos webhooks do Jira (os restantes atributos são mantidos)."""
+
+    model_config = {"extra": "allow"}
+
+    webhookEvent: Literal["jira:issue_created", "jira:issue_updated", "jira:issue_deleted"]
+    timestamp: int | None = None
+    issue: dict[str, Any]
+    changelog: dict[str, Any] | None = None
+    user: dict[str, Any] | None = None
+
+
+class WebhookResult(BaseModel):
+    event: str
+    issue: str
+    project: str
+    updated: list[str] = []
+    skipped: list[str] = []
@@ -21,6 +21,58 @@ APP_VERSION = "1.5.0"
 SESSION_TIMEOUT_MINUTES = 60
 DASHBOARD_CHART_LIMIT = 20
 
+# --- Busca de Issues no Jira ---
+# Tamanho de página pedido ao endpoint /search (o Jira Cloud limita a 100).
+JIRA_SEARCH_PAGE_SIZE = 100
+# Número máximo de páginas buscadas em simultâneo por consulta.
+JIRA_FETCH_MAX_WORKERS = 4
+# Intervalo entre reconciliações de chaves (deteta issues apagadas/movidas) na sincronização incremental.
+JIRA_RECONCILE_INTERVAL_MINUTES = 60
+# Issues por pedido ao endpoint de changelog em lote (/changelog/bulkfetch aceita até 1000).
+JIRA_CHANGELOG_BATCH_SIZE = 200
+# Validade (segundos) das contagens de JQL dos indicadores, em cache por consulta.
+JIRA_JQL_COUNT_TTL_SECONDS = 60
+# Validade (segundos) da resolução quadro -> filtro -> JQL usada na busca de issues de um quadro.
+JIRA_BOARD_FILTER_TTL_SECONDS = 900
+# Tempo máximo (segundos) que um pedido espera por uma busca idêntica já em curso; esgotado, faz a sua própria busca.
+JIRA_IN_FLIGHT_WAIT_SECONDS = 300
+# Projetos recentes de cada utilizador guardados no perfil e, destes, quantos são sincronizados em segundo plano após o login.
+RECENT_PROJECTS_LIMIT = 5
+PROJECT_WARMUP_LIMIT = 3
+
+# --- Processamento de Issues ---
+# Projetos com pelo menos este número de issues são processados em paralelo, em blocos,
+# num pool de processos; abaixo disso o processamento é em série (evita o custo de arranque do pool).
+ISSUE_PROCESSING_PARALLEL_THRESHOLD = 5000
+ISSUE_PROCESSING_CHUNK_SIZE = 1000
+# Processos do pool (0 ou 1 desliga o modo paralelo; None usa todos os CPUs).
+ISSUE_PROCESSING_MAX_WORKERS = 4
+# Tempo máximo (segundos) à espera dos blocos processados no pool; esgotado, o processamento é refeito em série.
+ISSUE_PROCESSING_TIMEOUT_SECONDS = 300
+# Colunas de texto do DataFrame do projeto com até esta fração de valores distintos passam a 'category'.
+DATAFRAME_CATEGORY_MAX_UNIQUE_RATIO = 0.5
+# Percentil oferecido como agregação das medidas de Tempo em Status (ex.: 85 -> "Percentil 85").
+TIME_IN_STATUS_PERCENTILE = 85
+
+# --- Ligações HTTP ao Jira ---
+# Ligações keep-alive mantidas por servidor Jira (partilhadas por todas as chamadas REST).
+JIRA_HTTP_POOL_SIZE = 10
+# Timeouts (segundos) de estabelecimento de ligação e de leitura da resposta.
+JIRA_HTTP_CONNECT_TIMEOUT = 5
+JIRA_HTTP_READ_TIMEOUT = 30
+
+# Idade (segundos) a partir da qual os metadados (campos, status...) são atualizados em segundo plano.
+JIRA_METADATA_REFRESH_SECONDS = 3600
+
+# --- Limites de Taxa do Jira ---
+# Valores iniciais do token bucket por servidor; são ajustados pelos cabeçalhos X-RateLimit-* das respostas.
+JIRA_RATE_LIMIT_PER_SECOND = 10
+JIRA_RATE_LIMIT_BURST = 20
+# Novas tentativas após 429/503, com backoff exponencial (com jitter) limitado ao máximo indicado.
+JIRA_HTTP_MAX_RETRIES = 4
+JIRA_HTTP_BACKOFF_SECONDS = 1.0
+JIRA_HTTP_MAX_BACKOFF_SECONDS = 60
+
 # --- Constantes de Estado Padrão ---
 DEFAULT_INITIAL_STATES = ['Aberto', 'A Fazer', 'Backlog', 'To Do', 'Open']
 DEFAULT_DONE_STATES = ['Concluído', 'Fechado', 'Resolvido', 'Done', 'Closed', 'Resolved']
@@ -0,0 +1,325 @@
+# issue_records.py
+
+"""
+Acesso rápido às issues do Jira diretamente a partir do JSON da API REST.
+
+Construir `jira.Issue` converte recursivamente todo o JSON (campos, comentários
+e changelog) em objetos `Resource`, o que domina CPU e memória em projetos
+grandes. `RawIssue` é apenas uma vista sobre o dicionário original: os níveis
+aninhados só são embrulhados quando acedidos, e a navegação por atributos
+(`issue.fields.status.name`, `history.items`, `getattr(item, 'from')`)
+continua a funcionar no código existente.
+
+As funções de acesso (`get_field`, `get_histories`, `iter_status_changes`)
+leem o JSON de qualquer issue — `RawIssue` ou `jira.Issue` (via `.raw`) — sem
+navegar por atributos. `build_status_transitions` junta as mudanças de status
+de um conjunto de issues numa só tabela.
+
+`IssueRecord` é a forma compacta guardada em sessão: só os campos da issue,
+sem metadados da API, e o changelog substituído por uma referência às suas
+linhas na tabela de transições partilhada pelo conjunto de dados.
+"""
+
+import re
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+
+def _wrap_json(value):
+    if isinstance(value, dict):
+        return JsonView(value)
+    if isinstance(value, list):
+        return [_wrap_json(item) for item in value]
+    return value
+
+
+class JsonView:
+    """Vista de atributos, só de leitura, sobre um dicionário JSON (sem cópia)."""
+
+    __slots__ = ('_data',)
+
+    def __init__(self, data):
+        self._data = data
+
+    def __getattr__(self, name):
+        # Nomes especiais (pickle, copy...) e o próprio slot nunca vêm do JSON
+        if name.startswith('__') or name == '_data':
+            raise AttributeError(name)
+        try:
+            return _wrap_json(self._data[name])
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self._data!r})"
+
+
+class RawIssue(JsonView):
+    """Issue do Jira servida diretamente do JSON da API, compatível com `jira.Issue` para leitura."""
+
+    __slots__ = ()
+
+    @property
+    def raw(self):
+        return self._data
+
+    def __repr__(self):
+        return f"<RawIssue: key={self._data.get('key')!r}>"
+
+
+def wrap_raw_issues(raw_issues):
+    """Embrulha uma lista de dicionários de issues em `RawIssue` (custo constante por issue)."""
+    return [RawIssue(raw) for raw in raw_issues]
+
+
+_JIRA_OFFSET_PATTERN = re.compile(r'([+-])(\d{2}):?(\d{2})$')
+
+
+def jira_timestamp_timezone(timestamp):
+    """Fuso (offset fixo) de uma data do Jira ("...-0300"), ou None se não tiver offset."""
+    match = _JIRA_OFFSET_PATTERN.search(timestamp) if isinstance(timestamp, str) else None
+    if not match:
+        return timezone.utc if isinstance(timestamp, str) and timestamp.endswith('Z') else None
+    sign, hours, minutes = match.groups()
+    offset = timedelta(hours=int(hours), minutes=int(minutes))
+    return timezone(-offset if sign == '-' else offset)
+
+
+def format_epoch_millis(epoch_millis, tz=None):
+    """
+    Converte uma data em milissegundos (bulkfetch, webhooks) para o formato de data do /search.
+
+    `tz` é o fuso em que a data é escrita (por omissão UTC). Usa-se o do
+    utilizador da API (um `ZoneInfo`, com horário de verão) ou, sem ele, o da
+    issue (ver `jira_timestamp_timezone`), para que a hora local coincida com
+    a dos outros campos e dos históricos vindos do /search.
+    """
+    created_dt = datetime.fromtimestamp(epoch_millis / 1000, tz=tz or timezone.utc)
+    return created_dt.strftime('%Y-%m-%dT%H:%M:%S.') + f"{created_dt.microsecond // 1000:03d}" + created_dt.strftime('%z')
+
+
+def normalize_changelog_history(history, tz=None):
+    """Garante o 'created' de um histórico no formato do /search (o bulkfetch devolve-o em milissegundos), no fuso `tz`."""
+    created = history.get('created')
+    if isinstance(created, (int, float)):
+        return {**history, 'created': format_epoch_millis(created, tz)}
+    return history
+
+
+# --- Camada de Acesso (RawIssue ou jira.Issue) ---
+
+def get_fields(issue):
+    """Devolve o dicionário 'fields' bruto da issue."""
+    return issue.raw.get('fields') or {}
+
+
+def get_field(issue, field_id, *path, default=None):
+    """
+    Lê um campo (e, opcionalmente, um caminho dentro dele) do JSON da issue.
+
+    Ex.: `get_field(issue, 'status', 'id')` equivale a `issue.fields.status.id`,
+    devolvendo `default` quando algum nível não existe ou é nulo.
+    """
+    value = get_fields(issue).get(field_id)
+    for step in path:
+        if not isinstance(value, dict):
+            return default
+        value = value.get(step)
+    return default if value is None else value
+
+
+def get_histories(issue):
+    """Devolve a lista bruta de históricos do changelog (vazia se não foi pedido)."""
+    if isinstance(issue, IssueRecord):
+        return issue.histories
+    changelog = issue.raw.get('changelog') or {}
+    return changelog.get('histories') or []
+
+
+def iter_status_changes(issue):
+    """Itera `(created, item)` de cada mudança de status, pela ordem do changelog."""
+    for history in get_histories(issue):
+        for item in history.get('items') or []:
+            if item.get('field') == 'status':
+                yield history.get('created'), item
+
+
+# --- Tabela de Transições de Status ---
+
+TRANSITION_COLUMNS = ['issue_key', 'seq', 'timestamp', 'timestamp_utc', 'from_id', 'from_name', 'to_id', 'to_name']
+
+_TZ_SUFFIX_PATTERN = r'(?:Z|[+-]\d{2}:?\d{2})$'
+
+
+def parse_jira_timestamps(values, utc=False):
+    """
+    Converte, de uma só vez, datas do Jira ("2024-05-02T10:15:00.000-0300") em datas sem fuso.
+
+    Por omissão devolve a hora local do Jira (o mesmo que `pd.to_datetime(v).tz_localize(None)`);
+    com `utc=True`, devolve a hora em UTC-naive (o mesmo que `.astimezone(timezone.utc)`).
+    Valores vazios ou inválidos ficam `NaT`.
+    """
+    values = pd.Series(values, dtype=object)
+    if utc:
+        parsed = pd.to_datetime(values, utc=True, errors='coerce', format='ISO8601')
+        return parsed.dt.tz_localize(None)
+    wall_time = values.str.replace(_TZ_SUFFIX_PATTERN, '', regex=True)
+    return pd.to_datetime(wall_time, errors='coerce', format='ISO8601')
+
+
+def build_status_transitions(issues):
+    """
+    Monta a tabela normalizada das mudanças de status de um conjunto de issues.
+
+    Uma linha por transição, pela ordem do changelog de cada issue (`seq`), com
+    as colunas de `TRANSITION_COLUMNS`: `timestamp` é a hora local do Jira e
+    `timestamp_utc` a hora em UTC-naive, ambas convertidas de uma só vez para
+    toda a tabela. Issues repetidas (mesma chave) só entram uma vez.
+
+    É construída uma vez por conjunto de dados e partilhada pelas métricas de
+    fluxo (ver `metrics_calculator`), que passam a ser agrupamentos sobre ela.
+    """
+    columns = {name: [] for name in ('issue_key', 'seq', 'created', 'from_id', 'from_name', 'to_id', 'to_name')}
+    seen_keys = set()
+    for issue in issues:
+        key = issue.key
+        if key in seen_keys:
+            continue
+        seen_keys.add(key)
+        for seq, (created, item) in enumerate(iter_status_changes(issue)):
+            columns['issue_key'].append(key)
+            columns['seq'].append(seq)
+            columns['created'].append(created)
+            columns['from_id'].append(item.get('from'))
+            columns['from_name'].append(item.get('fromString'))
+            columns['to_id'].append(item.get('to'))
+            columns['to_name'].append(item.get('toString'))
+
+    created = columns.pop('created')
+    table = pd.DataFrame(columns)
+    table['timestamp'] = parse_jira_timestamps(created).to_numpy()
+    table['timestamp_utc'] = parse_jira_timestamps(created, utc=True).to_numpy()
+    return table[TRANSITION_COLUMNS]
+
+
+# --- Registo Compacto de Issues ---
+
+# Metadados da API que nenhuma página lê (URLs, avatares, versões renderizadas...)
+_DROPPED_JSON_KEYS = frozenset({
+    'self', 'iconUrl', 'avatarUrls', 'expand', 'renderedBody', 'renderedFields',
+    'updateAuthor', 'jsdPublic', 'timeZone', 'accountType', 'hierarchyLevel', 'avatarId',
+})
+
+
+def _compact_json(value):
+    if isinstance(value, dict):
+        return {key: _compact_json(item) for key, item in value.items() if key not in _DROPPED_JSON_KEYS}
+    if isinstance(value, list):
+        return [_compact_json(item) for item in value]
+    return value
+
+
+def _format_jira_timestamp(wall_time, utc_time):
+    """Reconstrói a data no formato do /search ("2024-05-02T10:15:00.000-0300") a partir da hora local e UTC."""
+    if pd.isna(wall_time):
+        return None
+    offset_minutes = 0 if pd.isna(utc_time) else round((wall_time - utc_time).total_seconds() / 60)
+    sign = '-' if offset_minutes < 0 else '+'
+    hours, minutes = divmod(abs(offset_minutes), 60)
+    return wall_time.strftime('%Y-%m-%dT%H:%M:%S.') + f"{wall_time.microsecond // 1000:03d}{sign}{hours:02d}{minutes:02d}"
+
+
+def _none_if_missing(value):
+    return None if pd.isna(value) else value
+
+
+class IssueRecord(RawIssue):
+    """
+    Issue compacta: os campos da issue (sem metadados da API) e, em vez do
+    changelog, as linhas `[_start, _stop)` da tabela de transições partilhada.
+
+    Lê-se como `RawIssue` (`issue.fields.status.name`, `get_field`...);
+    `get_histories`/`iter_status_changes` devolvem só as mudanças de status,
+    reconstruídas da tabela, que é também usada diretamente pelas métricas.
+    """
+
+    __slots__ = ('_transitions', '_start', '_stop')
+
+    def __init__(self, data, transitions, start=0, stop=0):
+        super().__init__(data)
+        self._transitions = transitions
+        self._start = start
+        self._stop = stop
+
+    @property
+    def histories(self):
+        """Históricos (só mudanças de status) reconstruídos das linhas da issue na tabela partilhada."""
+        rows = self._transitions.iloc[self._start:self._stop]
+        return [
+            {
+                'created': _format_jira_timestamp(row.timestamp, row.timestamp_utc),
+                'items': [{
+                    'field': 'status', 'fieldtype': 'jira',
+                    'from': _none_if_missing(row.from_id), 'fromString': _none_if_missing(row.from_name),
+                    'to': _none_if_missing(row.to_id), 'toString': _none_if_missing(row.to_name),
+                }],
+            }
+            for row in rows.itertuples(index=False)
+        ]
+
+    @property
+    def changelog(self):
+        return JsonView({'histories': self.histories})
+
+    def __reduce__(self):
+        # Pickle compacto (cache do Streamlit): a tabela partilhada é serializada uma só vez
+        return (IssueRecord, (self._data, self._transitions, self._start, self._stop))
+
+    def __repr__(self):
+        return f"<IssueRecord: key={self._data.get('key')!r}>"
+
+
+def compact_issue_records(issues, transitions=None):
+    """
+    Converte issues (`RawIssue` ou `jira.Issue`) em `IssueRecord`, pela ordem dada.
+
+    A tabela de transições (`transitions`, ou construída aqui) fica partilhada
+    por todos os registos; o changelog e os metadados da API são descartados.
+    """
+    issues = list(issues)
+    if transitions is None:
+        transitions = build_status_transitions(issues)
+    keys = transitions['issue_key'].to_numpy()
+    # As linhas de cada issue são contíguas (ver `build_status_transitions`)
+    row_ranges, start = {}, 0
+    for stop in range(1, len(keys) + 1):
+        if stop == len(keys) or keys[stop] != keys[start]:
+            row_ranges[keys[start]] = (start, stop)
+            start = stop
+
+    records = []
+    for issue in issues:
+        raw = issue.raw
+        data = {'id': raw.get('id'), 'key': raw.get('key'), 'fields': _compact_json(raw.get('fields') or {})}
+        records.append(IssueRecord(data, transitions, *row_ranges.get(data['key'], (0, 0))))
+    return records
+
+
+def get_dataset_transitions(issues):
+    """Tabela de transições partilhada pelos `IssueRecord` dados, ou None se não vierem todos do mesmo conjunto."""
+    table = None
+    for issue in issues:
+        if not isinstance(issue, IssueRecord) or (table is not None and issue._transitions is not table):
+            return None
+        table = issue._transitions
+    return table
+
+
+def shared_status_transitions(issues):
+    """
+    Tabela de transições das issues: a partilhada pelos `IssueRecord`, se vierem
+    todos do mesmo conjunto de dados (pode incluir outras issues), ou uma nova.
+    """
+    table = get_dataset_transitions(issues)
+    return table if table is not None else build_status_transitions(issues)
@@ -0,0 +1,214 @@
+# issue_store.py
+
+"""
+Armazenamento local e persistente das issues brutas do Jira (JSON + changelog).
+
+Sobrevive a reinícios do Streamlit: depois de um deploy, a sincronização
+incremental do `jira_connector` volta a partir do disco e só pede ao Jira as
+alterações. Cada conjunto de dados é identificado pelo URL da conexão, pela
+chave do projeto e por uma "variante" (filtro JQL + campos pedidos).
+
+Este módulo não depende do Streamlit, para poder ser usado também pela API.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+# Pode ser alterado com a variável de ambiente GAUGE_ISSUE_STORE_PATH
+DEFAULT_ISSUE_STORE_PATH = os.environ.get("GAUGE_ISSUE_STORE_PATH", ".cache/issue_store.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS issues (
+    server_url TEXT NOT NULL,
+    project_key TEXT NOT NULL,
+    variant TEXT NOT NULL,
+    issue_key TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    updated TEXT,
+    raw BLOB NOT NULL,
+    PRIMARY KEY (server_url, project_key, variant, issue_key)
+);
+CREATE TABLE IF NOT EXISTS datasets (
+    server_url TEXT NOT NULL,
+    project_key TEXT NOT NULL,
+    variant TEXT NOT NULL,
+    watermark TEXT,
+    last_reconciled_at TEXT,
+    revision INTEGER NOT NULL DEFAULT 0,
+    spec TEXT,
+    PRIMARY KEY (server_url, project_key, variant)
+);
+"""
+
+
+def _encode_raw(raw):
+    return zlib.compress(json.dumps(raw, separators=(',', ':')).encode('utf-8'))
+
+
+def _decode_raw(blob):
+    return json.loads(zlib.decompress(blob).decode('utf-8'))
+
+
+class IssueStore:
+    """Repositório SQLite das issues brutas, indexado por (conexão, projeto, variante, chave)."""
+
+    def __init__(self, path=DEFAULT_ISSUE_STORE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._write_lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            # Repositórios criados antes da coluna 'spec' (definição do conjunto: filtro, campos, expand)
+            if 'spec' not in [row[1] for row in conn.execute("PRAGMA table_info(datasets)")]:
+                conn.execute("ALTER TABLE datasets ADD COLUMN spec TEXT")
+
+    @contextmanager
+    def _connect(self):
+        # Uma ligação por operação: o sqlite3 não partilha ligações entre threads
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn: # Commit (ou rollback) no fim do bloco
+                yield conn
+        finally:
+            conn.close()
+
+    def get_dataset(self, server_url, project_key, variant):
+        """Devolve os metadados de sincronização (marca d'água, revisão...) ou None."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT watermark, last_reconciled_at, revision FROM datasets "
+                "WHERE server_url = ? AND project_key = ? AND variant = ?",
+                (server_url, project_key, variant)
+            ).fetchone()
+        if not row:
+            return None
+        watermark, last_reconciled_at, revision = row
+        return {
+            'watermark': watermark,
+            'last_reconciled_at': datetime.fromisoformat(last_reconciled_at) if last_reconciled_at else None,
+            'revision': revision,
+        }
+
+    def list_datasets(self, server_url, project_key):
+        """Lista os conjuntos de dados guardados de um projeto, com a respetiva definição (`spec`)."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT variant, spec, watermark, last_reconciled_at, revision FROM datasets "
+                "WHERE server_url = ? AND project_key = ?",
+                (server_url, project_key)
+            ).fetchall()
+        return [
+            {
+                'variant': variant,
+                'spec': json.loads(spec) if spec else None,
+                'watermark': watermark,
+                'last_reconciled_at': datetime.fromisoformat(last_reconciled_at) if last_reconciled_at else None,
+                'revision': revision,
+            }
+            for variant, spec, watermark, last_reconciled_at, revision in rows
+        ]
+
+    def get_project_revision(self, server_url, project_key):
+        """Soma das revisões dos conjuntos de um projeto: muda sempre que algum deles muda."""
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT COALESCE(SUM(revision), 0) FROM datasets WHERE server_url = ? AND project_key = ?",
+                (server_url, project_key)
+            ).fetchone()[0]
+
+    def load_issue(self, server_url, project_key, variant, issue_key):
+        """Lê uma única issue guardada (ou None)."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT raw FROM issues WHERE server_url = ? AND project_key = ? AND variant = ? AND issue_key = ?",
+                (server_url, project_key, variant, issue_key)
+            ).fetchone()
+        return _decode_raw(row[0]) if row else None
+
+    def load_issues(self, server_url, project_key, variant):
+        """Lê as issues guardadas, pela ordem original, num dicionário {chave: json}."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT issue_key, raw FROM issues WHERE server_url = ? AND project_key = ? AND variant = ? "
+                "ORDER BY position",
+                (server_url, project_key, variant)
+            ).fetchall()
+        return {issue_key: _decode_raw(blob) for issue_key, blob in rows}
+
+    def replace_issues(self, server_url, project_key, variant, raw_issues, watermark, last_reconciled_at, spec=None):
+        """Substitui todo o conjunto (busca completa). Devolve a nova revisão."""
+        rows = [
+            (server_url, project_key, variant, raw['key'], position, raw.get('fields', {}).get('updated'), _encode_raw(raw))
+            for position, raw in enumerate(raw_issues)
+        ]
+        with self._write_lock, self._connect() as conn:
+            conn.execute(
+                "DELETE FROM issues WHERE server_url = ? AND project_key = ? AND variant = ?",
+                (server_url, project_key, variant)
+            )
+            conn.executemany("INSERT INTO issues VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            return self._bump_dataset(conn, server_url, project_key, variant, watermark, last_reconciled_at, changed=True, spec=spec)
+
+    def apply_changes(self, server_url, project_key, variant, changed_issues, deleted_keys, watermark, last_reconciled_at, spec=None):
+        """
+        Funde issues alteradas/novas e remove as apagadas (sincronização incremental).
+
+        As issues novas ficam antes das existentes; as alteradas mantêm a posição.
+        A revisão só avança quando algum dado muda. Devolve a revisão atual.
+        """
+        with self._write_lock, self._connect() as conn:
+            dataset_filter = (server_url, project_key, variant)
+            known_positions = dict(conn.execute(
+                "SELECT issue_key, position FROM issues WHERE server_url = ? AND project_key = ? AND variant = ?",
+                dataset_filter
+            ).fetchall())
+            new_issues = [raw for raw in changed_issues if raw['key'] not in known_positions]
+            first_position = min(known_positions.values(), default=0) - len(new_issues)
+
+            rows = []
+            for offset, raw in enumerate(new_issues):
+                rows.append((*dataset_filter, raw['key'], first_position + offset, raw.get('fields', {}).get('updated'), _encode_raw(raw)))
+            for raw in changed_issues:
+                if raw['key'] in known_positions:
+                    rows.append((*dataset_filter, raw['key'], known_positions[raw['key']], raw.get('fields', {}).get('updated'), _encode_raw(raw)))
+            conn.executemany("INSERT OR REPLACE INTO issues VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+            deleted_keys = [key for key in deleted_keys if key in known_positions]
+            conn.executemany(
+                "DELETE FROM issues WHERE server_url = ? AND project_key = ? AND variant = ? AND issue_key = ?",
+                [(*dataset_filter, key) for key in deleted_keys]
+            )
+            return self._bump_dataset(
+                conn, server_url, project_key, variant, watermark, last_reconciled_at,
+                changed=bool(rows or deleted_keys), spec=spec
+            )
+
+    def _bump_dataset(self, conn, server_url, project_key, variant, watermark, last_reconciled_at, changed, spec=None):
+        conn.execute(
+            "INSERT INTO datasets (server_url, project_key, variant, watermark, last_reconciled_at, revision, spec) "
+            "VALUES (?, ?, ?, ?, ?, 1, ?) "
+            "ON CONFLICT (server_url, project_key, variant) DO UPDATE SET "
+            "watermark = excluded.watermark, last_reconciled_at = excluded.last_reconciled_at, "
+            "revision = revision + ?, spec = COALESCE(excluded.spec, spec)",
+            (server_url, project_key, variant, watermark,
+             last_reconciled_at.isoformat() if last_reconciled_at else None,
+             json.dumps(spec) if spec is not None else None, 1 if changed else 0)
+        )
+        return conn.execute(
+            "SELECT revision FROM datasets WHERE server_url = ? AND project_key = ? AND variant = ?",
+            (server_url, project_key, variant)
+        ).fetchone()[0]
+
+
+@lru_cache(maxsize=4)
+def get_issue_store(path=DEFAULT_ISSUE_STORE_PATH):
+    """Devolve a instância partilhada do repositório para o caminho indicado."""
+    return IssueStore(path)
@@ -0,0 +1,156 @@
+# issue_webhooks.py
+
+"""
+Aplicação dos webhooks de issues do Jira (criada, atualizada, apagada) ao
+repositório local de issues (`issue_store`), sem recarregar o projeto.
+
+Cada evento atualiza, no sítio, todos os conjuntos de dados guardados do
+projeto, respeitando a definição de cada um (campos pedidos e changelog):
+
+- issue criada/atualizada: os campos do conjunto são copiados do evento e,
+  nos conjuntos com changelog, o histórico do evento junta-se ao guardado;
+  eventos mais antigos do que a versão guardada são ignorados;
+- issue apagada: é removida de todos os conjuntos.
+
+Nos conjuntos com filtro JQL (que não pode ser avaliado localmente) só se
+atualizam issues que já lá estão; a entrada de novas issues fica para a
+próxima sincronização incremental. A marca d'água dos conjuntos não avança,
+pelo que essa sincronização continua a apanhar qualquer evento perdido.
+
+Tal como o `issue_store`, este módulo não depende do Streamlit: é usado pela
+API (app/api/webhooks.py) e pela ferramenta de reprodução de eventos.
+"""
+
+from datetime import datetime
+
+from issue_records import format_epoch_millis, jira_timestamp_timezone
+from issue_store import get_issue_store
+
+ISSUE_CREATED = "jira:issue_created"
+ISSUE_UPDATED = "jira:issue_updated"
+ISSUE_DELETED = "jira:issue_deleted"
+SUPPORTED_EVENTS = (ISSUE_CREATED, ISSUE_UPDATED, ISSUE_DELETED)
+
+_ALL_FIELDS = {"*all", "*navigable"}
+
+
+class WebhookEventError(ValueError):
+    """Evento de webhook inválido ou não suportado."""
+
+
+def _parse_jira_datetime(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f%z")
+    except (TypeError, ValueError):
+        return None
+
+
+def server_url_from_issue(issue):
+    """Deriva o URL do servidor a partir do 'self' da issue (".../rest/api/2/issue/10001")."""
+    self_url = issue.get("self") or ""
+    if "/rest/" not in self_url:
+        raise WebhookEventError("A issue do evento não tem um 'self' válido para identificar o servidor Jira.")
+    return self_url.split("/rest/", 1)[0].rstrip("/")
+
+
+def _event_history(event):
+    """Converte o changelog do evento num histórico no formato do /search (ou None se não houver)."""
+    changelog = event.get("changelog") or {}
+    if not changelog.get("items"):
+        return None
+    timestamp = event.get("timestamp")
+    fields = event.get("issue", {}).get("fields") or {}
+    if isinstance(timestamp, (int, float)):
+        # No offset do 'updated' do evento (o mesmo instante, logo o mesmo horário de verão), como no /search
+        created = format_epoch_millis(timestamp, jira_timestamp_timezone(fields.get("updated") or fields.get("created")))
+    else:
+        created = fields.get("updated")
+    return {"id": str(changelog.get("id", "")), "author": event.get("user"), "created": created, "items": changelog["items"]}
+
+
+def _merge_histories(stored_histories, history):
+    """Junta o histórico do evento aos guardados, sem repetir, mantendo a ordem (crescente ou decrescente) existente."""
+    if history is None or any(str(item.get("id")) == history["id"] for item in stored_histories):
+        return list(stored_histories)
+    if not stored_histories:
+        return [history]
+    first = _parse_jira_datetime(stored_histories[0].get("created"))
+    last = _parse_jira_datetime(stored_histories[-1].get("created"))
+    if first and last and first > last:
+        return [history] + list(stored_histories) # Do mais recente para o mais antigo
+    return list(stored_histories) + [history]
+
+
+def _build_raw_issue(issue, stored, spec, history):
+    """Monta o JSON da issue tal como o conjunto o guardaria (só os campos pedidos e, se for o caso, o changelog)."""
+    event_fields = issue.get("fields") or {}
+    wanted = set(spec.get("fields") or [])
+    fields = dict((stored or {}).get("fields") or {})
+    if wanted & _ALL_FIELDS:
+        fields.update(event_fields)
+    else:
+        # Campos pedidos que não vêm no evento mantêm o valor guardado
+        fields.update({name: event_fields[name] for name in wanted if name in event_fields})
+
+    raw = {"id": str(issue["id"]), "key": issue["key"], "self": issue.get("self"), "fields": fields}
+    if spec.get("expand") == "changelog":
+        stored_histories = ((stored or {}).get("changelog") or {}).get("histories", [])
+        histories = _merge_histories(stored_histories, history)
+        raw["changelog"] = {"startAt": 0, "maxResults": len(histories), "total": len(histories), "histories": histories}
+    return raw
+
+
+def validate_event(event):
+    """Valida a forma mínima de um evento de issue. Devolve `(tipo, issue, servidor, projeto)`."""
+    if not isinstance(event, dict):
+        raise WebhookEventError("O evento deve ser um objeto JSON.")
+    event_type = event.get("webhookEvent")
+    if event_type not in SUPPORTED_EVENTS:
+        raise WebhookEventError(f"Evento não suportado: {event_type!r}.")
+    issue = event.get("issue")
+    if not isinstance(issue, dict) or not issue.get("id") or not issue.get("key"):
+        raise WebhookEventError("O evento não traz a issue (id e key).")
+    project_key = ((issue.get("fields") or {}).get("project") or {}).get("key") or issue["key"].rsplit("-", 1)[0]
+    return event_type, issue, server_url_from_issue(issue), project_key
+
+
+def apply_issue_event(event, store=None, server_url=None):
+    """
+    Aplica um evento de webhook a todos os conjuntos guardados do projeto.
+
+    `server_url` substitui o servidor deduzido do 'self' da issue (útil quando
+    a aplicação usa outro endereço para o mesmo Jira). Devolve um resumo
+    `{'event', 'issue', 'project', 'updated': [variantes], 'skipped': [variantes]}`.
+    """
+    event_type, issue, issue_server_url, project_key = validate_event(event)
+    server_url = (server_url or issue_server_url).rstrip("/")
+    store = store or get_issue_store()
+    history = _event_history(event) if event_type != ISSUE_DELETED else None
+    event_updated = _parse_jira_datetime((issue.get("fields") or {}).get("updated"))
+    summary = {"event": event_type, "issue": issue["key"], "project": project_key, "updated": [], "skipped": []}
+
+    for dataset in store.list_datasets(server_url, project_key):
+        variant, spec = dataset["variant"], dataset["spec"]
+        stored = store.load_issue(server_url, project_key, variant, issue["key"])
+
+        if event_type == ISSUE_DELETED:
+            changed, deleted = [], ([issue["key"]] if stored else [])
+        elif spec is None or (spec.get("jql_filter") and stored is None):
+            # Sem definição conhecida, ou issue nova num conjunto filtrado: fica para a sincronização
+            summary["skipped"].append(variant)
+            continue
+        else:
+            stored_updated = _parse_jira_datetime(((stored or {}).get("fields") or {}).get("updated"))
+            if stored_updated and event_updated and event_updated < stored_updated:
+                summary["skipped"].append(variant) # Evento atrasado: já temos uma versão mais recente
+                continue
+            changed, deleted = [_build_raw_issue(issue, stored, spec, history)], []
+
+        if not changed and not deleted:
+            continue
+        store.apply_changes(
+            server_url, project_key, variant, changed, deleted,
+            dataset["watermark"], dataset["last_reconciled_at"]
+        )
+        summary["updated"].append(variant)
+    return summary
@@ -6,11 +6,27 @@ from functools import lru_cache
 import pandas as pd
 import requests
 from stqdm import stqdm
-from requests.auth import HTTPBasicAuth
 import json
-from datetime import datetime, timezone
+import re
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone, timedelta
 from collections import defaultdict
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from concurrent.futures import ThreadPoolExecutor
+from config import (
+    JIRA_SEARCH_PAGE_SIZE, JIRA_FETCH_MAX_WORKERS, JIRA_RECONCILE_INTERVAL_MINUTES, JIRA_CHANGELOG_BATCH_SIZE,
+    JIRA_JQL_COUNT_TTL_SECONDS, JIRA_BOARD_FILTER_TTL_SECONDS, JIRA_IN_FLIGHT_WAIT_SECONDS
+)
 from security import get_project_config
+from issue_store import get_issue_store
+from issue_records import wrap_raw_issues, normalize_changelog_history, jira_timestamp_timezone
+from jira_http import (
+    get_client_http_session, attach_pool_to_client, with_request_priority, connection_key,
+    request_priority, PRIORITY_BACKGROUND
+)
+from jira_metadata import get_jira_metadata, SPRINT_FIELD_CUSTOM_TYPE
 from metrics_calculator import find_completion_date, calculate_lead_time, calculate_cycle_time
 from pathlib import Path
 
@@ -71,14 +87,59 @@ def normalize_standard_fields_for_api(standard_fields):
     return normalized_fields
 
 
+# --- Requisitos de Campos por Consumidor ---
+# Cada consumidor (página ou métrica) declara os campos do Jira que lê e se precisa
+# dos comentários ou do changelog, que são de longe a maior parte do payload.
+# As buscas pedem apenas a união dos requisitos dos consumidores da página.
+_CORE_ISSUE_FIELDS = ['summary', 'status', 'issuetype', 'created', 'updated', 'resolutiondate', 'resolution', 'assignee']
+
+FIELD_REQUIREMENTS = {
+    # DataFrame base dos gráficos (Meu Dashboard / Construir Gráficos): Lead e Cycle Time usam o changelog
+    'dashboard': {'fields': _CORE_ISSUE_FIELDS, 'changelog': True, 'comments': False},
+    # Métricas de Fluxo: CFD, WIP envelhecido, throughput e análise de performance
+    'flow_metrics': {'fields': _CORE_ISSUE_FIELDS + ['timespent'], 'changelog': True, 'comments': False},
+    # SLA por prioridade: o tempo de primeira resposta vem dos comentários
+    'sla': {'fields': ['priority', 'creator', 'reporter', 'created', 'resolutiondate'], 'changelog': True, 'comments': True},
+    # Burnup / Forecast: escopo, conclusão e (via extra_fields) o campo de estimativa
+    'forecast_burnup': {'fields': ['summary', 'status', 'issuetype', 'created', 'updated', 'resolutiondate'], 'changelog': True, 'comments': False},
+    # Radar Preditivo: métricas executivas e análise de sentimento (descrição + comentários)
+    'radar': {'fields': _CORE_ISSUE_FIELDS + ['priority', 'timespent', 'duedate', 'description'], 'changelog': True, 'comments': True},
+}
+
+
+def plan_issue_fields(consumers=None, extra_fields=None):
+    """
+    Calcula os campos e o `expand` a pedir ao Jira para um conjunto de consumidores.
+
+    Sem consumidores, usa a união de todos os registados (o pedido mais completo).
+    Devolve `(campos, expand)`, em que `expand` é "changelog" ou None.
+    """
+    consumers = list(consumers) if consumers else list(FIELD_REQUIREMENTS)
+    fields, needs_changelog, needs_comments = [], False, False
+    for consumer in consumers:
+        requirements = FIELD_REQUIREMENTS.get(consumer)
+        if requirements is None:
+            raise ValueError(f"Consumidor de campos desconhecido: '{consumer}'")
+        fields.extend(requirements['fields'])
+        needs_changelog = needs_changelog or requirements['changelog']
+        needs_comments = needs_comments or requirements['comments']
+
+    fields.extend(extra_fields or [])
+    if needs_comments:
+        fields.append('comment')
+    # Remove duplicados mantendo a ordem
+    return list(dict.fromkeys(fields)), ("changelog" if needs_changelog else None)
+
+
 @lru_cache(maxsize=32)
 def connect_to_jira(server, user_email, api_token):
     try:
-        return JIRA(
+        client = JIRA(
             options={'server': server}, 
             basic_auth=(user_email, api_token),
             timeout=30 
         )
+        return attach_pool_to_client(client)
     except Exception as e:
         st.error(f"Erro ao conectar ao Jira: {e}")
         return None
@@ -166,26 +227,15 @@ def get_issues_by_date_range(jira_client, project_key, start_date=None, end_date
         return []
 
 @st.cache_data(ttl=300)
-def get_all_project_issues(_jira_client: JIRA, project_key: str, extra_fields: list = None):
-    jql = f"project = '{project_key}'"
-    
-    fields = [
-        'summary', 'status', 'issuetype', 'created', 
-        'resolutiondate', 'assignee', 'reporter', 'priority', 
-        'components', 'labels', 'project'
-    ]
-    
-    if extra_fields:
-        for field in extra_fields:
-            if field not in fields:
-                fields.append(field)
-                
-    return _jira_client.search_issues(
-        jql, 
-        fields=fields, 
-        maxResults=False, 
-        expand="changelog"
-    )
+def get_all_project_issues(_jira_client: JIRA, project_key: str, extra_fields: list = None, store_revision: int = None):
+    """
+    Todas as issues do projeto para o forecast. `store_revision` (ver
+    `get_project_store_revision`) só entra na chave da cache.
+    """
+    fields, expand = plan_issue_fields(['forecast_burnup'], extra_fields)
+
+    # Lê do repositório local e só pede ao Jira as alterações (ver sync_project_issues)
+    return sync_project_issues(_jira_client, project_key, fields, expand=expand)
     
 @lru_cache(maxsize=32)
 def get_fix_versions(jira_client, project_key):
@@ -198,23 +248,13 @@ def get_fix_versions(jira_client, project_key):
 
 def get_issues_by_fix_version(jira_client: JIRA, project_key: str, version_id: str, extra_fields: list = None):
     jql = f"project = '{project_key}' AND fixVersion = {version_id}"
-    
-    fields = [
-        'summary', 'status', 'issuetype', 'created', 
-        'resolutiondate', 'assignee', 'reporter', 'priority', 
-        'components', 'labels', 'project'
-    ]
-    
-    if extra_fields:
-        for field in extra_fields:
-            if field not in fields:
-                fields.append(field)
+    fields, expand = plan_issue_fields(['forecast_burnup'], extra_fields)
                 
     return jira_client.search_issues(
         jql, 
         fields=fields, 
         maxResults=False, 
-        expand="changelog" 
+        expand=expand 
     )
 
 @st.cache_data(ttl=3600)
@@ -223,32 +263,88 @@ def get_sprints_in_range(_client, project_key, start_date, end_date):
     try:
         boards = _client.boards(projectKeyOrID=project_key)
         all_sprints = []
-        for board in boards:
-            try:
-                sprints = _client.sprints(board.id, state='closed,active')
-                for sprint in sprints:
-                    sprint_start = pd.to_datetime(sprint.startDate).date() if hasattr(sprint, 'startDate') else None
-                    sprint_end = pd.to_datetime(sprint.endDate).date() if hasattr(sprint, 'endDate') else None
-                    
-                    if sprint_start and sprint_end:
-                        if max(start_date, sprint_start) <= min(end_date, sprint_end):
-                            all_sprints.append(sprint)
-            except Exception:
-                continue
+        for sprints in list_sprints_for_boards(_client, [board.id for board in boards]).values():
+            for sprint in sprints:
+                sprint_start = pd.to_datetime(sprint.startDate).date() if hasattr(sprint, 'startDate') else None
+                sprint_end = pd.to_datetime(sprint.endDate).date() if hasattr(sprint, 'endDate') else None
+                
+                if sprint_start and sprint_end:
+                    if max(start_date, sprint_start) <= min(end_date, sprint_end):
+                        all_sprints.append(sprint)
         return all_sprints
     except Exception as e:
         st.error(f"Erro ao buscar sprints: {e}")
         return []
 
-@st.cache_data(show_spinner="A validar campo no Jira...")
+# --- Busca de Sprints em Lote ---
+# Número máximo de IDs de sprint por cláusula 'Sprint in (...)'
+_SPRINT_JQL_BATCH_SIZE = 50
+
+def list_sprints_for_boards(jira_client, board_ids, state='closed,active', max_workers=JIRA_FETCH_MAX_WORKERS):
+    """Lista as sprints de vários quadros em paralelo. Devolve {board_id: [sprints]} (quadros com erro ficam vazios)."""
+    def board_sprints(board_id):
+        try:
+            return jira_client.sprints(board_id, state=state)
+        except Exception as e:
+            print(f"Aviso: não foi possível listar as sprints do quadro {board_id}: {e}")
+            return []
+
+    board_ids = list(board_ids)
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        return dict(zip(board_ids, executor.map(with_request_priority(board_sprints), board_ids)))
+
+def _find_sprint_field_id(jira_client):
+    """Devolve o ID do campo customizado 'Sprint' (varia entre instâncias do Jira)."""
+    return get_jira_metadata(jira_client).field_id_for_custom_type(SPRINT_FIELD_CUSTOM_TYPE)
+
+def _sprint_value_id(sprint_value):
+    """Lê o ID de um valor do campo Sprint (objeto JSON no Cloud; texto '...[id=12,...]' em versões antigas)."""
+    if isinstance(sprint_value, dict):
+        return sprint_value.get('id')
+    match = re.search(r'\bid=(\d+)', str(sprint_value))
+    return int(match.group(1)) if match else None
+
+@st.cache_data(ttl=3600, show_spinner="A buscar issues das sprints...")
+def get_issues_for_sprints(_client, sprint_ids):
+    """
+    Busca as issues de várias sprints numa única consulta `Sprint in (...)` e
+    reparte-as localmente pelo campo Sprint. Devolve {sprint_id: [issues]}.
+
+    Equivale a chamar `get_sprint_issues` por sprint (uma issue que passou por
+    várias sprints aparece em todas elas), mas com uma só busca paginada em
+    paralelo e o changelog obtido em lote.
+    """
+    sprint_ids = [int(sprint_id) for sprint_id in dict.fromkeys(sprint_ids)]
+    issues_by_sprint = {sprint_id: [] for sprint_id in sprint_ids}
+    if not sprint_ids:
+        return issues_by_sprint
+
+    try:
+        sprint_field_id = _find_sprint_field_id(_client)
+        if not sprint_field_id:
+            # Sem o campo Sprint não é possível repartir: uma busca por sprint
+            return {sprint_id: get_sprint_issues(_client, sprint_id) for sprint_id in sprint_ids}
+
+        fields = ["*navigable", sprint_field_id]
+        assigned = set() # (sprint_id, chave): uma issue pode vir em mais de um lote
+        for start in range(0, len(sprint_ids), _SPRINT_JQL_BATCH_SIZE):
+            batch = sprint_ids[start:start + _SPRINT_JQL_BATCH_SIZE]
+            jql = f"Sprint in ({', '.join(str(sprint_id) for sprint_id in batch)})"
+            for issue in fetch_issues_concurrently(_client, jql, fields=fields, expand="changelog"):
+                for sprint in issue.raw['fields'].get(sprint_field_id) or []:
+                    sprint_id = _sprint_value_id(sprint)
+                    if sprint_id in issues_by_sprint and (sprint_id, issue.key) not in assigned:
+                        assigned.add((sprint_id, issue.key))
+                        issues_by_sprint[sprint_id].append(issue)
+        return issues_by_sprint
+    except Exception as e:
+        st.error(f"Erro ao buscar issues das sprints: {e}")
+        return issues_by_sprint
+
 def validate_jira_field(_client: JIRA, field_id: str):
     """Verifica se um field_id (padrão ou personalizado) é válido na instância do Jira."""
     try:
-        all_fields = _client.fields()
-        for field in all_fields:
-            if field['id'] == field_id:
-                return True
-        return False
+        return field_id in get_jira_metadata(_client).field_ids()
     except Exception as e:
         st.error(f"Não foi possível validar o campo no Jira: {e}")
         return False
@@ -258,9 +354,9 @@ def search_issues_jql(jira_client, jql, fields=None, max_results=5000):
     start_at = 0
     chunk_size = 100
     server_url = jira_client._options['server']
-    auth = HTTPBasicAuth(jira_client._session.auth[0], jira_client._session.auth[1])
+    http = get_client_http_session(jira_client)
     headers = {"Accept": "application/json", "Content-Type": "application/json"}
-    url = f"{server_url}/rest/api/3/search"
+    url = f"{server_url.rstrip('/')}/rest/api/3/search"
 
     while True:
         try:
@@ -271,7 +367,7 @@ def search_issues_jql(jira_client, jql, fields=None, max_results=5000):
                 "expand": ["changelog"],
                 "fields": fields or ["*navigable"]
             }
-            response = requests.post(url, data=json.dumps(payload_dict), headers=headers, auth=auth, timeout=30)
+            response = http.post(url, data=json.dumps(payload_dict), headers=headers)
             response.raise_for_status()
             data = response.json()
             issues_data = data.get('issues', [])
@@ -285,6 +381,9 @@ def search_issues_jql(jira_client, jql, fields=None, max_results=5000):
             if len(all_issues) >= max_results: break
         
         except requests.exceptions.HTTPError as e:
+            if e.response.status_code == 429:
+                st.error("O Jira está a limitar os pedidos (Código: 429) e as novas tentativas esgotaram-se. Tente novamente dentro de alguns instantes.")
+                return []
             st.error(f"Erro de comunicação com o Jira (Código: {e.response.status_code}). Verifique se a sua conexão tem permissões para ler issues neste projeto.")
             print(f"Detalhes do Erro do Jira: {e.response.text}")
             return []
@@ -294,6 +393,461 @@ def search_issues_jql(jira_client, jql, fields=None, max_results=5000):
             
     return all_issues
 
+def _search_issues_page(jira_client, jql, fields, start_at, max_results, expand=None):
+    """Busca uma única página do endpoint /search e devolve o JSON bruto da resposta."""
+    server_url = jira_client._options['server'].rstrip('/')
+    headers = {"Accept": "application/json", "Content-Type": "application/json"}
+    payload_dict = {
+        "jql": jql,
+        "startAt": start_at,
+        "maxResults": max_results,
+        "fields": fields or ["*navigable"]
+    }
+    if expand:
+        payload_dict["expand"] = [expand]
+    response = get_client_http_session(jira_client).post(
+        f"{server_url}/rest/api/3/search", data=json.dumps(payload_dict), headers=headers
+    )
+    response.raise_for_status()
+    return response.json()
+
+def _iter_raw_issue_pages(jira_client, jql, fields=None, expand="changelog",
+                         max_workers=JIRA_FETCH_MAX_WORKERS, page_size=JIRA_SEARCH_PAGE_SIZE):
+    """
+    Busca as páginas de uma JQL em paralelo e entrega-as por ordem, à medida que
+    chegam, como `(issues_da_página, total)`.
+
+    Issues repetidas entre janelas (o conjunto pode mudar durante a busca) só
+    aparecem na primeira página em que surgem.
+    """
+    first_page = _search_issues_page(jira_client, jql, fields, 0, page_size, expand)
+    total = first_page.get('total', 0)
+    seen_keys = set()
+
+    def unique_issues(page):
+        issues = []
+        for raw in page.get('issues', []):
+            if raw.get('key') in seen_keys:
+                continue
+            seen_keys.add(raw.get('key'))
+            issues.append(raw)
+        return issues
+
+    yield unique_issues(first_page), total
+
+    # O Jira pode devolver menos issues do que o pedido; usa o tamanho real como passo.
+    effective_page_size = len(first_page.get('issues', []))
+    if effective_page_size and total > effective_page_size:
+        start_positions = range(effective_page_size, total, effective_page_size)
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            # 'map' preserva a ordem das janelas, independentemente da ordem de chegada
+            # As threads do executor não herdam a prioridade de quem pede; propaga-a explicitamente
+            fetch_page = with_request_priority(
+                lambda start_at: _search_issues_page(jira_client, jql, fields, start_at, effective_page_size, expand)
+            )
+            for page in executor.map(fetch_page, start_positions):
+                yield unique_issues(page), total
+
+def _fetch_raw_issues_concurrently(jira_client, jql, fields=None, expand="changelog",
+                                   max_workers=JIRA_FETCH_MAX_WORKERS, page_size=JIRA_SEARCH_PAGE_SIZE):
+    """Busca todas as páginas de uma JQL em paralelo e devolve os dicionários JSON das issues, por ordem."""
+    raw_issues = []
+    for page_issues, _ in _iter_raw_issue_pages(jira_client, jql, fields, expand, max_workers, page_size):
+        raw_issues.extend(page_issues)
+    return raw_issues
+
+# --- Busca em Duas Fases (campos + changelog em lote) ---
+# O 'expand=changelog' do /search trunca históricos longos e multiplica o tamanho
+# de cada página. Em vez disso, a busca pede só os campos e o changelog completo
+# é obtido à parte pelo endpoint /changelog/bulkfetch, com muitas issues por pedido.
+
+def _fetch_changelog_batch(jira_client, issue_ids):
+    """Busca (com paginação por token) os históricos completos de um lote de issues. Devolve {id: [históricos]}."""
+    server_url = jira_client._options['server'].rstrip('/')
+    headers = {"Accept": "application/json", "Content-Type": "application/json"}
+    http = get_client_http_session(jira_client)
+    histories_by_id = defaultdict(list)
+    next_page_token = None
+    while True:
+        payload_dict = {"issueIdsOrKeys": issue_ids}
+        if next_page_token:
+            payload_dict["nextPageToken"] = next_page_token
+        response = http.post(f"{server_url}/rest/api/3/changelog/bulkfetch", data=json.dumps(payload_dict), headers=headers)
+        response.raise_for_status()
+        data = response.json()
+        for issue_changelog in data.get('issueChangeLogs', []):
+            # As datas ficam em milissegundos: são convertidas no fuso de cada issue em `_attach_changelogs`
+            histories_by_id[str(issue_changelog.get('issueId'))].extend(issue_changelog.get('changeHistories', []))
+        next_page_token = data.get('nextPageToken')
+        if not next_page_token:
+            return histories_by_id
+
+# Fuso horário (com horário de verão) do utilizador da API, por conexão: é nele
+# que o /search escreve as datas, e assim também as do changelog em lote.
+_USER_TIMEZONES = {}
+_USER_TIMEZONES_LOCK = threading.Lock()
+
+def _get_user_timezone(jira_client):
+    """Devolve o `ZoneInfo` do utilizador da API (campo 'timeZone' do /myself), ou None se não for conhecido."""
+    key = connection_key(jira_client)
+    with _USER_TIMEZONES_LOCK:
+        if key in _USER_TIMEZONES:
+            return _USER_TIMEZONES[key]
+    user_tz = None
+    try:
+        server_url = jira_client._options['server'].rstrip('/')
+        response = get_client_http_session(jira_client).get(f"{server_url}/rest/api/2/myself", headers={"Accept": "application/json"})
+        response.raise_for_status()
+        timezone_name = response.json().get('timeZone')
+        if timezone_name:
+            user_tz = ZoneInfo(timezone_name)
+    except (requests.exceptions.RequestException, ValueError, ZoneInfoNotFoundError) as e:
+        print(f"Aviso: não foi possível obter o fuso horário do utilizador do Jira: {e}")
+    with _USER_TIMEZONES_LOCK:
+        _USER_TIMEZONES[key] = user_tz
+    return user_tz
+
+def _fetch_changelogs_via_search(jira_client, raw_issues, max_workers):
+    """Alternativa para servidores sem /changelog/bulkfetch (Jira Server/Data Center): busca por chaves com expand."""
+    keys = [raw['key'] for raw in raw_issues]
+    histories_by_id = {}
+    for start in range(0, len(keys), JIRA_SEARCH_PAGE_SIZE):
+        jql = f"key in ({', '.join(keys[start:start + JIRA_SEARCH_PAGE_SIZE])})"
+        for raw in _fetch_raw_issues_concurrently(jira_client, jql, ['key'], "changelog", max_workers):
+            histories_by_id[str(raw.get('id'))] = (raw.get('changelog') or {}).get('histories', [])
+    return histories_by_id
+
+def _history_instant(history):
+    """Instante (epoch ms) do 'created' de um histórico, em milissegundos (bulkfetch) ou texto (/search)."""
+    created = history.get('created')
+    if isinstance(created, (int, float)):
+        return created
+    created_dt = _parse_jira_datetime(created)
+    return created_dt.timestamp() * 1000 if created_dt else float('-inf')
+
+def _attach_changelogs(jira_client, raw_issues, max_workers=JIRA_FETCH_MAX_WORKERS, batch_size=JIRA_CHANGELOG_BATCH_SIZE):
+    """Busca o changelog completo das issues indicadas, em lotes concorrentes, e anexa-o ao JSON de cada uma."""
+    issue_ids = [str(raw['id']) for raw in raw_issues]
+    batches = [issue_ids[start:start + batch_size] for start in range(0, len(issue_ids), batch_size)]
+    try:
+        histories_by_id = {}
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            fetch_batch = with_request_priority(lambda batch: _fetch_changelog_batch(jira_client, batch))
+            for batch_histories in executor.map(fetch_batch, batches):
+                histories_by_id.update(batch_histories)
+    except requests.exceptions.HTTPError as e:
+        if e.response is None or e.response.status_code not in (404, 405):
+            raise
+        histories_by_id = _fetch_changelogs_via_search(jira_client, raw_issues, max_workers)
+
+    # Datas no fuso do utilizador da API, como no /search (o offset muda com o horário de verão);
+    # sem ele, usa-se o offset do 'created' de cada issue
+    user_tz = _get_user_timezone(jira_client)
+    for raw in raw_issues:
+        issue_tz = user_tz or jira_timestamp_timezone((raw.get('fields') or {}).get('created'))
+        # Ordenados pelo instante (não pela string, cujo offset muda com o horário de verão), do mais antigo para o mais recente
+        histories = sorted(histories_by_id.get(str(raw['id']), []), key=_history_instant)
+        histories = [normalize_changelog_history(history, issue_tz) for history in histories]
+        raw['changelog'] = {'startAt': 0, 'maxResults': len(histories), 'total': len(histories), 'histories': histories}
+
+def _fetch_raw_issues_two_phase(jira_client, jql, fields=None, known_issues=None,
+                                max_workers=JIRA_FETCH_MAX_WORKERS, page_size=JIRA_SEARCH_PAGE_SIZE):
+    """
+    Busca as issues de uma JQL com o changelog completo, em duas fases.
+
+    1. Busca só com os campos (sem `expand`), páginas em paralelo.
+    2. Busca em lote o changelog apenas das issues novas ou cujo 'updated'
+       mudou em relação a `known_issues` ({chave: json} já guardado); as
+       restantes reaproveitam o changelog que já tinham.
+    """
+    raw_issues = _fetch_raw_issues_concurrently(jira_client, jql, fields, None, max_workers, page_size)
+    known_issues = known_issues or {}
+    missing_changelog = []
+    for raw in raw_issues:
+        known = known_issues.get(raw['key'])
+        if known and 'changelog' in known and \
+                (known.get('fields') or {}).get('updated') == (raw.get('fields') or {}).get('updated'):
+            raw['changelog'] = known['changelog']
+        else:
+            missing_changelog.append(raw)
+    if missing_changelog:
+        _attach_changelogs(jira_client, missing_changelog, max_workers)
+    return raw_issues
+
+def _fetch_raw_issues(jira_client, jql, fields, expand, known_issues=None):
+    """Escolhe a busca em duas fases quando o changelog é pedido; caso contrário, a busca simples."""
+    if expand == "changelog":
+        return _fetch_raw_issues_two_phase(jira_client, jql, fields, known_issues)
+    return _fetch_raw_issues_concurrently(jira_client, jql, fields, expand)
+
+def _wrap_raw_issues(jira_client, raw_issues, issue_format="jira"):
+    """
+    Converte os dicionários JSON devolvidos pela API no formato pedido:
+    objetos `jira.Issue` ("jira") ou vistas leves `RawIssue` ("raw"), que
+    evitam construir toda a árvore de `Resource` da biblioteca.
+    """
+    if issue_format == "raw":
+        return wrap_raw_issues(raw_issues)
+    return [Issue(options=jira_client._options, session=jira_client._session, raw=raw) for raw in raw_issues]
+
+def fetch_issues_concurrently(jira_client, jql, fields=None, expand="changelog",
+                              max_workers=JIRA_FETCH_MAX_WORKERS, page_size=JIRA_SEARCH_PAGE_SIZE,
+                              issue_format="jira"):
+    """
+    Busca todas as issues de uma JQL pedindo várias páginas em paralelo.
+
+    A primeira página revela o 'total' e o tamanho de página efetivamente
+    aplicado pelo Jira; as janelas 'startAt' restantes são pedidas num pool
+    limitado a `max_workers` threads. As issues são devolvidas na mesma ordem
+    (e com o mesmo formato `jira.Issue`) que a paginação sequencial do
+    `search_issues(..., maxResults=False)`. Com `expand="changelog"`, o
+    changelog completo é buscado em lote numa segunda fase.
+    """
+    if expand == "changelog":
+        raw_issues = _fetch_raw_issues_two_phase(jira_client, jql, fields, None, max_workers, page_size)
+    else:
+        raw_issues = _fetch_raw_issues_concurrently(jira_client, jql, fields, expand, max_workers, page_size)
+    return _wrap_raw_issues(jira_client, raw_issues, issue_format)
+
+# --- Sincronização Incremental de Projetos ---
+# Um estado em memória por (servidor, projeto, variante), espelhado no repositório
+# persistente (`issue_store`): as issues brutas indexadas pela chave, a marca
+# d'água (maior 'updated' já visto) e a revisão do conjunto guardado em disco.
+_PROJECT_SYNC_STATES = {}
+_PROJECT_SYNC_STATES_LOCK = threading.Lock()
+
+def _parse_jira_datetime(value):
+    """Converte um timestamp do Jira ('2024-03-05T10:22:33.123-0300') num datetime com fuso."""
+    try:
+        return datetime.strptime(value, '%Y-%m-%dT%H:%M:%S.%f%z')
+    except (TypeError, ValueError):
+        return None
+
+def _dataset_variant(jql_filter, fields, expand):
+    """Identificador estável do conjunto de dados (filtro + campos + expand) para o repositório."""
+    signature = json.dumps([jql_filter or "", sorted(fields), expand or ""])
+    return hashlib.sha1(signature.encode('utf-8')).hexdigest()
+
+def _dataset_spec(jql_filter, fields, expand):
+    """Definição do conjunto guardada com ele (usada, por ex., pelos webhooks para o atualizar)."""
+    return {'jql_filter': jql_filter or "", 'fields': sorted(fields), 'expand': expand or ""}
+
+def _get_sync_state(server_url, project_key, variant):
+    state_key = (server_url, project_key, variant)
+    with _PROJECT_SYNC_STATES_LOCK:
+        if state_key not in _PROJECT_SYNC_STATES:
+            _PROJECT_SYNC_STATES[state_key] = {
+                'issues': {}, 'watermark': None, 'last_reconciled_at': None, 'revision': None,
+                'lock': threading.Lock()
+            }
+        return _PROJECT_SYNC_STATES[state_key]
+
+def _latest_timestamp(timestamps):
+    """Devolve o mais recente de vários timestamps do Jira (strings originais), ignorando os inválidos."""
+    latest, latest_dt = None, None
+    for timestamp in timestamps:
+        timestamp_dt = _parse_jira_datetime(timestamp)
+        if timestamp_dt and (latest_dt is None or timestamp_dt > latest_dt):
+            latest, latest_dt = timestamp, timestamp_dt
+    return latest
+
+def _find_watermark(raw_issues):
+    """Devolve o maior 'updated' (string original do Jira) de um conjunto de issues brutas."""
+    return _latest_timestamp(raw.get('fields', {}).get('updated') for raw in raw_issues)
+
+def _watermark_to_jql(watermark):
+    """
+    Formata a marca d'água para JQL ("yyyy/MM/dd HH:mm").
+
+    O Jira devolve as datas no fuso do utilizador da API e interpreta a JQL
+    nesse mesmo fuso, por isso usa-se a hora local da string (sem converter).
+    A precisão da JQL é ao minuto; recua-se um minuto por segurança, e as
+    issues repetidas são descartadas na fusão por chave.
+    """
+    watermark_dt = _parse_jira_datetime(watermark)
+    local_dt = watermark_dt.replace(tzinfo=None) - timedelta(minutes=1)
+    return local_dt.strftime('%Y/%m/%d %H:%M')
+
+def get_project_store_revision(jira_client, project_key):
+    """
+    Revisão dos dados guardados de um projeto no repositório local.
+
+    Muda sempre que um webhook ou uma sincronização altera alguma issue: as
+    funções com `st.cache_data` recebem-na como argumento para que a cache
+    acompanhe o repositório sem esperar pelo fim do TTL.
+    """
+    if not jira_client or not project_key:
+        return 0
+    try:
+        server_url = jira_client._options['server'].rstrip('/')
+        return get_issue_store().get_project_revision(server_url, project_key)
+    except Exception as e:
+        print(f"Aviso: não foi possível ler o repositório local de issues: {e}")
+        return 0
+
+def _load_state_from_store(state, server_url, project_key, variant):
+    """Recarrega o estado em memória a partir do disco se outra instância o tiver alterado."""
+    try:
+        store = get_issue_store()
+        dataset = store.get_dataset(server_url, project_key, variant)
+        if dataset and dataset['revision'] != state['revision']:
+            state['issues'] = store.load_issues(server_url, project_key, variant)
+            state['watermark'] = dataset['watermark']
+            state['last_reconciled_at'] = dataset['last_reconciled_at']
+            state['revision'] = dataset['revision']
+    except Exception as e:
+        # O repositório é uma otimização: sem ele a sincronização continua em memória
+        print(f"Aviso: não foi possível ler o repositório local de issues: {e}")
+
+def _with_watermark_field(fields):
+    fields = list(fields)
+    if 'updated' not in fields:
+        fields.append('updated') # Necessário para calcular a marca d'água
+    return fields
+
+def _store_full_refresh(state, server_url, project_key, variant, raw_issues, spec=None):
+    """Substitui o conjunto sincronizado (memória e disco) pelo resultado de uma busca completa."""
+    state['issues'] = {raw['key']: raw for raw in raw_issues}
+    state['last_reconciled_at'] = datetime.now()
+    state['watermark'] = _find_watermark(raw_issues)
+    try:
+        state['revision'] = get_issue_store().replace_issues(
+            server_url, project_key, variant, raw_issues, state['watermark'], state['last_reconciled_at'], spec=spec
+        )
+    except Exception as e:
+        print(f"Aviso: não foi possível gravar o repositório local de issues: {e}")
+
+def sync_project_issues(jira_client, project_key, fields, jql_filter="", expand="changelog", issue_format="jira"):
+    """
+    Sincroniza as issues de um projeto de forma incremental e devolve-as como
+    `jira.Issue` (ou `RawIssue`, com `issue_format="raw"`).
+
+    - Lê primeiro o repositório local em disco (`issue_store`); só sem dados
+      guardados é que faz a busca completa ao Jira.
+    - Depois busca apenas `project = X AND updated >= marca` e funde o
+      resultado por chave no conjunto já conhecido.
+    - Com `expand="changelog"`, o changelog completo vem do endpoint em lote
+      e só é pedido para as issues cujo 'updated' mudou.
+    - A cada `JIRA_RECONCILE_INTERVAL_MINUTES` faz uma busca barata só com as
+      chaves para remover issues apagadas ou movidas para outro projeto.
+    """
+    base_jql = f"project = '{project_key}'"
+    if jql_filter:
+        base_jql += f" AND {jql_filter}"
+    return _sync_scope_issues(jira_client, project_key, base_jql, fields, jql_filter, expand, issue_format)
+
+def _sync_scope_issues(jira_client, scope_key, base_jql, fields, jql_filter, expand, issue_format):
+    """
+    Sincronização incremental de um conjunto de issues definido por `base_jql`
+    (sem ORDER BY), guardado no repositório sob `scope_key` (a chave do
+    projeto ou, por ex., "filter:10100" para o filtro de um quadro).
+    `jql_filter` entra apenas na identificação e na definição do conjunto.
+    """
+    fields = _with_watermark_field(fields)
+    server_url = jira_client._options['server'].rstrip('/')
+    variant = _dataset_variant(jql_filter, fields, expand)
+    state = _get_sync_state(server_url, scope_key, variant)
+
+    # Se houver uma primeira carga em streaming deste conjunto em curso, espera por ela
+    _wait_for_flight(_sync_flight_key(jira_client, scope_key, variant))
+    with state['lock']:
+        _load_state_from_store(state, server_url, scope_key, variant)
+        if state['watermark'] is None:
+            raw_issues = _fetch_raw_issues(jira_client, base_jql, fields, expand)
+            _store_full_refresh(state, server_url, scope_key, variant, raw_issues, _dataset_spec(jql_filter, fields, expand))
+            return _wrap_raw_issues(jira_client, state['issues'].values(), issue_format)
+
+        now = datetime.now()
+        delta_jql = f'{base_jql} AND updated >= "{_watermark_to_jql(state["watermark"])}"'
+        changed_issues = _fetch_raw_issues(jira_client, delta_jql, fields, expand, known_issues=state['issues'])
+        # A JQL repete as issues da marca d'água: só as que mudaram contam (e avançam a revisão)
+        changed_issues = [raw for raw in changed_issues if state['issues'].get(raw['key']) != raw]
+
+        # Issues novas vão para o início (como na ordem padrão do Jira); as alteradas mantêm a posição
+        new_issues = {raw['key']: raw for raw in changed_issues if raw['key'] not in state['issues']}
+        merged_issues = {**new_issues, **state['issues']}
+        for raw in changed_issues:
+            merged_issues[raw['key']] = raw
+
+        deleted_keys = []
+        reconcile_interval = timedelta(minutes=JIRA_RECONCILE_INTERVAL_MINUTES)
+        if state['last_reconciled_at'] is None or now - state['last_reconciled_at'] >= reconcile_interval:
+            live_keys = {raw['key'] for raw in _fetch_raw_issues_concurrently(jira_client, base_jql, ['key'], expand=None)}
+            deleted_keys = [key for key in merged_issues if key not in live_keys]
+            for key in deleted_keys:
+                del merged_issues[key]
+            state['last_reconciled_at'] = now
+
+        state['issues'] = merged_issues
+        # Só as issues alteradas podem avançar a marca d'água (as remoções nunca a fazem recuar)
+        state['watermark'] = _latest_timestamp([state['watermark'], _find_watermark(changed_issues)])
+
+        try:
+            state['revision'] = get_issue_store().apply_changes(
+                server_url, scope_key, variant, changed_issues, deleted_keys,
+                state['watermark'], state['last_reconciled_at'], spec=_dataset_spec(jql_filter, fields, expand)
+            )
+        except Exception as e:
+            print(f"Aviso: não foi possível gravar o repositório local de issues: {e}")
+
+        return _wrap_raw_issues(jira_client, state['issues'].values(), issue_format)
+
+def iter_synced_project_issue_pages(jira_client, project_key, fields, jql_filter="", expand="changelog", issue_format="jira"):
+    """
+    Versão em streaming de `sync_project_issues`: entrega `(issues, carregadas, total)`.
+
+    Se o conjunto já foi sincronizado (em memória ou em disco), a sincronização
+    incremental é rápida e o resultado sai de uma só vez. Na primeira carga,
+    cada página é entregue assim que chega (com o changelog em lote dessa
+    página) e, no fim, o conjunto completo é gravado como na busca completa.
+    As issues saem pela mesma ordem de `sync_project_issues`.
+
+    A primeira carga ocupa o mesmo lugar de "busca em curso" (single-flight)
+    por conexão, projeto e variante: outros pedidos do mesmo conjunto (outro
+    utilizador, o pré-carregamento do login) esperam por ela e depois servem
+    do conjunto sincronizado, em vez de percorrerem o projeto outra vez.
+    """
+    fields = _with_watermark_field(fields)
+    server_url = jira_client._options['server'].rstrip('/')
+    variant = _dataset_variant(jql_filter, fields, expand)
+    state = _get_sync_state(server_url, project_key, variant)
+
+    flight_key = _sync_flight_key(jira_client, project_key, variant)
+    flight, is_leader = _join_flight(flight_key)
+    if not is_leader:
+        _await_flight(flight_key, flight) # Esgotado o tempo, a sincronização abaixo faz a sua própria carga
+    try:
+        with state['lock']:
+            _load_state_from_store(state, server_url, project_key, variant)
+            has_synced_data = state['watermark'] is not None
+
+        if has_synced_data or not is_leader:
+            if is_leader: # Não há nada a percorrer: liberta já quem espera
+                _end_flight(flight_key, flight)
+            issues = sync_project_issues(jira_client, project_key, fields, jql_filter, expand, issue_format)
+            yield issues, len(issues), len(issues)
+            return
+
+        base_jql = f"project = '{project_key}'"
+        if jql_filter:
+            base_jql += f" AND {jql_filter}"
+
+        raw_issues = []
+        page_expand = None if expand == "changelog" else expand
+        for page_issues, total in _iter_raw_issue_pages(jira_client, base_jql, fields, page_expand):
+            if expand == "changelog" and page_issues:
+                _attach_changelogs(jira_client, page_issues)
+            raw_issues.extend(page_issues)
+            yield _wrap_raw_issues(jira_client, page_issues, issue_format), len(raw_issues), max(total, len(raw_issues))
+
+        with state['lock']:
+            if state['watermark'] is None: # Outra carga pode ter terminado primeiro
+                _store_full_refresh(state, server_url, project_key, variant, raw_issues, _dataset_spec(jql_filter, fields, expand))
+    finally:
+        # Também se a página abandonar o gerador a meio: quem espera faz então a sua própria carga
+        if is_leader:
+            _end_flight(flight_key, flight)
+
 def get_project_boards(jira_client, project_key):
     """Busca todos os quadros (boards) associados a um projeto específico."""
     try:
@@ -302,121 +856,274 @@ def get_project_boards(jira_client, project_key):
         print(f"ERRO ao buscar quadros para o projeto {project_key}: {e}")
         return []
     
+def _plan_project_fetch(project_key, jql_filter, standard_fields, custom_fields, consumers):
+    """Devolve `(jql, campos, expand)` da busca de um projeto para os consumidores indicados."""
+    jql = f"project = '{project_key}'"
+    if jql_filter:
+        jql += f" AND {jql_filter}"
+
+    # Campos dos consumidores da página + campos padrão e customizados habilitados pelo usuário
+    user_fields = normalize_standard_fields_for_api(standard_fields) + list(custom_fields or [])
+    fields, expand = plan_issue_fields(consumers, user_fields)
+    return jql, fields, expand
+
+def iter_project_issue_pages(_client, project_key, jql_filter="", standard_fields=None, custom_fields=None, issue_format="jira", consumers=None):
+    """
+    Equivalente em streaming de `get_project_issues` (modo incremental): entrega
+    `(issues_da_página, carregadas, total)` à medida que as páginas chegam, para
+    que a página possa desenhar resultados provisórios.
+    """
+    _, fields, expand = _plan_project_fetch(project_key, jql_filter, standard_fields, custom_fields, consumers)
+    yield from iter_synced_project_issue_pages(_client, project_key, fields, jql_filter=jql_filter, expand=expand, issue_format=issue_format)
+
+# --- Coalescência de Buscas Idênticas (single-flight) ---
+# Quando vários utilizadores abrem o mesmo projeto ao mesmo tempo (ex.: logo a
+# seguir a um deploy ou a um `.clear()` da cache), só a primeira chamada vai ao
+# Jira; as restantes esperam por ela e partilham o resultado.
+class _InFlightLoad:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+_IN_FLIGHT_LOADS = {}
+_IN_FLIGHT_LOADS_LOCK = threading.Lock()
+
+def _join_flight(key):
+    """Junta-se à busca em curso com esta chave, ou regista uma nova. Devolve `(busca, é_líder)`."""
+    with _IN_FLIGHT_LOADS_LOCK:
+        in_flight = _IN_FLIGHT_LOADS.get(key)
+        is_leader = in_flight is None
+        if is_leader:
+            in_flight = _InFlightLoad()
+            _IN_FLIGHT_LOADS[key] = in_flight
+    return in_flight, is_leader
+
+def _end_flight(key, in_flight):
+    """Termina a busca do líder e acorda quem espera (idempotente)."""
+    with _IN_FLIGHT_LOADS_LOCK:
+        if _IN_FLIGHT_LOADS.get(key) is in_flight:
+            del _IN_FLIGHT_LOADS[key]
+    in_flight.done.set()
+
+def _await_flight(key, in_flight):
+    """
+    Espera até `JIRA_IN_FLIGHT_WAIT_SECONDS` que termine a busca do líder.
+
+    Um líder parado (ex.: gerador de uma sessão do Streamlit interrompida a meio)
+    não pode bloquear os outros pedidos: esgotado o tempo, a busca é retirada do
+    registo, para que quem vier depois não espere por ela, e devolve False.
+    """
+    if in_flight.done.wait(timeout=JIRA_IN_FLIGHT_WAIT_SECONDS):
+        return True
+    with _IN_FLIGHT_LOADS_LOCK:
+        if _IN_FLIGHT_LOADS.get(key) is in_flight:
+            del _IN_FLIGHT_LOADS[key]
+    print(f"Aviso: uma busca idêntica em curso não terminou em {JIRA_IN_FLIGHT_WAIT_SECONDS}s; a buscar de forma independente.")
+    return False
+
+def _wait_for_flight(key):
+    """Espera que termine a busca em curso com esta chave, se houver (ver `_await_flight`)."""
+    with _IN_FLIGHT_LOADS_LOCK:
+        in_flight = _IN_FLIGHT_LOADS.get(key)
+    if in_flight is not None:
+        _await_flight(key, in_flight)
+
+def _sync_flight_key(jira_client, scope_key, variant):
+    """Chave single-flight da primeira carga de um conjunto sincronizado (conexão, projeto, variante)."""
+    return ('sync', connection_key(jira_client), scope_key, variant)
+
+def _single_flight(key, load_fn):
+    """Executa `load_fn` uma única vez por chave entre chamadas concorrentes e partilha o resultado."""
+    in_flight, is_leader = _join_flight(key)
+
+    if not is_leader:
+        if not _await_flight(key, in_flight):
+            return load_fn()
+        if in_flight.error is not None:
+            raise in_flight.error
+        # Cópia da lista, para que quem espera não partilhe a mesma instância com o líder
+        return list(in_flight.result)
+
+    try:
+        in_flight.result = load_fn()
+        return in_flight.result
+    except Exception as e:
+        in_flight.error = e
+        raise
+    finally:
+        _end_flight(key, in_flight)
+
 @st.cache_data(ttl=3600, show_spinner="A buscar issues do projeto no Jira...")
-def get_project_issues(_client, project_key, jql_filter="", standard_fields=None, custom_fields=None): # <-- PARÂMETROS MODIFICADOS
+def get_project_issues(_client, project_key, jql_filter="", standard_fields=None, custom_fields=None, fetch_mode="incremental", issue_format="jira", consumers=None, store_revision=None): # <-- PARÂMETROS MODIFICADOS
     """
     Busca todas as issues de um projeto específico, com opção de filtro JQL adicional
     e agora com seleção de campos.
+
+    `fetch_mode="incremental"` (padrão) só pede ao Jira as issues alteradas desde
+    a última sincronização (ver `sync_project_issues`); `fetch_mode="parallel"`
+    refaz a busca completa com as páginas em simultâneo através de
+    `fetch_issues_concurrently`; `fetch_mode="sequential"` mantém a paginação
+    da biblioteca jira-python, uma página de cada vez.
+
+    `issue_format="raw"` devolve `RawIssue` (vistas sobre o JSON da API) em vez
+    de `jira.Issue` nos modos "incremental" e "parallel"; o modo "sequential"
+    devolve sempre `jira.Issue`.
+
+    Chamadas concorrentes idênticas (mesma conexão, projeto, campos e JQL)
+    partilham uma única busca ao Jira.
+
+    `consumers` lista os consumidores de `FIELD_REQUIREMENTS` da página que pede
+    os dados: só os seus campos são buscados, e os comentários/changelog apenas
+    se algum deles precisar. Sem `consumers`, pede a união de todos.
+
+    `store_revision` (ver `get_project_store_revision`) só entra na chave da
+    cache: quando um webhook ou outra sincronização altera o repositório local,
+    a próxima chamada deixa de servir a cópia antiga.
     """
     if not _client or not project_key:
         return []
     
     try:
-        jql = f"project = '{project_key}'"
-
-        if jql_filter:
-            jql += f" AND {jql_filter}"
-        
-        # --- INÍCIO DA CORREÇÃO E ATUALIZAÇÃO PARA SLA ---
-        # Lista de campos padrão que a aplicação SEMPRE precisa
-        default_fields = [
-            'summary', 'status', 'issuetype', 'created', 
-            'resolutiondate', 'assignee', 'reporter', 'priority', 
-            'components', 'labels', 'project', 'statuscategory', 'parent',
-            'timespent', # Adicionado para a correção do erro anterior e análise de Performance
-            'comment' # Adicionado para análise de SLA (Tempo de Primeiro Atendimento)
-        ]
-        
-        # Adiciona os campos padrão habilitados pelo usuário
-        if standard_fields:
-            default_fields.extend(normalize_standard_fields_for_api(standard_fields))
-        
-        # Adiciona os campos customizados habilitados pelo usuário
-        if custom_fields:
-            default_fields.extend(custom_fields)
-        
-        # Remove duplicados
-        final_fields_list = list(set(default_fields))
-        # --- FIM DA CORREÇÃO E ATUALIZAÇÃO PARA SLA ---
+        jql, final_fields_list, expand = _plan_project_fetch(project_key, jql_filter, standard_fields, custom_fields, consumers)
         
-        issues = _client.search_issues(
-            jql, 
-            fields=final_fields_list, # <-- PASSA A LISTA DE CAMPOS
-            maxResults=False, 
-            expand="changelog"
+        def load_issues():
+            if fetch_mode == "incremental":
+                return sync_project_issues(_client, project_key, final_fields_list, jql_filter=jql_filter, expand=expand, issue_format=issue_format)
+
+            if fetch_mode == "parallel":
+                return fetch_issues_concurrently(_client, jql, fields=final_fields_list, expand=expand, issue_format=issue_format)
+
+            return _client.search_issues(
+                jql, 
+                fields=final_fields_list, # <-- PASSA A LISTA DE CAMPOS
+                maxResults=False, 
+                expand=expand
+            )
+
+        flight_key = (
+            connection_key(_client), project_key, tuple(sorted(final_fields_list)), jql,
+            expand, fetch_mode, issue_format
         )
-        return issues
+        return _single_flight(flight_key, load_issues)
         
     except Exception as e:
         st.error(f"Erro ao buscar issues do Jira para o projeto '{project_key}': {e}")
         return []
 
-def get_issues_by_board(jira_client: JIRA, board_id: str, extra_fields: list = None):
-    jql = ""
-    
-    # --- INÍCIO DA CORREÇÃO DEFINITIVA ---
+# --- Pré-carregamento em Segundo Plano ---
+# Uma thread por conexão sincroniza os projetos recentes do utilizador logo após
+# o login. A sincronização deixa o estado incremental e o repositório local
+# prontos, e uma página que peça o mesmo conjunto enquanto ela decorre espera
+# pelo lock desse conjunto em vez de repetir a busca.
+_WARMUP_JOBS = {}
+_WARMUP_JOBS_LOCK = threading.Lock()
+
+def prefetch_project_issues(jira_client, project_key, standard_fields=None, custom_fields=None, consumers=None):
+    """Sincroniza, sem devolver, as issues que `get_project_issues` (modo incremental) pediria para estes consumidores."""
+    _, fields, expand = _plan_project_fetch(project_key, "", standard_fields, custom_fields, consumers)
+    sync_project_issues(jira_client, project_key, fields, expand=expand, issue_format="raw")
+
+def start_background_warmup(jira_client, project_keys, standard_fields=None, custom_fields=None, consumer_sets=(None,)):
+    """
+    Inicia numa thread (com `PRIORITY_BACKGROUND`) a sincronização dos projetos
+    indicados, pela ordem dada, para cada conjunto de consumidores.
+
+    Devolve False, sem fazer nada, se já houver um pré-carregamento a decorrer
+    para a mesma conexão.
+    """
+    if not jira_client or not project_keys:
+        return False
+    key = connection_key(jira_client)
+
+    def run():
+        with request_priority(PRIORITY_BACKGROUND):
+            try:
+                get_jira_metadata(jira_client).fields()
+            except Exception as e:
+                print(f"Aviso: pré-carregamento dos campos do Jira falhou: {e}")
+            for project_key in project_keys:
+                for consumers in consumer_sets:
+                    try:
+                        prefetch_project_issues(jira_client, project_key, standard_fields, custom_fields, consumers)
+                    except Exception as e:
+                        # O pré-carregamento é só uma otimização: a página volta a tentar quando for aberta
+                        print(f"Aviso: pré-carregamento do projeto '{project_key}' falhou: {e}")
+
+    with _WARMUP_JOBS_LOCK:
+        job = _WARMUP_JOBS.get(key)
+        if job is not None and job.is_alive():
+            return False
+        job = threading.Thread(target=run, name="jira-warmup", daemon=True)
+        _WARMUP_JOBS[key] = job
+        job.start()
+    return True
+
+# --- Issues de Quadros (board -> filtro -> JQL) ---
+# {(conexão, 'board' | 'filter', id): (instante, valor)}: o filtro de cada quadro e a JQL de cada filtro
+_BOARD_FILTER_CACHE = {}
+_BOARD_FILTER_CACHE_LOCK = threading.Lock()
+_ORDER_BY_RE = re.compile(r'\s+ORDER\s+BY\s+.*$', re.IGNORECASE | re.DOTALL)
+
+def _cached_board_lookup(jira_client, kind, item_id, loader):
+    key = (connection_key(jira_client), kind, str(item_id))
+    with _BOARD_FILTER_CACHE_LOCK:
+        cached = _BOARD_FILTER_CACHE.get(key)
+        if cached and time.monotonic() - cached[0] < JIRA_BOARD_FILTER_TTL_SECONDS:
+            return cached[1]
+    value = loader() # As falhas não ficam em cache
+    with _BOARD_FILTER_CACHE_LOCK:
+        _BOARD_FILTER_CACHE[key] = (time.monotonic(), value)
+    return value
+
+def get_board_filter_id(jira_client, board_id):
+    """ID do filtro de um quadro (da configuração Agile do quadro), ou None se não tiver filtro."""
+    def load():
+        # A API Agile fica em /rest/agile/1.0/... e não dentro de /api/2: monta-se a URL manualmente
+        url = f"{jira_client._options['server'].rstrip('/')}/rest/agile/1.0/board/{board_id}/configuration"
+        response = get_client_http_session(jira_client).get(url)
+        response.raise_for_status()
+        return (response.json().get('filter') or {}).get('id')
+    return _cached_board_lookup(jira_client, 'board', board_id, load)
+
+def get_filter_jql(jira_client, filter_id):
+    """JQL de um filtro guardado do Jira."""
+    return _cached_board_lookup(jira_client, 'filter', filter_id, lambda: jira_client.filter(filter_id).jql)
+
+def resolve_board_jql(jira_client, board_id):
+    """
+    Devolve `(chave_do_conjunto, jql)` das issues de um quadro.
+
+    A resolução quadro -> filtro -> JQL fica em cache por conexão durante
+    `JIRA_BOARD_FILTER_TTL_SECONDS`. Quadros com o mesmo filtro partilham a
+    chave "filter:<id>" e, com ela, o mesmo conjunto sincronizado.
+    """
     try:
-        # 1. Construir a URL correta manualmente para evitar o erro "/api/2/"
-        # A API Agile fica em /rest/agile/1.0/... e não dentro de /api/2
-        base_url = jira_client._options['server'].rstrip('/')
-        url = f"{base_url}/rest/agile/1.0/board/{board_id}/configuration"
-        
-        # 2. Fazer a requisição direta usando a sessão já autenticada do cliente
-        # Isso evita que a biblioteca altere a URL
-        response = jira_client._session.get(url)
-        
-        # Verifica se a requisição funcionou
-        if response.status_code == 200:
-            data = response.json()
-            
-            # 3. Extrair o ID do filtro da configuração
-            if 'filter' in data and 'id' in data['filter']:
-                filter_id = data['filter']['id']
-                
-                # 4. Buscar a JQL do filtro (aqui podemos usar o método padrão)
-                filter_obj = jira_client.filter(filter_id)
-                jql = filter_obj.jql
-                
-                # (Boa prática) Garantir ordenação
-                if "order by" not in jql.lower():
-                    jql += " ORDER BY created DESC"
-            else:
-                # Se não tiver filtro (raro), usa fallback
-                print(f"Aviso: Quadro {board_id} sem filtro configurado.")
-                jql = f"board = {board_id}"
-        else:
-            # Se a API Agile falhar (ex: permissão), usa fallback
-            print(f"Aviso: Falha na API Agile (Status {response.status_code}). Usando fallback.")
-            jql = f"board = {board_id}"
-            
+        filter_id = get_board_filter_id(jira_client, board_id)
+        if filter_id is not None:
+            return f"filter:{filter_id}", get_filter_jql(jira_client, filter_id)
+        print(f"Aviso: Quadro {board_id} sem filtro configurado.")
     except Exception as e:
-        # Em último caso, usa a JQL simples
+        # Ex.: sem permissão na API Agile
         st.warning(f"Não foi possível obter o filtro avançado do quadro. Usando método simplificado. Erro: {e}")
-        jql = f"board = {board_id}"
-    # --- FIM DA CORREÇÃO ---
-
-    fields = [
-        'summary', 'status', 'issuetype', 'created', 
-        'resolutiondate', 'assignee', 'reporter', 'priority', 
-        'components', 'labels', 'project'
-    ]
-    
-    if extra_fields:
-        for field in extra_fields:
-            if field not in fields:
-                fields.append(field)
-                
+    return f"board:{board_id}", f"board = {board_id}"
+
+def get_issues_by_board(jira_client: JIRA, board_id: str, extra_fields: list = None):
+    """
+    Busca as issues de um quadro (as do seu filtro) pela mesma sincronização
+    incremental dos projetos: só as alterações são pedidas ao Jira.
+    """
+    scope_key, jql = resolve_board_jql(jira_client, board_id)
+    fields, expand = plan_issue_fields(['forecast_burnup'], extra_fields)
+    base_jql = f"({_ORDER_BY_RE.sub('', jql)})"
+
     try:
-        return jira_client.search_issues(
-            jql, 
-            fields=fields, 
-            maxResults=False, 
-            expand="changelog" 
-        )
-    except JIRAError as e:
-        st.error(f"Erro ao executar a busca de issues: {e.text}")
+        # A JQL do filtro identifica o conjunto: se o filtro mudar, é sincronizado de novo
+        return _sync_scope_issues(jira_client, scope_key, base_jql, fields, jql, expand, "jira")
+    except Exception as e:
+        st.error(f"Erro ao executar a busca de issues: {getattr(e, 'text', None) or e}")
         return []
-        
+
 @st.cache_data(ttl=3600)
 def get_project_issue_types(_jira_client, project_key):
     """Busca os objetos de tipos de issues disponíveis para um projeto, excluindo sub-tarefas."""
@@ -428,7 +1135,6 @@ def get_project_issue_types(_jira_client, project_key):
         st.error(f"Erro ao buscar tipos de issue para o projeto {project_key}: {e}")
         return []
     
-@st.cache_data(ttl=600)
 def get_jira_statuses(_jira_client: JIRA, project_key: str):
     """
     Busca TODOS os status disponíveis na instância Jira
@@ -438,9 +1144,7 @@ def get_jira_statuses(_jira_client: JIRA, project_key: str):
         # Esta é a chamada de API padrão e mais robusta.
         # Ela busca todos os status, incluindo os globais e os específicos
         # de projetos (como "Done" / "Concluído" do MOJI).
-        all_statuses = _jira_client.statuses()
-        
-        return all_statuses
+        return list(get_jira_metadata(_jira_client).statuses())
         
     except Exception as e:
         st.error(f"Erro fatal ao buscar a lista de status do Jira: {e}")
@@ -458,8 +1162,7 @@ def get_issue(jira_client, issue_key):
 def get_issue_as_dict(jira_client, issue_key):
     """Busca uma única issue no Jira e converte todos os seus campos num dicionário."""
     try:
-        all_fields = jira_client.fields()
-        field_map = {field['id']: field['name'] for field in all_fields}
+        metadata = get_jira_metadata(jira_client)
         issue = jira_client.issue(issue_key)
         issue_data = {}
         for field_id in issue.raw['fields']:
@@ -482,25 +1185,23 @@ def get_issue_as_dict(jira_client, issue_key):
                 cleaned_value = field_value.displayName
             else:
                 cleaned_value = str(field_value)
-            friendly_name = field_map.get(field_id, field_id)
+            friendly_name = metadata.field_name(field_id, field_id)
             issue_data[friendly_name] = cleaned_value
         return issue_data
     except Exception as e:
         print(f"Erro ao buscar ou processar a issue '{issue_key}': {e}")
         raise e
 
-@st.cache_data(ttl=3600, show_spinner="A obter os status do Jira...")
 def get_statuses(_jira_client):
     try:
-        return _jira_client.statuses()
+        return list(get_jira_metadata(_jira_client).statuses())
     except Exception as e:
         st.error(f"Erro ao buscar os status: {e}")
         return []
 
-@st.cache_data(ttl=3600, show_spinner="A obter os tipos de issue do Jira...")
 def get_issue_types(_jira_client):
     try:
-        return _jira_client.issue_types()
+        return list(get_jira_metadata(_jira_client).issue_types())
     except Exception as e:
         st.error(f"Erro ao buscar os tipos de issue: {e}")
         return []
@@ -508,7 +1209,7 @@ def get_issue_types(_jira_client):
 def get_priorities(_jira_client):
     """Busca todas as prioridades disponíveis na instância Jira, com tratamento de erro aprimorado."""
     try:
-        return _jira_client.priorities()
+        return list(get_jira_metadata(_jira_client).priorities())
     except JIRAError as e:
         # Verifica se o erro é especificamente de autenticação (401)
         if e.status_code == 401:
@@ -530,10 +1231,9 @@ def get_priorities(_jira_client):
         st.error(f"Ocorreu um erro inesperado ao buscar as prioridades: {e}")
         return []
     
-@st.cache_data(ttl=3600, show_spinner="A carregar todos os campos do Jira...")
 def get_all_jira_fields(_jira_client):
     try:
-        all_fields = _jira_client.fields()
+        all_fields = get_jira_metadata(_jira_client).fields()
         return [
             {'id': field['id'], 'name': field['name'], 'custom': field['custom'],
              'type': field.get('schema', {}).get('type', 'Desconhecido')}
@@ -547,7 +1247,7 @@ def get_all_jira_fields(_jira_client):
 def get_jira_client(server, user, api_token):
     """Cria e armazena em cache um cliente JIRA."""
     try:
-        return JIRA(server=server, basic_auth=(user, api_token))
+        return attach_pool_to_client(JIRA(server=server, basic_auth=(user, api_token)))
     except Exception as e:
         st.error(f"Falha ao conectar ao Jira: {e}")
         return None
@@ -559,24 +1259,73 @@ def get_issue_count(jira_client, jql):
     except Exception as e:
         return str(e)
 
-@st.cache_data(ttl=86400, show_spinner="A carregar metadados dos campos do Jira...")
 def get_jira_fields(_client):
     """Retorna uma lista de todos os campos (padrão e customizados) do Jira."""
     try:
-        return _client.fields()
+        return list(get_jira_metadata(_client).fields())
     except Exception as e:
         st.error(f"Não foi possível carregar os campos do Jira: {e}")
         return []
 
+# --- Contagens de JQL (indicadores) ---
+# {(conexão, jql): (instante, contagem)}; só as contagens bem-sucedidas ficam em cache
+_JQL_COUNT_CACHE = {}
+_JQL_COUNT_CACHE_LOCK = threading.Lock()
+
+def _count_jql(jira_client, jql):
+    """Conta as issues de uma JQL com /search/approximate-count (Cloud) ou, se não existir, com /search e maxResults=0."""
+    server_url = jira_client._options['server'].rstrip('/')
+    headers = {"Accept": "application/json", "Content-Type": "application/json"}
+    response = get_client_http_session(jira_client).post(
+        f"{server_url}/rest/api/3/search/approximate-count", data=json.dumps({"jql": jql}), headers=headers
+    )
+    if response.status_code in (404, 405):
+        # Jira Server/Data Center: só o total da busca, sem issues
+        return _search_issues_page(jira_client, jql, ['key'], 0, 0).get('total', 0)
+    response.raise_for_status()
+    return response.json().get('count', 0)
+
+def get_jql_issue_counts(_client, jqls, max_workers=JIRA_FETCH_MAX_WORKERS):
+    """
+    Conta várias JQL de uma vez, em paralelo, e devolve {jql: contagem}.
+
+    As contagens ficam em cache por conexão e JQL durante
+    `JIRA_JQL_COUNT_TTL_SECONDS`; as JQL com erro devolvem a mensagem
+    ("Erro na JQL: ...") e voltam a ser tentadas no pedido seguinte.
+    """
+    jqls = [jql for jql in dict.fromkeys(jqls) if jql and jql.strip()]
+    conn = connection_key(_client)
+    now = time.monotonic()
+    counts, missing = {}, []
+    with _JQL_COUNT_CACHE_LOCK:
+        for jql in jqls:
+            cached = _JQL_COUNT_CACHE.get((conn, jql))
+            if cached and now - cached[0] < JIRA_JQL_COUNT_TTL_SECONDS:
+                counts[jql] = cached[1]
+            else:
+                missing.append(jql)
+
+    def count(jql):
+        try:
+            return _count_jql(_client, jql)
+        except Exception as e:
+            return f"Erro na JQL: {e}"
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(missing)))) as executor:
+            results = dict(zip(missing, executor.map(with_request_priority(count), missing)))
+        with _JQL_COUNT_CACHE_LOCK:
+            for jql, result in results.items():
+                if isinstance(result, int):
+                    _JQL_COUNT_CACHE[(conn, jql)] = (time.monotonic(), result)
+        counts.update(results)
+    return counts
+
 def get_jql_issue_count(_client, jql):
     """Executa uma consulta JQL e retorna apenas a contagem de resultados."""
     if not jql:
         return 0
-    try:
-        search_result = _client.search_issues(jql, maxResults=0)
-        return search_result.total
-    except Exception as e:
-        return f"Erro na JQL: {e}"
+    return get_jql_issue_counts(_client, [jql]).get(jql, 0)
     
 def validate_jira_connection(jira_client):
     """
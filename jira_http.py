@@ -0,0 +1,284 @@
+# jira_http.py
+
+"""
+Cliente HTTP partilhado para as chamadas REST diretas ao Jira.
+
+Cada servidor Jira tem um único pool de ligações keep-alive (`HTTPAdapter`),
+usado tanto pelas sessões deste módulo como pela sessão interna do cliente
+`jira.JIRA`. Assim, as páginas de busca, as chamadas à API Agile e a criação
+de issues reutilizam as mesmas ligações TLS em vez de abrirem uma nova por
+pedido.
+
+Por baixo desse adaptador fica o agendador de pedidos do servidor: um token
+bucket ajustado pelos cabeçalhos `X-RateLimit-*` do Jira Cloud, que respeita
+`Retry-After`, repete pedidos recusados (429/503) com backoff exponencial e
+jitter, e serve primeiro os pedidos de maior prioridade (páginas interativas
+antes de atualizações em segundo plano).
+"""
+
+import heapq
+import itertools
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import (
+    JIRA_HTTP_POOL_SIZE, JIRA_HTTP_CONNECT_TIMEOUT, JIRA_HTTP_READ_TIMEOUT,
+    JIRA_RATE_LIMIT_PER_SECOND, JIRA_RATE_LIMIT_BURST,
+    JIRA_HTTP_MAX_RETRIES, JIRA_HTTP_BACKOFF_SECONDS, JIRA_HTTP_MAX_BACKOFF_SECONDS
+)
+
+# --- Prioridade dos Pedidos ---
+# Valores menores são servidos primeiro.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+_request_priority = ContextVar('jira_request_priority', default=PRIORITY_INTERACTIVE)
+
+_RETRY_STATUS_CODES = {429, 503}
+
+
+@contextmanager
+def request_priority(priority):
+    """Define a prioridade dos pedidos ao Jira feitos dentro do bloco (na thread atual)."""
+    token = _request_priority.set(priority)
+    try:
+        yield
+    finally:
+        _request_priority.reset(token)
+
+
+def get_request_priority():
+    return _request_priority.get()
+
+
+def with_request_priority(fn):
+    """
+    Propaga a prioridade atual para `fn` quando esta corre noutra thread
+    (ex.: `ThreadPoolExecutor`, que não herda o contexto de quem submete).
+    """
+    priority = get_request_priority()
+
+    def wrapper(*args, **kwargs):
+        with request_priority(priority):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def _parse_retry_after(value):
+    """Converte o cabeçalho Retry-After (segundos ou data HTTP) em segundos de espera."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RequestScheduler:
+    """
+    Token bucket com fila de prioridade, partilhado por todos os pedidos a um servidor Jira.
+
+    Cada pedido consome um token; quem está à espera é servido por ordem de
+    prioridade e, dentro da mesma prioridade, por ordem de chegada. Um 429
+    (ou `Retry-After`) suspende o servidor inteiro durante o tempo indicado.
+    """
+
+    def __init__(self, rate=JIRA_RATE_LIMIT_PER_SECOND, burst=JIRA_RATE_LIMIT_BURST):
+        self.rate = float(rate)
+        self.capacity = float(burst)
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def acquire(self, priority=PRIORITY_INTERACTIVE):
+        """Bloqueia até haver um token livre para este pedido, respeitando a prioridade."""
+        with self._condition:
+            ticket = (priority, next(self._sequence))
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    timeout = None # Quem não está à frente da fila espera ser notificado
+                    if self._waiting[0] == ticket:
+                        timeout = self._blocked_until - now
+                        if timeout <= 0:
+                            if self._tokens >= 1:
+                                self._tokens -= 1
+                                return
+                            timeout = (1 - self._tokens) / self.rate
+                    self._condition.wait(timeout=timeout)
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._condition.notify_all()
+
+    def block_for(self, seconds):
+        """
+        Suspende todos os pedidos ao servidor durante `seconds` (429 / Retry-After).
+
+        Devolve True se abriu uma nova pausa (não havia nenhuma em curso).
+        """
+        with self._condition:
+            now = time.monotonic()
+            started = self._blocked_until <= now
+            self._blocked_until = max(self._blocked_until, now + seconds)
+            self._refill(now)
+            self._tokens = 0.0
+            self._condition.notify_all()
+            return started
+
+    def observe(self, response):
+        """Ajusta o bucket aos cabeçalhos de limite de taxa devolvidos pelo Jira."""
+        headers = response.headers
+        with self._condition:
+            try:
+                limit = headers.get('X-RateLimit-Limit')
+                if limit:
+                    self.capacity = max(1.0, float(limit))
+                fill_rate = headers.get('X-RateLimit-FillRate')
+                interval = headers.get('X-RateLimit-Interval-Seconds')
+                if fill_rate:
+                    self.rate = max(0.1, float(fill_rate) / max(1.0, float(interval or 1)))
+                remaining = headers.get('X-RateLimit-Remaining')
+                if remaining is not None:
+                    self._refill(time.monotonic())
+                    self._tokens = min(self._tokens, float(remaining))
+            except ValueError:
+                pass # Cabeçalho inesperado: mantém os valores atuais
+            self._condition.notify_all()
+
+
+class ScheduledAdapter(HTTPAdapter):
+    """Adaptador HTTP que passa cada pedido pelo agendador do servidor e repete 429/503."""
+
+    def __init__(self, scheduler, max_retries_on_limit=JIRA_HTTP_MAX_RETRIES, **kwargs):
+        self.scheduler = scheduler
+        self.max_retries_on_limit = max_retries_on_limit
+        super().__init__(**kwargs)
+
+    def _retry_delay(self, response, attempt):
+        retry_after = _parse_retry_after(response.headers.get('Retry-After'))
+        if retry_after is not None:
+            # Pequeno jitter para que os pedidos em espera não voltem todos ao mesmo tempo
+            return retry_after + random.uniform(0, JIRA_HTTP_BACKOFF_SECONDS)
+        # Backoff exponencial com "full jitter"
+        return random.uniform(0, min(JIRA_HTTP_MAX_BACKOFF_SECONDS, JIRA_HTTP_BACKOFF_SECONDS * 2 ** attempt))
+
+    def _should_retry(self, response, attempt):
+        if response.status_code not in _RETRY_STATUS_CODES or attempt >= self.max_retries_on_limit:
+            return False
+        # Um 503 sem Retry-After só se repete em pedidos de leitura
+        return response.status_code == 429 or 'Retry-After' in response.headers or response.request.method == 'GET'
+
+    def send(self, request, **kwargs):
+        priority = get_request_priority()
+        attempt = 0
+        while True:
+            self.scheduler.acquire(priority)
+            response = super().send(request, **kwargs)
+            self.scheduler.observe(response)
+            if not self._should_retry(response, attempt):
+                if response.status_code in _RETRY_STATUS_CODES and attempt >= self.max_retries_on_limit:
+                    print(f"Aviso: Jira devolveu {response.status_code} para {request.url} após {attempt} novas tentativas.")
+                return response
+            delay = self._retry_delay(response, attempt)
+            # Com limitação prolongada há muitos pedidos a repetir: só se avisa uma vez por pausa
+            if self.scheduler.block_for(delay):
+                print(f"Aviso: Jira devolveu {response.status_code}; pedidos ao servidor em pausa durante {delay:.1f}s.")
+            response.close()
+            attempt += 1
+
+
+_ADAPTERS = {}
+_ADAPTERS_LOCK = threading.Lock()
+
+
+def _normalize_server_url(server_url):
+    return (server_url or '').rstrip('/')
+
+
+def get_jira_adapter(server_url):
+    """Devolve o adaptador (pool de ligações + agendador) partilhado de um servidor Jira."""
+    server_url = _normalize_server_url(server_url)
+    with _ADAPTERS_LOCK:
+        adapter = _ADAPTERS.get(server_url)
+        if adapter is None:
+            adapter = ScheduledAdapter(RequestScheduler(), pool_connections=1, pool_maxsize=JIRA_HTTP_POOL_SIZE)
+            _ADAPTERS[server_url] = adapter
+        return adapter
+
+
+class JiraHttpSession(requests.Session):
+    """
+    Sessão `requests` ligada a um servidor Jira: aceita caminhos relativos
+    ("/rest/api/3/search"), pede respostas comprimidas e aplica timeouts
+    por omissão.
+    """
+
+    def __init__(self, server_url, auth=None):
+        super().__init__()
+        self.server_url = _normalize_server_url(server_url)
+        self.auth = auth
+        self.headers.update({"Accept": "application/json", "Accept-Encoding": "gzip, deflate"})
+        self.mount(self.server_url, get_jira_adapter(self.server_url))
+
+    def request(self, method, url, **kwargs):
+        if not url.startswith(('http://', 'https://')):
+            url = f"{self.server_url}/{url.lstrip('/')}"
+        kwargs.setdefault('timeout', (JIRA_HTTP_CONNECT_TIMEOUT, JIRA_HTTP_READ_TIMEOUT))
+        return super().request(method, url, **kwargs)
+
+
+@lru_cache(maxsize=32)
+def get_jira_http_session(server_url, user_email, api_token):
+    """Devolve a sessão HTTP partilhada de uma conexão Jira (servidor + credenciais)."""
+    return JiraHttpSession(server_url, auth=(user_email, api_token))
+
+
+def get_client_http_session(jira_client):
+    """Devolve a sessão HTTP partilhada correspondente a um cliente `jira.JIRA` já autenticado."""
+    server_url = jira_client._options['server']
+    auth = getattr(jira_client._session, 'auth', None)
+    if isinstance(auth, tuple) and len(auth) == 2:
+        return get_jira_http_session(_normalize_server_url(server_url), auth[0], auth[1])
+    # Autenticação que não é básica (OAuth, PAT...): usa a própria sessão do cliente
+    return jira_client._session
+
+
+def connection_key(jira_client):
+    """Identifica a conexão Jira de um cliente (servidor + utilizador da API)."""
+    auth = getattr(jira_client._session, 'auth', None)
+    user = auth[0] if isinstance(auth, tuple) and auth else None
+    return (jira_client._options['server'].rstrip('/'), user)
+
+
+def attach_pool_to_client(jira_client):
+    """
+    Faz com que a sessão interna do cliente `jira.JIRA` use o pool e o
+    agendador partilhados do servidor, para que também as chamadas da
+    biblioteca respeitem os limites de taxa.
+    """
+    server_url = _normalize_server_url(jira_client._options['server'])
+    jira_client._session.mount(server_url, get_jira_adapter(server_url))
+    return jira_client
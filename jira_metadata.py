@@ -0,0 +1,197 @@
+# jira_metadata.py
+
+"""
+Registo partilhado dos metadados de cada conexão Jira: campos, status,
+prioridades, tipos de issue e status por projeto.
+
+Cada lista é buscada uma única vez por conexão e indexada por ID e por nome,
+para que as consultas (validar um campo, encontrar o campo Sprint, traduzir um
+ID de status) sejam O(1) em vez de percorrerem a lista a cada chamada.
+
+Quando um metadado fica mais antigo do que `JIRA_METADATA_REFRESH_SECONDS`,
+continua a ser servido enquanto uma thread em segundo plano (com prioridade
+`PRIORITY_BACKGROUND`) o volta a buscar; os índices só são reconstruídos se o
+conteúdo tiver mudado.
+"""
+
+import hashlib
+import json
+import threading
+import time
+
+from config import JIRA_METADATA_REFRESH_SECONDS
+from jira_http import PRIORITY_BACKGROUND, connection_key, request_priority
+
+SPRINT_FIELD_CUSTOM_TYPE = 'com.pyxis.greenhopper.jira:gh-sprint'
+
+
+def _read(item, name, default=None):
+    """Lê um atributo de um dicionário JSON ou de um recurso `jira` (Status, Priority...)."""
+    if isinstance(item, dict):
+        return item.get(name, default)
+    return getattr(item, name, default)
+
+
+def _raw_json(item):
+    return item if isinstance(item, dict) else getattr(item, 'raw', str(item))
+
+
+class MetadataIndex:
+    """Lista de metadados com índices por ID, por nome (sem distinguir maiúsculas) e, nos campos, por tipo customizado."""
+
+    __slots__ = ('items', 'by_id', 'by_name', 'by_custom_type')
+
+    def __init__(self, items):
+        self.items = list(items)
+        self.by_id = {}
+        self.by_name = {}
+        self.by_custom_type = {}
+        for item in self.items:
+            item_id, name = _read(item, 'id'), _read(item, 'name')
+            if item_id is not None:
+                self.by_id.setdefault(str(item_id), item)
+            if name:
+                self.by_name.setdefault(str(name).lower(), item)
+            custom_type = (_read(item, 'schema') or {}).get('custom') if isinstance(item, dict) else None
+            if custom_type:
+                self.by_custom_type.setdefault(custom_type, item)
+
+    def get(self, id_or_name):
+        """Procura primeiro por ID e depois por nome. Devolve None se não existir."""
+        if id_or_name is None:
+            return None
+        key = str(id_or_name)
+        return self.by_id.get(key) or self.by_name.get(key.lower())
+
+
+class JiraMetadata:
+    """Metadados de uma conexão Jira, carregados a pedido e atualizados em segundo plano."""
+
+    def __init__(self, jira_client, refresh_seconds=JIRA_METADATA_REFRESH_SECONDS):
+        self.client = jira_client
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    # --- Carregamento ---
+
+    def _entry(self, name):
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                entry = {'index': None, 'digest': None, 'loaded_at': None, 'refreshing': False, 'load_lock': threading.Lock()}
+                self._entries[name] = entry
+            return entry
+
+    def _get(self, name, loader):
+        entry = self._entry(name)
+        if entry['loaded_at'] is None:
+            # Primeira utilização: carrega já (as threads concorrentes esperam pelo mesmo pedido)
+            with entry['load_lock']:
+                if entry['loaded_at'] is None:
+                    self._load(entry, loader)
+        elif time.monotonic() - entry['loaded_at'] >= self.refresh_seconds:
+            self._refresh_in_background(name, entry, loader)
+        return entry['index']
+
+    def _load(self, entry, loader):
+        items = list(loader())
+        digest = hashlib.sha1(
+            json.dumps([_raw_json(item) for item in items], sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()
+        if digest != entry['digest']:
+            entry['index'] = MetadataIndex(items)
+            entry['digest'] = digest
+        entry['loaded_at'] = time.monotonic()
+
+    def _refresh_in_background(self, name, entry, loader):
+        with self._lock:
+            if entry['refreshing']:
+                return
+            entry['refreshing'] = True
+
+        def refresh():
+            try:
+                with request_priority(PRIORITY_BACKGROUND), entry['load_lock']:
+                    self._load(entry, loader)
+            except Exception as e:
+                # Mantém os dados anteriores; volta a tentar na próxima utilização
+                print(f"Aviso: não foi possível atualizar os metadados '{name}' do Jira: {e}")
+            finally:
+                entry['refreshing'] = False
+
+        threading.Thread(target=refresh, name=f"jira-metadata-{name}", daemon=True).start()
+
+    def invalidate(self, name=None):
+        """Força uma nova busca na próxima utilização (de um metadado ou de todos)."""
+        with self._lock:
+            entries = [self._entries[name]] if name in self._entries else ([] if name else list(self._entries.values()))
+        for entry in entries:
+            entry['loaded_at'] = None
+
+    # --- Campos ---
+
+    def fields(self):
+        """Lista de todos os campos (padrão e customizados), como devolvida por `/field`."""
+        return self._get('fields', self.client.fields).items
+
+    def field(self, id_or_name):
+        """Devolve o campo com o ID (ex.: 'customfield_10016') ou o nome indicado, ou None."""
+        return self._get('fields', self.client.fields).get(id_or_name)
+
+    def field_ids(self):
+        """Conjunto (indexado) dos IDs de todos os campos."""
+        return self._get('fields', self.client.fields).by_id.keys()
+
+    def field_name(self, field_id, default=None):
+        field = self._get('fields', self.client.fields).by_id.get(str(field_id))
+        return field['name'] if field else default
+
+    def field_id_for_custom_type(self, custom_type):
+        """Devolve o ID do primeiro campo customizado do tipo indicado (ex.: o campo Sprint)."""
+        field = self._get('fields', self.client.fields).by_custom_type.get(custom_type)
+        return field['id'] if field else None
+
+    # --- Status, Prioridades e Tipos de Issue ---
+
+    def statuses(self):
+        return self._get('statuses', self.client.statuses).items
+
+    def status(self, id_or_name):
+        return self._get('statuses', self.client.statuses).get(id_or_name)
+
+    def priorities(self):
+        return self._get('priorities', self.client.priorities).items
+
+    def issue_types(self):
+        return self._get('issue_types', self.client.issue_types).items
+
+    def project_statuses(self, project_key):
+        """
+        Status usados pelos fluxos de trabalho de um projeto (sem repetições),
+        como dicionários JSON de `/project/{chave}/statuses`.
+        """
+        def load():
+            statuses = {}
+            for issue_type in self.client._get_json(f'project/{project_key}/statuses'):
+                for status in issue_type.get('statuses', []):
+                    statuses.setdefault(status['id'], status)
+            return statuses.values()
+
+        return self._get(f'project_statuses:{project_key}', load).items
+
+
+_REGISTRY = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_jira_metadata(jira_client):
+    """Devolve o registo de metadados partilhado pela conexão do cliente (servidor + utilizador)."""
+    key = connection_key(jira_client)
+    with _REGISTRY_LOCK:
+        metadata = _REGISTRY.get(key)
+        if metadata is None:
+            metadata = _REGISTRY[key] = JiraMetadata(jira_client)
+        else:
+            metadata.client = jira_client # Usa sempre o cliente mais recente da conexão
+        return metadata
@@ -7,12 +7,18 @@ import numpy as np
 from sklearn.linear_model import LinearRegression
 from datetime import datetime, timedelta
 import plotly.graph_objects as go
-from config import DEFAULT_INITIAL_STATES, DEFAULT_DONE_STATES
+from config import DEFAULT_INITIAL_STATES, DEFAULT_DONE_STATES, TIME_IN_STATUS_PERCENTILE
 from security import *
 from datetime import datetime, timedelta, date, timezone
 from typing import Optional, List, Dict, Any
 import calendar # Adiciona calendar para dias úteis
+import warnings
 from collections import defaultdict # Para agregar as médias
+from issue_records import (
+    get_field, get_fields, get_histories, iter_status_changes,
+    build_status_transitions, get_dataset_transitions, shared_status_transitions,
+    parse_jira_timestamps
+)
 
 st.cache_data.clear()
 
@@ -106,10 +112,13 @@ def _calculate_business_time_in_minutes(start_dt: datetime, end_dt: datetime) ->
     return business_seconds / 60.0 # Retorna em minutos
 
 
-def calculate_priority_sla_metrics(issues: List[Any], project_config: Dict[str, Any]) -> Dict[str, Any]:
+def calculate_priority_sla_metrics(issues: List[Any], project_config: Dict[str, Any], transitions: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
     """
     Calcula as métricas de SLA (Service Level Agreement) de Resposta e Resolução
     baseadas na prioridade da issue.
+
+    As datas de conclusão e de início do ciclo vêm da tabela de transições
+    (`transitions`, ou construída para estas issues).
     """
     if not issues:
         # Retorna estrutura vazia segura se não houver issues
@@ -139,7 +148,12 @@ def calculate_priority_sla_metrics(issues: List[Any], project_config: Dict[str,
     # As regras de mapeamento do Jira são necessárias
     status_mapping = project_config.get('status_mapping', {})
 
-    for issue in issues:
+    issue_dates = get_issue_dates(issues, project_config, transitions)
+    issue_keys = [issue.key for issue in issues]
+    completion_dates = _to_datetime_list(issue_dates['completion_date'], issue_keys)
+    cycle_start_dates = _to_datetime_list(issue_dates['start_date'], issue_keys)
+
+    for issue, completion_date, cycle_start_date in zip(issues, completion_dates, cycle_start_dates):
         priority_obj = getattr(issue.fields, 'priority', None)
         if not priority_obj: continue
 
@@ -183,14 +197,11 @@ def calculate_priority_sla_metrics(issues: List[Any], project_config: Dict[str,
             response_status = "Pendente/N/A"
         
         # --- CÁLCULO DO TEMPO DE RESOLUÇÃO (Cycle Time) ---
-        completion_date = find_completion_date(issue, project_config)
         time_to_resolution_hours = None
         resolution_status = "Pendente/N/A"
         
         if completion_date:
-            # O Cycle Time começa quando sai do 'Initial' (função find_start_date)
-            cycle_start_date = find_start_date(issue, project_config)
-            
+            # O Cycle Time começa quando sai do 'Initial' (ver find_start_date)
             if cycle_start_date:
                 # Usa o cálculo simplificado de Horas Úteis (8h/dia) para a resolução
                 time_to_resolution_hours = calculate_business_hours(cycle_start_date, completion_date)
@@ -283,10 +294,11 @@ def find_completion_date(issue: Any, project_config: Dict[str, Any]) -> Optional
           última transição PARA um status final.
        c. Se não encontrar, usa 'updated' (última atualização) como fallback.
        
-    Todas as datas são padronizadas para UTC-naive.
+    Todas as datas são padronizadas para UTC-naive. Lê o JSON da issue
+    diretamente, pelo que aceita `jira.Issue` ou `RawIssue`.
 
     Args:
-        issue: O objeto 'issue' COMPLETO da biblioteca jira-python.
+        issue: O objeto 'issue' COMPLETO (`jira.Issue` ou `RawIssue`).
         project_config: O dicionário de configuração do projeto.
 
     Returns:
@@ -312,9 +324,8 @@ def find_completion_date(issue: Any, project_config: Dict[str, Any]) -> Optional
         return None
 
     # 2. VERIFICAÇÃO PRINCIPAL: O status ATUAL é um status final?
-    try:
-        current_status_id = issue.fields.status.id
-    except Exception:
+    current_status_id = get_field(issue, 'status', 'id')
+    if current_status_id is None:
         return None # Issue mal formada
 
     if current_status_id not in done_ids:
@@ -326,7 +337,7 @@ def find_completion_date(issue: Any, project_config: Dict[str, Any]) -> Optional
     
     # Método A: Usar 'resolutiondate' (O mais fiável)
     try:
-        resolution_timestamp_str = issue.fields.resolutiondate
+        resolution_timestamp_str = get_field(issue, 'resolutiondate')
         if resolution_timestamp_str:
             parsed_date = dateutil.parser.parse(resolution_timestamp_str)
             utc_naive_date = parsed_date.astimezone(timezone.utc).replace(tzinfo=None)
@@ -335,23 +346,21 @@ def find_completion_date(issue: Any, project_config: Dict[str, Any]) -> Optional
         pass # resolutiondate falhou ou é None, tenta o Método B
 
     # Método B: Procurar no Histórico (Fallback)
-    if hasattr(issue, 'changelog') and hasattr(issue.changelog, 'histories'):
-        for history in reversed(issue.changelog.histories):
-            if not hasattr(history, 'items'): continue
-            for item in history.items:
-                try:
-                    if item.field == 'status' and item.to in done_ids:
-                        # Encontrou a última transição PARA 'done'
-                        completion_timestamp_str = history.created
-                        parsed_date = dateutil.parser.parse(completion_timestamp_str)
-                        utc_naive_date = parsed_date.astimezone(timezone.utc).replace(tzinfo=None)
-                        return utc_naive_date
-                except AttributeError:
-                    continue 
+    for history in reversed(get_histories(issue)):
+        for item in history.get('items') or []:
+            try:
+                if item.get('field') == 'status' and item.get('to') in done_ids:
+                    # Encontrou a última transição PARA 'done'
+                    completion_timestamp_str = history['created']
+                    parsed_date = dateutil.parser.parse(completion_timestamp_str)
+                    utc_naive_date = parsed_date.astimezone(timezone.utc).replace(tzinfo=None)
+                    return utc_naive_date
+            except (KeyError, TypeError, ValueError):
+                continue 
 
     # Método C: Usar 'updated' (Último recurso)
     try:
-        updated_timestamp_str = issue.fields.updated
+        updated_timestamp_str = get_field(issue, 'updated')
         if updated_timestamp_str:
             parsed_date = dateutil.parser.parse(updated_timestamp_str)
             utc_naive_date = parsed_date.astimezone(timezone.utc).replace(tzinfo=None)
@@ -378,7 +387,7 @@ def find_start_date(issue: Any, project_config: Dict[str, Any]) -> Optional[date
     cálculos consistentes.
 
     Args:
-        issue: O objeto 'issue' da biblioteca jira-python.
+        issue: O objeto 'issue' (`jira.Issue` ou `RawIssue`).
         project_config: O dicionário de configuração do projeto.
 
     Returns:
@@ -404,25 +413,25 @@ def find_start_date(issue: Any, project_config: Dict[str, Any]) -> Optional[date
     # 2. Iterar pelo histórico em ordem CRONOLÓGICA (do mais antigo para o mais novo)
     try:
         # 'sorted' garante que estamos iterando do mais antigo para o mais novo
-        for history in sorted(issue.changelog.histories, key=lambda h: h.created):
-            for item in history.items:
-                if item.field == 'status':
+        for history in sorted(get_histories(issue), key=lambda h: h['created']):
+            for item in history.get('items') or []:
+                if item.get('field') == 'status':
                     # IDs do status anterior (from_) e do novo status (to)
-                    from_id = getattr(item, 'from', None) # ID antigo
-                    to_id = getattr(item, 'to', None)     # ID novo
+                    from_id = item.get('from') # ID antigo
+                    to_id = item.get('to')     # ID novo
 
                     # 3. Verifica se a transição foi de INICIAL para NÃO-INICIAL
                     if from_id in initial_ids and to_id not in initial_ids:
                         
                         # ENCONTRADO! Esta é a data de início do ciclo.
-                        start_timestamp_str = history.created
+                        start_timestamp_str = history['created']
                         
                         # 4. Padroniza a data para UTC-naive (igual à find_completion_date)
                         parsed_date = dateutil.parser.parse(start_timestamp_str)
                         utc_naive_date = parsed_date.astimezone(timezone.utc).replace(tzinfo=None)
                         return utc_naive_date
                         
-    except AttributeError:
+    except (KeyError, AttributeError):
         # Ignora itens de histórico mal formados
         pass
     except Exception as e:
@@ -433,11 +442,11 @@ def find_start_date(issue: Any, project_config: Dict[str, Any]) -> Optional[date
     #    Verifica o status ATUAL.
     try:
         # Padroniza a data de criação (caso ela seja usada)
-        created_timestamp_str = issue.fields.created
+        created_timestamp_str = get_field(issue, 'created')
         parsed_created_date = dateutil.parser.parse(created_timestamp_str)
         created_date_utc_naive = parsed_created_date.astimezone(timezone.utc).replace(tzinfo=None)
 
-        current_status_id = issue.fields.status.id
+        current_status_id = get_field(issue, 'status', 'id')
 
         # Se o status ATUAL *não* é inicial, significa que a issue
         # foi criada diretamente em "Em Andamento".
@@ -506,41 +515,31 @@ def calculate_cycle_time(issue: Any, completion_date: Optional[datetime], projec
     first_start_date = None
     start_dates = []
     
-    if hasattr(issue.changelog, 'histories'):
-        # Itera em ordem cronológica (do mais antigo para o mais novo)
-        for history in sorted(issue.changelog.histories, key=lambda h: h.created):
-            for item in history.items:
-                if item.field == 'status':
-                    
-                    # PADRONIZA A DATA: Converte para datetime e torna UTC-naive
-                    history_date_str = history.created
-                    parsed_date = dateutil.parser.parse(history_date_str)
-                    current_history_date = parsed_date.astimezone(timezone.utc).replace(tzinfo=None)
-
-                    if check_logic == "enter_progress":
-                        # Lógica 1: Encontra a primeira vez que ENTROU em um status "in_progress"
-                        to_id = getattr(item, 'to', None)
-                        if to_id in start_ids:
-                            start_dates.append(current_history_date)
-                    
-                    elif check_logic == "exit_initial":
-                        # Lógica 2: Encontra a primeira vez que SAIU de um status "initial"
-                        from_id = getattr(item, 'from', None)
-                        to_id = getattr(item, 'to', None)
-                        if from_id in start_ids and to_id not in start_ids:
-                            start_dates.append(current_history_date)
-        
-        if start_dates:
-            first_start_date = min(start_dates) # Pega a data mais antiga
+    # A ordem não importa aqui: fica-se com a data mais antiga encontrada
+    for history_date_str, item in iter_status_changes(issue):
+        if check_logic == "enter_progress":
+            # Lógica 1: Encontra a primeira vez que ENTROU em um status "in_progress"
+            is_start = item.get('to') in start_ids
+        else:
+            # Lógica 2: Encontra a primeira vez que SAIU de um status "initial"
+            is_start = item.get('from') in start_ids and item.get('to') not in start_ids
+
+        if is_start:
+            # PADRONIZA A DATA: Converte para datetime e torna UTC-naive
+            parsed_date = dateutil.parser.parse(history_date_str)
+            start_dates.append(parsed_date.astimezone(timezone.utc).replace(tzinfo=None))
+
+    if start_dates:
+        first_start_date = min(start_dates) # Pega a data mais antiga
             
     # 4. Fallback para data de criação (se nunca houve transição no histórico)
     if first_start_date is None:
         # PADRONIZA A DATA: Converte a data de criação para UTC-naive
-        created_str = issue.fields.created
+        created_str = get_field(issue, 'created')
         parsed_created = dateutil.parser.parse(created_str)
         created_date_utc_naive = parsed_created.astimezone(timezone.utc).replace(tzinfo=None)
 
-        current_status_id = issue.fields.status.id
+        current_status_id = get_field(issue, 'status', 'id')
 
         # Verifica se a issue já foi criada "em progresso"
         if (check_logic == "enter_progress" and current_status_id in start_ids) or \
@@ -556,6 +555,299 @@ def calculate_cycle_time(issue: Any, completion_date: Optional[datetime], projec
     time_delta = completion_date - first_start_date
     return max(0, time_delta.total_seconds() / (24 * 3600))
 
+# --- Métricas sobre a Tabela de Transições ---
+# Versões por conjunto de issues das funções acima: em vez de percorrer o
+# changelog de cada issue, agrupam a tabela de transições (ver
+# `build_status_transitions`), construída uma vez por conjunto de dados.
+
+def get_status_transitions(issues):
+    """Tabela de transições das issues carregadas, memorizada na sessão enquanto a lista for a mesma."""
+    cached = st.session_state.get('status_transitions_cache')
+    if cached and cached[0] is issues:
+        return cached[1]
+    transitions = shared_status_transitions(issues)
+    st.session_state['status_transitions_cache'] = (issues, transitions)
+    return transitions
+
+def _transitions_for(issues, transitions=None):
+    """Linhas da tabela de transições que dizem respeito às issues (constrói-a se não for dada)."""
+    if transitions is None:
+        transitions = shared_status_transitions(issues)
+    return transitions[transitions['issue_key'].isin({issue.key for issue in issues})]
+
+def _issue_frame(issues):
+    """Status atual e datas de cada issue (uma linha por chave), com as datas convertidas de uma vez."""
+    fields_by_key = {}
+    for issue in issues:
+        fields_by_key.setdefault(issue.key, get_fields(issue))
+    all_fields = list(fields_by_key.values())
+    frame = pd.DataFrame({
+        'status_id': [(fields.get('status') or {}).get('id') for fields in all_fields],
+        'status_name': [(fields.get('status') or {}).get('name') for fields in all_fields],
+    }, index=pd.Index(list(fields_by_key), name='issue_key'))
+    created = [fields.get('created') for fields in all_fields]
+    frame['created'] = parse_jira_timestamps(created).to_numpy()
+    frame['created_utc'] = parse_jira_timestamps(created, utc=True).to_numpy()
+    frame['resolution_utc'] = parse_jira_timestamps([fields.get('resolutiondate') for fields in all_fields], utc=True).to_numpy()
+    frame['updated_utc'] = parse_jira_timestamps([fields.get('updated') for fields in all_fields], utc=True).to_numpy()
+    return frame
+
+def _status_ids(project_config, category):
+    """IDs dos status de uma categoria do mapeamento do projeto ('initial', 'in_progress', 'done')."""
+    status_objects = project_config.get('status_mapping', {}).get(category, [])
+    return {d['id'] for d in status_objects if isinstance(d, dict) and 'id' in d}
+
+def _to_datetime_list(values, keys):
+    """Converte uma série indexada por chave numa lista (pela ordem de `keys`) de `datetime` ou `None`."""
+    return [None if pd.isna(value) else value.to_pydatetime() for value in values.reindex(keys)]
+
+def calculate_completion_dates(issues, project_config, transitions=None):
+    """
+    Datas de conclusão (UTC-naive) de várias issues, pela ordem dada.
+
+    Mesma lógica de `find_completion_date`: só issues num status final, com
+    'resolutiondate', senão a última transição para um status final, senão 'updated'.
+    """
+    keys = [issue.key for issue in issues]
+    done_ids = _status_ids(project_config, 'done')
+    if not keys or not done_ids:
+        return [None] * len(keys)
+
+    frame = _issue_frame(issues)
+    table = _transitions_for(issues, transitions)
+    last_done = (
+        table[table['to_id'].isin(done_ids)]
+        .sort_values('seq', kind='stable')
+        .groupby('issue_key')['timestamp_utc'].last()
+    )
+    completion = frame['resolution_utc'].fillna(last_done.reindex(frame.index)).fillna(frame['updated_utc'])
+    completion = completion.where(frame['status_id'].isin(done_ids))
+    return _to_datetime_list(completion, keys)
+
+def calculate_start_dates(issues, project_config, transitions=None):
+    """
+    Datas de início do ciclo (UTC-naive) de várias issues, pela ordem dada.
+
+    Mesma lógica de `find_start_date`: a primeira saída de um status inicial
+    para um não-inicial; se não houver, a criação, caso o status atual já não seja inicial.
+    """
+    keys = [issue.key for issue in issues]
+    if not keys:
+        return []
+    initial_ids = _status_ids(project_config, 'initial')
+
+    frame = _issue_frame(issues)
+    table = _transitions_for(issues, transitions)
+    exits = table[table['from_id'].isin(initial_ids) & ~table['to_id'].isin(initial_ids)]
+    first_exit = exits.sort_values(['timestamp_utc', 'seq'], kind='stable').groupby('issue_key')['timestamp_utc'].first()
+
+    start = first_exit.reindex(frame.index)
+    start = start.fillna(frame['created_utc'].where(~frame['status_id'].isin(initial_ids)))
+    return _to_datetime_list(start, keys)
+
+def calculate_cycle_times(issues, completion_dates, project_config, transitions=None):
+    """
+    Cycle Time (dias) de várias issues, pela ordem dada, com as datas de
+    conclusão correspondentes (ver `calculate_completion_dates`).
+
+    Mesma lógica de `calculate_cycle_time`: o ciclo começa na primeira entrada
+    num status "in_progress" (ou, sem esse mapeamento, na primeira saída de um
+    status inicial); sem essa transição, na criação, se o status atual o justificar.
+    """
+    keys = [issue.key for issue in issues]
+    if not keys:
+        return []
+
+    in_progress_ids = _status_ids(project_config, 'in_progress')
+    frame = _issue_frame(issues)
+    table = _transitions_for(issues, transitions)
+    if in_progress_ids:
+        start_ids = in_progress_ids
+        is_start = table['to_id'].isin(start_ids)
+        started_at_creation = frame['status_id'].isin(start_ids)
+    else:
+        start_ids = _status_ids(project_config, 'initial')
+        is_start = table['from_id'].isin(start_ids) & ~table['to_id'].isin(start_ids)
+        started_at_creation = ~frame['status_id'].isin(start_ids)
+
+    first_start = table[is_start].groupby('issue_key')['timestamp_utc'].min().reindex(frame.index)
+    first_start = first_start.fillna(frame['created_utc'].where(started_at_creation))
+
+    completion = pd.Series(pd.to_datetime(pd.Series(completion_dates, dtype=object), errors='coerce').to_numpy(), index=keys)
+    cycle_days = ((completion - first_start.reindex(keys)).dt.total_seconds() / (24 * 3600)).clip(lower=0)
+    return [None if pd.isna(days) else float(days) for days in cycle_days]
+
+def _datetime_seconds(values):
+    """Datas (array datetime64) em segundos desde a época, como float (`NaN` para `NaT`)."""
+    values = np.asarray(values, dtype='datetime64[us]')
+    seconds = values.astype('int64') / 1e6
+    seconds[np.isnat(values)] = np.nan
+    return seconds
+
+def calculate_time_in_status_matrix(issues, all_statuses, completion_dates, transitions=None, sparse=False):
+    """
+    Motor do Tempo em Status: matriz issues × status com os dias passados em
+    cada status, calculada numa só passagem NumPy sobre a tabela de transições.
+
+    Devolve `(matriz, status)`: uma linha por issue (pela ordem dada) e uma
+    coluna por status de `all_statuses` (sem repetidos). Com `sparse=True`, a
+    matriz é `scipy.sparse.csr_matrix` (só guarda os pares issue/status com
+    tempo), útil em projetos com muitos status.
+
+    Mesma lógica de `calculate_time_in_status` (hora local do Jira; o último
+    status conta até à data de conclusão, ou até agora se não houver).
+    """
+    statuses = list(dict.fromkeys(all_statuses))
+    keys = [issue.key for issue in issues]
+    if not keys:
+        if sparse:
+            from scipy.sparse import csr_matrix
+            return csr_matrix((0, len(statuses))), statuses
+        return np.zeros((0, len(statuses))), statuses
+
+    now = pd.Timestamp.now(tz=None)
+    end_by_key = {}
+    for key, completion_date in zip(keys, completion_dates):
+        end_by_key.setdefault(key, completion_date if completion_date else now)
+
+    frame = _issue_frame(issues)
+    created = _datetime_seconds(frame['created'].to_numpy())
+    end_time = _datetime_seconds(pd.to_datetime(pd.Series([end_by_key[key] for key in frame.index], dtype=object), errors='coerce').to_numpy())
+
+    table = _transitions_for(issues, transitions)
+    issue_rows = frame.index.get_indexer(table['issue_key'])
+    timestamps = _datetime_seconds(table['timestamp'].to_numpy())
+    # Por issue, pela hora da mudança (estável na ordem do changelog; datas inválidas no fim)
+    order = np.lexsort((np.where(np.isnan(timestamps), np.inf, timestamps), issue_rows))
+    issue_rows, timestamps = issue_rows[order], timestamps[order]
+    from_names, to_names = table['from_name'].to_numpy(dtype=object)[order], table['to_name'].to_numpy(dtype=object)[order]
+
+    changes_issue = issue_rows[1:] != issue_rows[:-1]
+    is_first = np.r_[True, changes_issue][:len(issue_rows)]
+    is_last = np.r_[changes_issue, True][:len(issue_rows)]
+    next_timestamps = np.where(is_last, end_time[issue_rows], np.r_[timestamps[1:], np.nan][:len(issue_rows)])
+    without_changes = np.setdiff1d(np.arange(len(frame)), issue_rows)
+
+    # Segmentos (issue, status, início, fim): antes da primeira mudança (o status de
+    # origem, desde a criação), entre mudanças, e o status atual das issues sem mudanças
+    segment_rows = np.concatenate([issue_rows[is_first], issue_rows, without_changes])
+    segment_statuses = np.concatenate([from_names[is_first], to_names, frame['status_name'].to_numpy(dtype=object)[without_changes]])
+    segment_days = np.concatenate([
+        timestamps[is_first] - created[issue_rows[is_first]],
+        next_timestamps - timestamps,
+        end_time[without_changes] - created[without_changes],
+    ]) / 86400
+    status_columns = pd.Index(statuses, dtype=object).get_indexer(pd.Index(segment_statuses, dtype=object))
+    valid = (segment_days > 0) & (status_columns >= 0)
+    segment_rows, status_columns, segment_days = segment_rows[valid], status_columns[valid], segment_days[valid]
+
+    positions = frame.index.get_indexer(keys)
+    shape = (len(frame), len(statuses))
+    if sparse:
+        from scipy.sparse import csr_matrix
+        matrix = csr_matrix((segment_days, (segment_rows, status_columns)), shape=shape)
+        return matrix[positions], statuses
+    flat_index = segment_rows * len(statuses) + status_columns
+    matrix = np.bincount(flat_index, weights=segment_days, minlength=shape[0] * shape[1]).reshape(shape)
+    return matrix[positions], statuses
+
+def calculate_time_in_status_table(issues, all_statuses, completion_dates, transitions=None):
+    """
+    Tempo (dias) em cada status de várias issues: DataFrame com uma linha por
+    issue (pela ordem dada) e uma coluna por status de `all_statuses`
+    (ver `calculate_time_in_status_matrix`).
+    """
+    matrix, statuses = calculate_time_in_status_matrix(issues, all_statuses, completion_dates, transitions)
+    return pd.DataFrame(matrix, columns=statuses)
+
+# Agregações suportadas por `aggregate_time_in_status` (e oferecidas nos gráficos de Tempo em Status)
+TIME_IN_STATUS_AGGREGATIONS = ['Soma', 'Média', f'Percentil {TIME_IN_STATUS_PERCENTILE}']
+
+def aggregate_time_in_status(matrix, method='Soma', axis=1):
+    """
+    Agrega uma matriz de Tempo em Status (densa ou esparsa) sem passar por DataFrame.
+
+    `method` é 'Soma', 'Média' ou 'Percentil N' (ex.: 'Percentil 85'); com
+    `axis=1` agrega os status de cada issue, com `axis=0` as issues de cada status.
+    Linhas/colunas com valores em falta (`NaN`) são ignoradas, como no pandas.
+    """
+    if hasattr(matrix, 'toarray'):
+        if method == 'Soma':
+            return np.asarray(matrix.sum(axis=axis)).ravel()
+        matrix = matrix.toarray()
+    values = np.asarray(matrix, dtype=float)
+    if values.size == 0:
+        return np.full(values.shape[1 - axis], 0.0 if method == 'Soma' else np.nan)
+    if method == 'Soma':
+        return np.nansum(values, axis=axis)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning) # Linhas só com NaN dão NaN, sem aviso
+        if method == 'Média':
+            return np.nanmean(values, axis=axis)
+        if method.startswith('Percentil'):
+            return np.nanpercentile(values, float(method.split()[-1]), axis=axis)
+    raise ValueError(f"Agregação de Tempo em Status desconhecida: {method!r}")
+
+# --- Datas Derivadas por Conjunto de Dados ---
+# Conclusão, início do ciclo e cycle time de cada issue, calculados uma vez por
+# conjunto de dados carregado (a tabela partilhada pelos IssueRecord) e por
+# mapeamento de status; as métricas leem-nos daqui em vez do changelog.
+
+ISSUE_DATE_COLUMNS = ['completion_date', 'start_date', 'cycle_time']
+
+def _status_mapping_key(project_config):
+    """Assinatura do mapeamento de status que determina as datas derivadas."""
+    return tuple(frozenset(_status_ids(project_config, category)) for category in ('done', 'initial', 'in_progress'))
+
+def get_issue_dates(issues, project_config, transitions=None):
+    """
+    Datas derivadas das issues num DataFrame indexado pela chave, com as colunas
+    de `ISSUE_DATE_COLUMNS` (datas UTC-naive e cycle time em dias; `NaT`/`NaN` quando não há).
+
+    Para issues de um conjunto carregado (`IssueRecord`), o resultado fica
+    memorizado na sessão enquanto a tabela de transições e o mapeamento de
+    status forem os mesmos; só as chaves ainda não vistas são calculadas.
+    """
+    issues = list(issues)
+    dataset_transitions = get_dataset_transitions(issues)
+    if transitions is None:
+        transitions = dataset_transitions if dataset_transitions is not None else build_status_transitions(issues)
+    memoize = dataset_transitions is not None and transitions is dataset_transitions
+    mapping_key = _status_mapping_key(project_config)
+
+    dates = None
+    cached = st.session_state.get('issue_dates_cache') if memoize else None
+    if cached and cached[0] is transitions and cached[1] == mapping_key:
+        dates = cached[2]
+
+    issues_by_key = {}
+    for issue in issues:
+        if dates is None or issue.key not in dates.index:
+            issues_by_key.setdefault(issue.key, issue)
+    if issues_by_key or dates is None:
+        missing = list(issues_by_key.values())
+        completion_dates = calculate_completion_dates(missing, project_config, transitions)
+        new_dates = pd.DataFrame({
+            'completion_date': pd.to_datetime(pd.Series(completion_dates, dtype=object), errors='coerce').to_numpy(),
+            'start_date': pd.to_datetime(pd.Series(calculate_start_dates(missing, project_config, transitions), dtype=object), errors='coerce').to_numpy(),
+            'cycle_time': pd.to_numeric(pd.Series(calculate_cycle_times(missing, completion_dates, project_config, transitions), dtype=object)).to_numpy(dtype=float),
+        }, index=pd.Index(list(issues_by_key), name='issue_key'))
+        dates = new_dates if dates is None else pd.concat([dates, new_dates])
+        if memoize:
+            st.session_state['issue_dates_cache'] = (transitions, mapping_key, dates)
+    return dates
+
+def get_completion_dates(issues, project_config, transitions=None):
+    """Datas de conclusão (`datetime` UTC-naive ou `None`) pela ordem das issues, lidas de `get_issue_dates`."""
+    dates = get_issue_dates(issues, project_config, transitions)
+    return _to_datetime_list(dates['completion_date'], [issue.key for issue in issues])
+
+def get_cycle_times(issues, project_config, transitions=None):
+    """Cycle Time (dias, ou `None`) pela ordem das issues, lido de `get_issue_dates`."""
+    dates = get_issue_dates(issues, project_config, transitions)
+    return [None if pd.isna(days) else float(days) for days in dates['cycle_time'].reindex([issue.key for issue in issues])]
+
+
 def calculate_aggregated_metric(df, dimension, measure, agg):
     if not dimension or dimension not in df.columns:
         return pd.DataFrame({'Dimensão': [], 'Medida': []})
@@ -563,19 +855,19 @@ def calculate_aggregated_metric(df, dimension, measure, agg):
     if measure and measure.startswith('Tempo em: '):
         if measure not in df.columns:
             return pd.DataFrame({'Dimensão': [], 'Medida': []})
-        agg_df = df.groupby(dimension)[measure].mean().reset_index(name='Medida')
+        agg_df = df.groupby(dimension, observed=True)[measure].mean().reset_index(name='Medida')
 
     elif measure == 'Contagem de Issues':
-        agg_df = df.groupby(dimension).size().reset_index(name='Medida')
+        agg_df = df.groupby(dimension, observed=True).size().reset_index(name='Medida')
 
     elif agg == 'Contagem Distinta':
         if measure not in df.columns: return pd.DataFrame({'Dimensão': [], 'Medida': []})
-        agg_df = df.groupby(dimension)[measure].nunique().reset_index(name='Medida')
+        agg_df = df.groupby(dimension, observed=True)[measure].nunique().reset_index(name='Medida')
 
     else:
         if measure not in df.columns: return pd.DataFrame({'Dimensão': [], 'Medida': []})
         numeric_series = pd.to_numeric(df[measure], errors='coerce')
-        grouped_data = numeric_series.groupby(df[dimension])
+        grouped_data = numeric_series.groupby(df[dimension], observed=True)
         if agg == 'Soma': agg_df = grouped_data.sum().reset_index(name='Medida')
         elif agg == 'Média': agg_df = grouped_data.mean().reset_index(name='Medida')
         else: agg_df = grouped_data.count().reset_index(name='Medida')
@@ -642,13 +934,13 @@ def calculate_pivot_table(df, rows, columns, values, aggfunc='Soma'):
     if rows in df.columns and columns in df.columns and values in df.columns:
         pivot_df = df.pivot_table(
             index=rows, columns=columns, values=values,
-            aggfunc=agg_map.get(aggfunc, 'sum'), fill_value=0
+            aggfunc=agg_map.get(aggfunc, 'sum'), fill_value=0, observed=True
         )
         return pivot_df
     return pd.DataFrame()
 
 def calculate_throughput(issues, project_config):
-    return len([i for i in issues if find_completion_date(i, project_config) is not None])
+    return len([cd for cd in get_completion_dates(issues, project_config) if cd is not None])
 
 def get_filtered_issues(issues):
     """Função auxiliar para remover issues com status ignorados."""
@@ -681,7 +973,7 @@ def filter_ignored_issues(raw_issues_list, project_config={}):
 
     return [
         issue for issue in raw_issues_list
-        if issue.fields.status.name.lower() not in ignored_states
+        if get_field(issue, 'status', 'name', default='').lower() not in ignored_states
     ]
 
 def get_issue_estimation(issue, estimation_config):
@@ -696,10 +988,10 @@ def get_issue_estimation(issue, estimation_config):
 def calculate_predictability(sprint_issues, estimation_config, project_config):
     if not sprint_issues or not estimation_config.get('id'): return 0.0
     story_points_field = estimation_config.get('id'); total_points_planned = 0; total_points_completed = 0
-    for issue in sprint_issues:
+    for issue, completion_date in zip(sprint_issues, get_completion_dates(sprint_issues, project_config)):
         points = get_issue_estimation(issue, estimation_config) or 0
         total_points_planned += points
-        if find_completion_date(issue, project_config) is not None:
+        if completion_date is not None:
             completed_points_value = get_issue_estimation(issue, estimation_config) or 0
             total_points_completed += completed_points_value
     if total_points_planned == 0: return 100.0
@@ -711,13 +1003,13 @@ def generate_sprint_health_summary(issues, predictability, project_config):
     elif 80 <= predictability < 95: insights.append(f"✅ **Previsibilidade Saudável ({predictability:.0f}%):** O time é bastante confiável em suas previsões.")
     elif 60 <= predictability < 80: insights.append(f"⚠️ **Previsibilidade em Desenvolvimento ({predictability:.0f}%):** Há espaço para melhorar a precisão do planejamento ou a gestão de interrupções.")
     else: insights.append(f"🚨 **Alerta de Previsibilidade ({predictability:.0f}%):** Forte indicação de que o planejamento não está conectado à entrega.")
-    completed_issues = [i for i in issues if find_completion_date(i, project_config) is not None]
+    completed_issues = [i for i, cd in zip(issues, get_completion_dates(issues, project_config)) if cd is not None]
     if not completed_issues: insights.append("ℹ️ Não há dados de fluxo ou qualidade, pois nenhuma issue foi concluída."); return insights
     issue_types = [i.fields.issuetype.name.lower() for i in completed_issues]
     bug_count = sum(1 for t in issue_types if 'bug' in t); total_completed = len(completed_issues)
     bug_ratio = (bug_count / total_completed) * 100 if total_completed > 0 else 0
     if bug_ratio > 30: insights.append(f"⚠️ **Foco em Qualidade ({bug_ratio:.0f}% de bugs):** Uma parte considerável do esforço foi para corrigir bugs.")
-    cycle_times = [ct for ct in [calculate_cycle_time(i, find_completion_date(i, project_config), project_config) for i in completed_issues] if ct is not None and ct >= 0]
+    cycle_times = [ct for ct in get_cycle_times(completed_issues, project_config) if ct is not None and ct >= 0]
     if len(cycle_times) > 1:
         avg_cycle_time = np.mean(cycle_times); std_dev_cycle_time = np.std(cycle_times)
         coeff_var = (std_dev_cycle_time / avg_cycle_time) if avg_cycle_time > 0 else 0
@@ -750,8 +1042,7 @@ def prepare_burndown_data(client, sprint_obj, estimation_config, project_config)
     date_range = pd.date_range(start=start_date, end=end_date, freq='D')
     points_completed_per_day = {day: 0 for day in date_range}
 
-    for issue in issues:
-        completion_date = find_completion_date(issue, project_config)
+    for issue, completion_date in zip(issues, get_completion_dates(issues, project_config)):
         if completion_date and start_date <= completion_date <= end_date:
             points = get_issue_estimation(issue, estimation_config)
             points_completed_per_day[completion_date] += points
@@ -770,11 +1061,13 @@ def prepare_burndown_data(client, sprint_obj, estimation_config, project_config)
         'Linha Ideal': ideal_line
     }).set_index('Data')
 
-def prepare_cfd_data(issues, start_date, end_date):
-    from jira_connector import get_jira_statuses
+def prepare_cfd_data(issues, start_date, end_date, transitions=None):
     """
     Prepara os dados para o Diagrama de Fluxo Cumulativo (CFD), com a lógica de
     fuso horário corrigida.
+
+    `transitions` é a tabela de transições do conjunto de dados (ver
+    `get_status_transitions`); se não for dada, é construída para estas issues.
     """
     if not issues:
         return pd.DataFrame(), {}
@@ -783,28 +1076,16 @@ def prepare_cfd_data(issues, start_date, end_date):
     initial_states = global_configs.get('initial_states', DEFAULT_INITIAL_STATES)
     done_states = global_configs.get('done_states', DEFAULT_DONE_STATES)
 
-    all_statuses = set()
-    transitions = []
+    table = _transitions_for(issues, transitions)
+    transition_dates = table['timestamp'].dt.normalize().to_numpy()
+    created_dates = _issue_frame(issues)['created'].dt.normalize().to_numpy()
 
-    for issue in issues:
-        created_date = pd.to_datetime(issue.fields.created).tz_localize(None).normalize()
-        transitions.append({'date': created_date, 'status': 'Criado', 'change': 1})
-        all_statuses.add('Criado')
-
-        if hasattr(issue.changelog, 'histories'):
-            for history in issue.changelog.histories:
-                for item in history.items:
-                    if item.field == 'status':
-                        transition_date = pd.to_datetime(history.created).tz_localize(None).normalize()
-                        transitions.append({'date': transition_date, 'status': item.fromString, 'change': -1})
-                        transitions.append({'date': transition_date, 'status': item.toString, 'change': 1})
-                        all_statuses.add(item.fromString)
-                        all_statuses.add(item.toString)
-
-    if not transitions:
-        return pd.DataFrame(), {}
-
-    df = pd.DataFrame(transitions)
+    # Cada issue entra como 'Criado'; cada transição tira-a do status de origem e põe-na no de destino
+    df = pd.concat([
+        pd.DataFrame({'date': created_dates, 'status': 'Criado', 'change': 1}),
+        pd.DataFrame({'date': transition_dates, 'status': table['from_name'].to_numpy(), 'change': -1}),
+        pd.DataFrame({'date': transition_dates, 'status': table['to_name'].to_numpy(), 'change': 1}),
+    ], ignore_index=True)
 
     start_date = pd.to_datetime(start_date)
     end_date = pd.to_datetime(end_date)
@@ -845,6 +1126,7 @@ def prepare_project_burnup_data(issues: list, unit_param: str, estimation_config
 
     scope_data = []
     done_data = []
+    completion_by_key = dict(zip([issue.key for issue in issues], get_completion_dates(issues, project_config)))
 
     processed_issue_keys = set()
     print(f"DEBUG: Processando {len(issues)} issues recebidas.")
@@ -868,7 +1150,7 @@ def prepare_project_burnup_data(issues: list, unit_param: str, estimation_config
                 continue 
             created_date = pd.to_datetime(created_date_raw).tz_localize(None).normalize()
             
-            completion_date_dt = find_completion_date(issue, project_config) 
+            completion_date_dt = completion_by_key[issue.key]
 
             value = 1.0 
             if unit_param == 'points':
@@ -1015,20 +1297,17 @@ def calculate_trend_and_forecast(burnup_df, trend_weeks):
 
 def calculate_time_in_status(issue, all_statuses, completion_date):
     time_in_status = {status: 0.0 for status in all_statuses}
-    status_changes = []
-    if hasattr(issue.changelog, 'histories'):
-        for history in issue.changelog.histories:
-            for item in history.items:
-                if item.field.lower() == 'status':
-                    change = {
-                        'timestamp': pd.to_datetime(history.created).tz_localize(None),
-                        'from': item.fromString,
-                        'to': item.toString
-                    }
-                    status_changes.append(change)
-    created_date = pd.to_datetime(issue.fields.created).tz_localize(None)
+    status_changes = [
+        {
+            'timestamp': pd.to_datetime(created).tz_localize(None),
+            'from': item.get('fromString'),
+            'to': item.get('toString')
+        }
+        for created, item in iter_status_changes(issue)
+    ]
+    created_date = pd.to_datetime(get_field(issue, 'created')).tz_localize(None)
     if not status_changes:
-        current_status = issue.fields.status.name
+        current_status = get_field(issue, 'status', 'name')
         if current_status in time_in_status:
             end_time = completion_date if completion_date else pd.Timestamp.now(tz=None)
             duration_seconds = (end_time - created_date).total_seconds()
@@ -1059,12 +1338,11 @@ def calculate_time_in_status(issue, all_statuses, completion_date):
 
 def calculate_flow_efficiency(issue, project_config):
     """Calcula a eficiência do fluxo, garantindo a conversão de tipos de data."""
-    completion_date_obj = find_completion_date(issue, project_config)
-    if not completion_date_obj:
+    issue_dates = get_issue_dates([issue], project_config).loc[issue.key]
+    if pd.isna(issue_dates['completion_date']):
         return None
 
-    completion_datetime = pd.to_datetime(completion_date_obj)
-    cycle_time_days = calculate_cycle_time(issue, completion_datetime, project_config)
+    cycle_time_days = None if pd.isna(issue_dates['cycle_time']) else float(issue_dates['cycle_time'])
 
     if not cycle_time_days or cycle_time_days <= 0:
         return None
@@ -1077,7 +1355,7 @@ def calculate_flow_efficiency(issue, project_config):
         
     return (touch_time_days / cycle_time_days) * 100
 
-def get_aging_wip(issues):
+def get_aging_wip(issues, transitions=None):
     global_configs = st.session_state.get('global_configs', {})
     initial_states = global_configs.get('initial_states', DEFAULT_INITIAL_STATES)
     done_states = global_configs.get('done_states', DEFAULT_DONE_STATES)
@@ -1092,29 +1370,18 @@ def get_aging_wip(issues):
     if not wip_issues:
         return pd.DataFrame(columns=['Issue', 'Status Atual', 'Dias no Status'])
 
-    wip_data = []
-    today = datetime.now().date()
-
-    for issue in wip_issues:
-        last_status_change_date = pd.to_datetime(issue.fields.created).date()
-        if hasattr(issue.changelog, 'histories'):
-            for history in reversed(issue.changelog.histories):
-                for item in history.items:
-                    if item.field == 'status':
-                        last_status_change_date = pd.to_datetime(history.created).date()
-                        break
-                else: continue
-                break
-
-        days_in_status = np.busday_count(last_status_change_date, today)
+    # Data da última mudança de status (a última do changelog), ou da criação se nunca mudou
+    wip_keys = [issue.key for issue in wip_issues]
+    last_change = _transitions_for(wip_issues, transitions).groupby('issue_key')['timestamp'].last()
+    created = parse_jira_timestamps([get_field(issue, 'created') for issue in wip_issues])
+    last_status_change = pd.Series(last_change.reindex(wip_keys).to_numpy()).fillna(created)
 
-        wip_data.append({
-            'Issue': issue.key,
-            'Status Atual': issue.fields.status.name,
-            'Dias no Status': days_in_status
-        })
-
-    df = pd.DataFrame(wip_data)
+    today = datetime.now().date()
+    df = pd.DataFrame({
+        'Issue': wip_keys,
+        'Status Atual': [issue.fields.status.name for issue in wip_issues],
+        'Dias no Status': np.busday_count(last_status_change.to_numpy().astype('datetime64[D]'), today)
+    })
     return df.sort_values(by='Dias no Status', ascending=False)
 
 def calculate_velocity(sprint_issues, estimation_config):
@@ -1144,13 +1411,15 @@ def calculate_sprint_defects(sprint_issues):
 
 def calculate_sprint_goal_success_rate(sprints, threshold, estimation_config, project_config):
     """Calcula a taxa de sucesso de sprints com base num limiar de previsibilidade."""
-    from jira_connector import get_sprint_issues
+    from jira_connector import get_issues_for_sprints
     if not sprints:
         return 0.0
 
+    # Uma única busca para todas as sprints, repartida localmente
+    issues_by_sprint = get_issues_for_sprints(st.session_state.jira_client, tuple(sprint.id for sprint in sprints))
     successful_sprints = 0
     for sprint in sprints:
-        sprint_issues = get_sprint_issues(st.session_state.jira_client, sprint.id)
+        sprint_issues = issues_by_sprint.get(sprint.id, [])
         predictability = calculate_predictability(sprint_issues, estimation_config, project_config)
         if predictability >= threshold:
             successful_sprints += 1
@@ -1174,8 +1443,7 @@ def prepare_burndown_data_by_count(client, sprint_obj, project_config):
     date_range = pd.date_range(start=start_date, end=end_date, freq='D')
     issues_completed_per_day = {day: 0 for day in date_range}
 
-    for issue in issues:
-        completion_date = find_completion_date(issue, project_config)
+    for completion_date in get_completion_dates(issues, project_config):
         if completion_date and start_date <= completion_date <= end_date:
             issues_completed_per_day[completion_date] += 1
 
@@ -1209,8 +1477,7 @@ def prepare_burndown_data_by_estimation(client, sprint_obj, estimation_config, p
     date_range = pd.date_range(start=start_date, end=end_date, freq='D')
     points_completed_per_day = {day: 0 for day in date_range}
 
-    for issue in issues:
-        completion_date = find_completion_date(issue, project_config)
+    for issue, completion_date in zip(issues, get_completion_dates(issues, project_config)):
         if completion_date and start_date <= completion_date <= end_date:
             points = get_issue_estimation(issue, estimation_config)
             points_completed_per_day[completion_date] += points
@@ -1286,11 +1553,11 @@ def calculate_executive_summary_metrics(issues, project_config):
 
     # --- Cálculos de Entregas no Mês ---
     current_month = datetime.now().month; current_year = datetime.now().year
+    # Datas de conclusão lidas uma vez (memorizadas por conjunto de dados, ver get_issue_dates)
+    completion_by_key = dict(zip([i.key for i in completed_issues_list], get_completion_dates(completed_issues_list, project_config)))
     deliveries_month = len([
         i for i in completed_issues_list
-        # A função find_completion_date (linha 15) também usa 'status_mapping',
-        # por isso também funcionará agora.
-        if (cd := find_completion_date(i, project_config)) and cd.month == current_month and cd.year == current_year
+        if (cd := completion_by_key[i.key]) and cd.month == current_month and cd.year == current_year
     ])
 
     # --- Cálculos de Aderência ao Prazo ---
@@ -1304,15 +1571,14 @@ def calculate_executive_summary_metrics(issues, project_config):
                 if not due_date_str: continue # Pula se a data estiver vazia
                 
                 due_date = pd.to_datetime(due_date_str).tz_localize(None).normalize()
-                completion_date = find_completion_date(i, project_config)
+                completion_date = completion_by_key[i.key]
                 
                 if completion_date:
                     completion_date_ts = pd.to_datetime(completion_date)
                     deadline_diffs.append((completion_date_ts.normalize() - due_date).days)
 
     avg_deadline_diff = np.mean(deadline_diffs) if deadline_diffs else 0
-    # A sua função 'calculate_schedule_adherence' (linha 860) também depende de
-    # 'find_completion_date', pelo que também será corrigida por esta mudança.
+    # 'calculate_schedule_adherence' lê as mesmas datas memorizadas
     schedule_adherence = calculate_schedule_adherence(issues, project_config) 
 
     return {
@@ -1459,10 +1725,9 @@ def calculate_schedule_adherence(issues, project_config):
     with_due_date = 0
     met_deadline = 0
 
-    for issue in issues:
+    for issue, completion_date in zip(issues, get_completion_dates(issues, project_config)):
         if hasattr(issue.fields, due_date_field_id) and getattr(issue.fields, due_date_field_id):
             with_due_date += 1
-            completion_date = find_completion_date(issue, project_config)
 
             if completion_date:
                 due_date = pd.to_datetime(getattr(issue.fields, due_date_field_id)).tz_localize(None)
@@ -1515,12 +1780,18 @@ def calculate_business_hours(start_time, end_time):
 
     return business_days * 8
 
-def calculate_sla_metrics_for_issues(issues, global_configs):
+def calculate_sla_metrics_for_issues(issues, global_configs, transitions=None):
     """Calcula as métricas de SLA para uma lista de issues."""
     policies = global_configs.get('sla_policies', [])
     if not policies:
         return {}
 
+    # Transições de cada issue (posições na tabela, pela ordem do changelog)
+    table = _transitions_for(issues, transitions)
+    rows_by_issue = table.groupby('issue_key', sort=False).indices
+    transition_times = table['timestamp'].to_numpy()
+    to_statuses = table['to_name'].str.lower().to_numpy()
+
     total_sla_issues = 0
     violated_resolution_sla = 0
     met_resolution_sla = 0
@@ -1538,17 +1809,18 @@ def calculate_sla_metrics_for_issues(issues, global_configs):
         start_statuses = [s.lower() for s in policy['start_statuses']]
         stop_statuses = [s.lower() for s in policy['stop_statuses']]
 
-        for history in issue.changelog.histories:
-            history_time = pd.to_datetime(history.created).tz_localize(None)
-            for item in history.items:
-                if item.field == 'status':
-                    status_name = item.toString.lower()
-                    if status_name in start_statuses and not start_time:
-                        start_time = history_time
-                    if status_name in stop_statuses:
-                        stop_time = history_time
-
-            if not first_response_time and hasattr(issue.fields, 'comment') and issue.fields.comment.comments:
+        rows = rows_by_issue.get(issue.key, [])
+        start_rows = [row for row in rows if to_statuses[row] in start_statuses]
+        stop_rows = [row for row in rows if to_statuses[row] in stop_statuses]
+        if start_rows:
+            start_time = pd.Timestamp(transition_times[start_rows[0]]) # Primeira entrada num status de início
+        if stop_rows:
+            stop_time = pd.Timestamp(transition_times[stop_rows[-1]]) # Última entrada num status de paragem
+
+        # O original só procurava a primeira resposta em issues com changelog; a resposta só
+        # conta com um início (vindo destas transições), por isso basta testar as linhas da tabela
+        if len(rows):
+            if hasattr(issue.fields, 'comment') and issue.fields.comment.comments:
                 for comment in issue.fields.comment.comments:
                     comment_author = comment.author.displayName
                     issue_creator = issue.fields.creator.displayName
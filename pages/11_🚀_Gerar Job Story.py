@@ -3,12 +3,12 @@
 import streamlit as st
 import requests
 import json
-import base64
 import re
 from jira import JIRAError
 from security import *
 from config import SESSION_TIMEOUT_MINUTES
 from jira_connector import get_project_issue_types
+from jira_http import get_jira_http_session
 from utils import get_ai_user_story_from_figma, get_ai_user_story_from_text
 from pathlib import Path
 
@@ -63,13 +63,11 @@ def parse_figma_url(url):
 
 def create_jira_issue(jira_domain, jira_email, jira_token, jira_project_key, story, issuetype_name):
     """Cria uma única issue no Jira, com a formatação BDD completa."""
-    jira_url_endpoint = f"{jira_domain}/rest/api/3/issue"
-    auth_string = f"{jira_email}:{jira_token}"
-
+    # Sessão HTTP partilhada da conexão (pool keep-alive, autenticação e timeouts)
+    jira_http = get_jira_http_session(jira_domain.rstrip('/'), jira_email, jira_token)
     jira_headers = {
         "Accept": "application/json",
-        "Content-Type": "application/json",
-        "Authorization": f"Basic {base64.b64encode(auth_string.encode()).decode()}"
+        "Content-Type": "application/json"
     }
 
     # Constrói o corpo da descrição dinamicamente usando o helper ADF
@@ -117,7 +115,7 @@ def create_jira_issue(jira_domain, jira_email, jira_token, jira_project_key, sto
     }
 
     try:
-        response = requests.post(jira_url_endpoint, headers=jira_headers, data=json.dumps(jira_payload))
+        response = jira_http.post("/rest/api/3/issue", headers=jira_headers, data=json.dumps(jira_payload))
         response.raise_for_status()
         return response.json().get('key')
     except requests.exceptions.HTTPError as e:
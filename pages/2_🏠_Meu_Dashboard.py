@@ -12,6 +12,7 @@ from utils import *
 from security import *
 from pathlib import Path
 import importlib
+from jira_connector import get_project_store_revision
 from datetime import datetime, timedelta
 import copy
 
@@ -32,6 +33,9 @@ if check_session_timeout():
 if 'jira_client' not in st.session_state:
     st.warning("Nenhuma conexão Jira está ativa para esta sessão.", icon="⚡"); st.info("Por favor, ative uma das suas conexões guardadas para carregar os dados."); st.page_link("pages/8_🔗_Conexões_Jira.py", label="Ativar uma Conexão", icon="🔗"); st.stop()
 
+# Consumidores de campos (ver FIELD_REQUIREMENTS em jira_connector) desta página
+DASHBOARD_CONSUMERS = ('dashboard',)
+
 # --- Funções Auxiliares ---
 def is_valid_chart(item):
     return isinstance(item, dict) and 'id' in item and 'title' in item
@@ -44,9 +48,12 @@ def ensure_project_data_is_loaded():
             df_loaded, raw_issues, proj_config = load_and_process_project_data(
                 st.session_state.jira_client, 
                 project_key,
-                user_data
+                user_data,
+                consumers=DASHBOARD_CONSUMERS,
+                store_revision=get_project_store_revision(st.session_state.jira_client, project_key)
             )
             st.session_state.dynamic_df = df_loaded
+            st.session_state.loaded_consumers = DASHBOARD_CONSUMERS
             st.session_state.loaded_project_key = project_key
 
 def add_chart_callback():
@@ -191,18 +198,8 @@ with st.sidebar:
             save_last_project(st.session_state['email'], project_key)
             st.session_state.project_key = project_key
             st.session_state.project_name = selected_project_name
-            
-            user_data = find_user(st.session_state['email'])
-            
-            df_loaded, raw_issues, proj_config = load_and_process_project_data(
-                st.session_state.jira_client, 
-                project_key,
-                user_data 
-            )
-            
-            st.session_state.dynamic_df = df_loaded
-            st.session_state.raw_issues_for_fluxo = raw_issues
-            st.session_state.loaded_project_key = project_key
+            # Os dados são carregados de forma progressiva no corpo da página (ver CARREGAMENTO PROGRESSIVO)
+            st.session_state.pending_stream_load = project_key
             st.rerun()
 
     st.divider()
@@ -215,7 +212,8 @@ with st.sidebar:
 # --- LÓGICA PRINCIPAL DA PÁGINA ---
 df = st.session_state.get('dynamic_df')
 current_project_key = st.session_state.get('project_key')
-if df is None or not st.session_state.get('project_name'):
+pending_project_key = st.session_state.get('pending_stream_load')
+if (df is None and not pending_project_key) or not st.session_state.get('project_name'):
     st.info("⬅️ Na barra lateral, selecione um projeto e clique em 'Visualizar Dashboard' para carregar os dados.")
     st.stop()
 
@@ -281,6 +279,38 @@ all_charts = [chart for tab_charts in tabs_layout.values() for chart in tab_char
 project_config = get_project_config(current_project_key) or {}
 default_cols = project_config.get('dashboard_columns', 2)
 
+# --- CARREGAMENTO PROGRESSIVO ---
+# Enquanto as páginas chegam do Jira, os gráficos do primeiro separador são desenhados com os
+# dados parciais (valores provisórios); no fim, os dados completos substituem-nos e a página é redesenhada.
+if pending_project_key:
+    first_tab_charts = next((charts for charts in tabs_layout.values() if charts), [])
+    stream_placeholder = st.empty()
+    try:
+        stream = stream_project_data(st.session_state.jira_client, pending_project_key, user_data, consumers=DASHBOARD_CONSUMERS)
+        for chunk_index, (df_loaded, raw_issues, _, loaded, total, done) in enumerate(stream):
+            if done:
+                break
+            with stream_placeholder.container():
+                st.progress(min(loaded / total, 1.0) if total else 0.0, text=f"A carregar issues do projeto... {loaded} de {total}")
+                st.caption("⏳ Valores provisórios: os gráficos são atualizados à medida que os dados chegam.")
+                stream_cols = st.columns(default_cols)
+                for i, chart_config in enumerate(first_tab_charts):
+                    with stream_cols[i % default_cols]:
+                        with st.container(border=True):
+                            render_chart(chart_config, df_loaded, f"chart_{chart_config['id']}_stream{chunk_index}")
+    except Exception as e:
+        st.session_state.pop('pending_stream_load', None)
+        st.error(f"Erro ao carregar os dados do projeto: {e}")
+        st.stop()
+
+    stream_placeholder.empty()
+    st.session_state.dynamic_df = df_loaded
+    st.session_state.raw_issues_for_fluxo = raw_issues
+    st.session_state.loaded_consumers = DASHBOARD_CONSUMERS
+    st.session_state.loaded_project_key = pending_project_key
+    st.session_state.pop('pending_stream_load', None)
+    st.rerun()
+
 # --- CONTROLES DO CABEÇALHO ---
 with st.expander("Opções do Dashboard", expanded=False):
     cols = st.columns([2.5, 1.5, 1.5, 1.5, 1.5])
@@ -315,6 +345,8 @@ if 'dashboard_edit_mode' not in st.session_state:
 # --- FUNÇÃO DE RENDERIZAÇÃO DO DASHBOARD ---
 def render_dashboard_view(is_edit_mode):
     tabs_with_charts = {name: charts for name, charts in tabs_layout.items() if charts}
+    # Todas as contagens JQL dos indicadores num único lote, em vez de uma busca por indicador
+    prefetch_chart_jql_counts(st.session_state.get('jira_client'), all_charts)
     if not any(tabs_with_charts.values()):
         st.markdown("""<div style="text-align: center; padding: 2rem;"><h3>Seu Dashboard está vazio!</h3></div>""", unsafe_allow_html=True)
         if can_edit:
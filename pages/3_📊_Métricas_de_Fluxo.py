@@ -15,6 +15,10 @@ import plotly.express as px
 
 st.set_page_config(page_title="Métricas de Fluxo", page_icon="📊", layout="wide")
 
+# Consumidores de campos (ver FIELD_REQUIREMENTS em jira_connector) desta página:
+# o SLA precisa dos comentários, que as outras páginas não pedem ao Jira.
+FLOW_CONSUMERS = ('dashboard', 'flow_metrics', 'sla')
+
 # --- Funções de Callback ---
 def on_project_change():
     """Limpa o estado relevante ao trocar de projeto."""
@@ -94,11 +98,14 @@ with st.sidebar:
             df_loaded, raw_issues, project_config = load_and_process_project_data(
                 st.session_state.jira_client, 
                 st.session_state.project_key, # <-- Variável correta
-                user_data
+                user_data,
+                consumers=FLOW_CONSUMERS,
+                store_revision=get_project_store_revision(st.session_state.jira_client, st.session_state.project_key)
             )
             
             st.session_state.dynamic_df = df_loaded
             st.session_state.raw_issues_for_fluxo = raw_issues
+            st.session_state.loaded_consumers = FLOW_CONSUMERS
             
         st.rerun()
  
@@ -116,6 +123,23 @@ if df is None or df.empty:
     st.info("⬅️ Na barra lateral, selecione um projeto e clique em 'Analisar / Atualizar Dados' para começar.")
     st.stop()
 
+# Dados carregados por outra página (ex.: Meu Dashboard) não trazem os campos do SLA: recarrega
+if not set(FLOW_CONSUMERS).issubset(st.session_state.get('loaded_consumers', ())):
+    with st.spinner("A carregar os campos adicionais das métricas de fluxo..."):
+        df, raw_issues, _ = load_and_process_project_data(
+            st.session_state.jira_client,
+            st.session_state.project_key,
+            find_user(st.session_state['email']),
+            consumers=FLOW_CONSUMERS,
+            store_revision=get_project_store_revision(st.session_state.jira_client, st.session_state.project_key)
+        )
+    st.session_state.dynamic_df = df
+    st.session_state.raw_issues_for_fluxo = raw_issues
+    st.session_state.loaded_consumers = FLOW_CONSUMERS
+    if df is None or df.empty:
+        st.info("⬅️ Na barra lateral, selecione um projeto e clique em 'Analisar / Atualizar Dados' para começar.")
+        st.stop()
+
 if 'ID' not in df.columns and 'key' in df.columns:
     df.rename(columns={'key': 'ID'}, inplace=True)
 
@@ -150,7 +174,7 @@ with st.expander("Filtros da Análise", expanded=True):
     
     for i, f in enumerate(st.session_state.flow_filters):
         cols = st.columns([2, 2, 3, 1])
-        all_filterable_fields = [""] + sorted(list(set(c for c in df.columns if df[c].dtype in ['object', 'int64', 'float64'] and c not in ['ID', 'Issue'])))
+        all_filterable_fields = [""] + sorted(list(set(c for c in df.columns if (is_text_column(df[c]) or pd.api.types.is_numeric_dtype(df[c])) and c not in ['ID', 'Issue'])))
         selected_field = cols[0].selectbox("Campo", options=all_filterable_fields, key=f"flow_field_{i}", index=all_filterable_fields.index(f.get('field')) if f.get('field') in all_filterable_fields else 0)
         st.session_state.flow_filters[i]['field'] = selected_field
         
@@ -210,9 +234,16 @@ in_progress_statuses = [s['name'].lower() for s in status_mapping.get('in_progre
 if not done_statuses:
     st.warning("Nenhum 'status final' está configurado para este projeto.", icon="⚠️")
 
+# Tabela de transições de status de todas as issues carregadas (construída uma vez por carregamento)
+status_transitions = get_status_transitions(all_raw_issues)
+completion_dates = dict(zip(
+    [issue.key for issue in issues_for_flow_calc],
+    get_completion_dates(issues_for_flow_calc, project_config, status_transitions)
+))
+
 # 4. Usa 'issues_for_flow_calc' em TODAS as métricas
 # 4. Obter as issues concluídas (como objetos raw)
-completed_issues_in_period = [i for i in issues_for_flow_calc if (cd_datetime := find_completion_date(i, project_config)) and start_date <= cd_datetime.date() <= end_date]
+completed_issues_in_period = [i for i in issues_for_flow_calc if (cd_datetime := completion_dates[i.key]) and start_date <= cd_datetime.date() <= end_date]
         
 # 5. Obter as chaves (IDs) dessas issues
 completed_issue_keys = [issue.key for issue in completed_issues_in_period]
@@ -238,7 +269,7 @@ throughput = len(completed_issues_in_period)
 lead_time_avg = df_done['Lead Time (dias)'].mean() if not df_done.empty else 0
 cycle_time_avg = df_done['Cycle Time (dias)'].mean() if not df_done.empty else 0
 # --- FIM DA CORREÇÃO ---
-aging_df = get_aging_wip(issues_for_flow_calc) # 6. Usa 'issues_for_flow_calc'
+aging_df = get_aging_wip(issues_for_flow_calc, status_transitions) # 6. Usa 'issues_for_flow_calc'
 
 # --- CÁLCULO SLA COM FILTRO DE PERÍODO ---
 # Filtra as issues para incluir apenas aquelas Criadas OU Resolvidas dentro do período selecionado
@@ -253,7 +284,7 @@ for issue in issues_for_flow_calc:
     created_in_period = start_ts <= created_date < end_ts
     
     # Verifica Data de Conclusão
-    completion_date = find_completion_date(issue, project_config)
+    completion_date = completion_dates[issue.key]
     resolved_in_period = False
     if completion_date:
         completion_date = pd.to_datetime(completion_date).tz_localize(None) if completion_date.tzinfo else pd.to_datetime(completion_date)
@@ -264,7 +295,7 @@ for issue in issues_for_flow_calc:
         issues_for_sla_calc.append(issue)
 
 # Agora passamos a lista filtrada por data para a função de cálculo
-sla_metrics = calculate_priority_sla_metrics(issues_for_sla_calc, project_config)
+sla_metrics = calculate_priority_sla_metrics(issues_for_sla_calc, project_config, status_transitions)
 # --- FIM NOVO CÁLCULO SLA ---
 
 completed_issue_keys = [issue.key for issue in completed_issues_in_period]
@@ -287,7 +318,7 @@ with tab_comum:
     st.divider()
     st.subheader("Diagrama de Fluxo Cumulativo (CFD)")
     st.caption("Mostra a evolução dos itens em cada etapa ao longo do tempo.")
-    cfd_df, _ = prepare_cfd_data(all_raw_issues, start_date, end_date)
+    cfd_df, _ = prepare_cfd_data(all_raw_issues, start_date, end_date, status_transitions)
     if not cfd_df.empty:
         done_statuses_cfd = [s['name'].lower() for s in done_statuses if isinstance(s, dict) and 'name' in s]
         status_order = ['Created'] + [s for s in cfd_df.columns if s != 'Created' and s.lower() not in done_statuses_cfd] + [s for s in cfd_df.columns if s.lower() in done_statuses_cfd]
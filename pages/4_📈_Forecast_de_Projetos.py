@@ -12,6 +12,7 @@ from metrics_calculator import *
 from security import *
 from utils import *
 from pathlib import Path
+from issue_records import compact_issue_records
 
 st.set_page_config(page_title="Forecast & Planeamento", page_icon="📈", layout="wide")
 
@@ -143,9 +144,13 @@ with st.sidebar:
                     elif scope_type == "Quadro (Board)":
                         issues = get_issues_by_board(st.session_state.jira_client, scope_obj.id, extra_fields=extra_fields_to_fetch)
                     else: # Projeto Inteiro
-                        issues = get_all_project_issues(st.session_state.jira_client, st.session_state.project_key, extra_fields=extra_fields_to_fetch)
+                        issues = get_all_project_issues(
+                            st.session_state.jira_client, st.session_state.project_key, extra_fields=extra_fields_to_fetch,
+                            store_revision=get_project_store_revision(st.session_state.jira_client, st.session_state.project_key)
+                        )
                     
-                    st.session_state.scope_issues = issues
+                    # Só a forma compacta fica na sessão (sem changelog completo nem metadados da API)
+                    st.session_state.scope_issues = compact_issue_records(issues)
                     # (Modificado para usar o 'estimation_field_name' dinâmico)
                     st.session_state.unit_param = 'count' if unit == 'Contagem de Issues' else 'points'
                     st.session_state.trend_weeks = trend_weeks
@@ -4,6 +4,7 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+import numpy as np
 import uuid
 from pathlib import Path
 from datetime import datetime, timedelta, date
@@ -89,9 +90,12 @@ with st.sidebar:
             df_loaded, raw_issues, proj_config = load_and_process_project_data(
                 st.session_state.jira_client, 
                 st.session_state.project_key,
-                user_data # Passa as configs para invalidar o cache
+                user_data, # Passa as configs para invalidar o cache
+                consumers=('dashboard',),
+                store_revision=get_project_store_revision(st.session_state.jira_client, st.session_state.project_key)
             )
             st.session_state.dynamic_df = df_loaded
+            st.session_state.loaded_consumers = ('dashboard',)
             st.rerun()
         if st.button("Logout", width='stretch', type='secondary'):
             email_to_remember = st.session_state.get('remember_email', '')
@@ -204,7 +208,7 @@ if project_estimation_field and project_estimation_field.get('name') not in [f['
 # Lógica de deteção automática para garantir que todos os campos sejam apanhados
 auto_numeric_cols = [col for col in df.columns if pd.api.types.is_numeric_dtype(df[col])]
 auto_date_cols = [col for col in df.columns if pd.api.types.is_datetime64_any_dtype(df[col]) or 'Data' in col]
-auto_categorical_cols = [col for col in df.columns if pd.api.types.is_object_dtype(df[col]) and col not in auto_date_cols]
+auto_categorical_cols = [col for col in df.columns if is_text_column(df[col]) and col not in auto_date_cols]
 
 # Combina a lógica manual com a automática para criar as listas finais
 numeric_cols_from_master = [f['name'] for f in master_field_list if f['type'] in ['Numérico', 'Horas'] and f['name'] in df.columns]
@@ -356,11 +360,9 @@ def render_time_in_status_ui(config, df_for_preview, config_key_prefix, help_tex
         cols_to_process = [f'Tempo em: {s}' for s in config[config_key_selected]]
         new_measure_col_name = f"{calc_method} de tempo em: {', '.join(config[config_key_selected])}"
         
-        # Modifica o dataframe (cópia)
-        if calc_method == "Soma":
-            df_for_preview[new_measure_col_name] = df_for_preview[cols_to_process].sum(axis=1)
-        else:
-            df_for_preview[new_measure_col_name] = df_for_preview[cols_to_process].mean(axis=1)
+        # Modifica o dataframe (cópia), agregando a matriz issues × status selecionados
+        time_in_status = df_for_preview[cols_to_process].to_numpy(dtype=float, na_value=np.nan)
+        df_for_preview[new_measure_col_name] = aggregate_time_in_status(time_in_status, calc_method, axis=1)
         
         return new_measure_col_name, df_for_preview, calc_method
     else:
@@ -565,7 +567,9 @@ if creation_mode == "Construtor Visual":
                     elif config.get('measure') in numeric_cols or config.get('measure_selection') == "Tempo em Status":
                         agg_options = ["Soma", "Média"]
                         default_agg = config.get('agg', 'Soma')
-                        if config.get('measure_selection') == "Tempo em Status": default_agg = time_calc_method
+                        if config.get('measure_selection') == "Tempo em Status":
+                            agg_options = TIME_IN_STATUS_AGGREGATIONS
+                            default_agg = time_calc_method
                         agg_idx = agg_options.index(default_agg) if default_agg in agg_options else 0
                         config['agg'] = st.radio("Cálculo Final do Grupo", agg_options, index=agg_idx, horizontal=True)
                     else:
@@ -7,6 +7,7 @@ from datetime import datetime, timedelta
 from stqdm import stqdm 
 from jira_connector import (
     get_jira_projects,
+    get_project_store_revision,
 )
 
 from metrics_calculator import (
@@ -22,6 +23,9 @@ from pathlib import Path
 from utils import *
 from config import SESSION_TIMEOUT_MINUTES
 
+# Consumidores de campos (ver FIELD_REQUIREMENTS em jira_connector) desta página:
+# o resumo executivo e o sentimento precisam da prioridade e dos comentários.
+RADAR_CONSUMERS = ('dashboard', 'radar')
 
 def display_custom_metric(label, value, color_class):
     """Exibe uma métrica personalizada com um valor colorido."""
@@ -401,7 +405,9 @@ with st.expander("Carregar Dados do Projeto", expanded=expand_loader):
                 df_loaded, raw_issues, proj_config = load_and_process_project_data(
                     st.session_state.jira_client, 
                     st.session_state.project_key,
-                    user_data
+                    user_data,
+                    consumers=RADAR_CONSUMERS,
+                    store_revision=get_project_store_revision(st.session_state.jira_client, st.session_state.project_key)
                 )
 
                 # 3. Use o df_loaded como o seu dataframe
@@ -412,6 +418,7 @@ with st.expander("Carregar Dados do Projeto", expanded=expand_loader):
                 
                 st.session_state['dynamic_df'] = df_loaded 
                 st.session_state['raw_issues_for_fluxo'] = raw_issues
+                st.session_state['loaded_consumers'] = RADAR_CONSUMERS
                 # Salva a configuração TRADUZIDA na sessão
                 st.session_state['processed_project_config'] = proj_config
                 
@@ -436,6 +443,22 @@ with st.expander("Carregar Dados do Projeto", expanded=expand_loader):
 # --- LÓGICA DE ANÁLISE ---
 df = st.session_state.get('dynamic_df') # Este DF agora deve conter TODOS os itens
 current_project_key = st.session_state.get('project_key')
+
+# Dados carregados por outra página (ex.: Meu Dashboard) não trazem prioridade nem comentários: recarrega
+if df is not None and not df.empty and current_project_key and \
+        not set(RADAR_CONSUMERS).issubset(st.session_state.get('loaded_consumers', ())):
+    with st.spinner("A carregar os campos adicionais do radar..."):
+        df, raw_issues, proj_config = load_and_process_project_data(
+            st.session_state.jira_client,
+            current_project_key,
+            find_user(st.session_state['email']),
+            consumers=RADAR_CONSUMERS,
+            store_revision=get_project_store_revision(st.session_state.jira_client, current_project_key)
+        )
+    st.session_state['dynamic_df'] = df
+    st.session_state['raw_issues_for_fluxo'] = raw_issues
+    st.session_state['loaded_consumers'] = RADAR_CONSUMERS
+    st.session_state['processed_project_config'] = proj_config
 all_raw_issues = st.session_state.get('raw_issues_for_fluxo', []) # Este contém TODOS
 
 if df is None or not current_project_key:
@@ -275,11 +275,24 @@ def save_project_config(project_key, config_data):
     get_project_config.clear()
 
 def save_last_project(email, project_key):
-    get_users_collection().update_one(
+    users = get_users_collection()
+    users.update_one(
+        {'email': email},
+        {'$set': {'last_project_key': project_key}, '$pull': {'recent_project_keys': project_key}}
+    )
+    # Lista dos projetos mais recentes (o último primeiro), usada no pré-carregamento após o login
+    users.update_one(
         {'email': email},
-        {'$set': {'last_project_key': project_key}}
+        {'$push': {'recent_project_keys': {'$each': [project_key], '$position': 0, '$slice': RECENT_PROJECTS_LIMIT}}}
     )
 
+def get_recent_projects(user, limit=RECENT_PROJECTS_LIMIT):
+    """Devolve as chaves dos projetos usados recentemente pelo utilizador, do mais recente para o mais antigo."""
+    if not user:
+        return []
+    recent_keys = [user.get('last_project_key')] + list(user.get('recent_project_keys', []))
+    return list(dict.fromkeys(key for key in recent_keys if key))[:limit]
+
 GLOBAL_CONFIG_PATH = Path("global_app_configs.json")
 
 @st.cache_data
@@ -0,0 +1,756 @@
+# tools/fake_jira_server.py
+
+"""
+Servidor Jira falso, local, para testes de carga e medições do `jira_connector`.
+
+Serve os endpoints REST que a aplicação usa, a partir de fixtures sintéticas
+(geradas com semente fixa, logo reprodutíveis) ou gravadas num ficheiro JSON:
+
+    /rest/api/{2,3}/serverInfo, /myself, /field, /status, /project,
+    /project/{chave}, /project/{chave}/statuses, /filter/{id},
+    /search (GET/POST, paginação por startAt), /search/jql (nextPageToken),
+    /search/approximate-count,
+    /changelog/bulkfetch, /issue (criação)
+    /rest/agile/1.0/board, /board/{id}/configuration, /board/{id}/sprint
+
+Permite simular latência, limitar o tamanho de página e injetar respostas
+429 (aleatórias ou por excesso de pedidos por segundo), com `Retry-After`
+e cabeçalhos `X-RateLimit-*` como no Jira Cloud.
+
+Uso:
+    python tools/fake_jira_server.py --port 8089 --issues 5000 --latency-ms 150 --error-rate 0.02
+    python tools/fake_jira_server.py --dump-fixtures fixtures.json   # grava as fixtures sintéticas
+    python tools/fake_jira_server.py --fixtures fixtures.json        # serve fixtures gravadas
+
+Depois, basta ligar a aplicação a `http://127.0.0.1:8089` (qualquer utilizador/token).
+O ficheiro de fixtures tem a estrutura devolvida por `build_synthetic_fixtures`,
+com as issues no formato JSON da API (incluindo `changelog.histories`), pelo que
+respostas reais do Jira podem ser gravadas e servidas da mesma forma.
+
+Só usa a biblioteca padrão.
+"""
+
+import argparse
+import gzip
+import json
+import random
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+JIRA_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.000+0000"
+SPRINT_FIELD_ID = "customfield_10020"
+STORY_POINTS_FIELD_ID = "customfield_10016"
+
+# Fluxo de trabalho sintético: (id, nome, categoria)
+_WORKFLOW = [
+    ("1", "To Do", "new"),
+    ("3", "In Progress", "indeterminate"),
+    ("10001", "In Review", "indeterminate"),
+    ("10002", "Done", "done"),
+]
+_STATUS_CATEGORIES = {
+    "new": {"id": 2, "key": "new", "name": "To Do"},
+    "indeterminate": {"id": 4, "key": "indeterminate", "name": "In Progress"},
+    "done": {"id": 3, "key": "done", "name": "Done"},
+}
+_ISSUE_TYPES = ["Story", "Task", "Bug"]
+_PRIORITIES = ["Highest", "High", "Medium", "Low"]
+_PEOPLE = ["Ana Silva", "Bruno Costa", "Carla Mendes", "Diogo Pereira", "Eva Rocha"]
+
+
+def _format_datetime(value):
+    return value.astimezone(timezone.utc).strftime(JIRA_DATETIME_FORMAT)
+
+
+def _parse_datetime(value):
+    """Lê datas do JSON do Jira ("2024-01-02T10:00:00.000+0000") ou da JQL ("2024/01/02 10:00")."""
+    value = value.strip().strip('"\'')
+    for fmt in (JIRA_DATETIME_FORMAT, "%Y-%m-%dT%H:%M:%S.%f%z", "%Y/%m/%d %H:%M", "%Y-%m-%d %H:%M", "%Y/%m/%d", "%Y-%m-%d"):
+        try:
+            parsed = datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+    return None
+
+
+def _status_json(status_id, name, category):
+    return {"id": status_id, "name": name, "statusCategory": _STATUS_CATEGORIES[category]}
+
+
+def _user_json(display_name):
+    account_id = display_name.lower().replace(" ", ".")
+    return {"accountId": account_id, "displayName": display_name, "emailAddress": f"{account_id}@example.com"}
+
+
+# --- Fixtures Sintéticas ---
+
+def build_synthetic_fixtures(projects=1, issues_per_project=1000, sprints_per_board=12, seed=42, now=None):
+    """
+    Gera um conjunto de dados Jira coerente (projetos, quadros, sprints, filtros,
+    campos, status e issues com changelog), sempre igual para a mesma semente.
+    """
+    rng = random.Random(seed)
+    now = now or datetime(2025, 1, 1, tzinfo=timezone.utc)
+    statuses = [_status_json(status_id, name, category) for status_id, name, category in _WORKFLOW]
+
+    fixtures = {
+        "fields": [
+            {"id": "summary", "name": "Summary", "custom": False, "schema": {"type": "string", "system": "summary"}},
+            {"id": "status", "name": "Status", "custom": False, "schema": {"type": "status", "system": "status"}},
+            {"id": "issuetype", "name": "Issue Type", "custom": False, "schema": {"type": "issuetype", "system": "issuetype"}},
+            {"id": "created", "name": "Created", "custom": False, "schema": {"type": "datetime", "system": "created"}},
+            {"id": "updated", "name": "Updated", "custom": False, "schema": {"type": "datetime", "system": "updated"}},
+            {"id": "resolutiondate", "name": "Resolved", "custom": False, "schema": {"type": "datetime", "system": "resolutiondate"}},
+            {"id": "resolution", "name": "Resolution", "custom": False, "schema": {"type": "resolution", "system": "resolution"}},
+            {"id": "assignee", "name": "Assignee", "custom": False, "schema": {"type": "user", "system": "assignee"}},
+            {"id": "priority", "name": "Priority", "custom": False, "schema": {"type": "priority", "system": "priority"}},
+            {"id": "labels", "name": "Labels", "custom": False, "schema": {"type": "array", "items": "string", "system": "labels"}},
+            {"id": "fixVersions", "name": "Fix versions", "custom": False, "schema": {"type": "array", "items": "version", "system": "fixVersions"}},
+            {"id": "parent", "name": "Parent", "custom": False, "schema": {"type": "issuelink", "system": "parent"}},
+            {"id": "timespent", "name": "Time Spent", "custom": False, "schema": {"type": "number", "system": "timespent"}},
+            {"id": "duedate", "name": "Due date", "custom": False, "schema": {"type": "date", "system": "duedate"}},
+            {"id": "description", "name": "Description", "custom": False, "schema": {"type": "string", "system": "description"}},
+            {"id": "comment", "name": "Comment", "custom": False, "schema": {"type": "comments-page", "system": "comment"}},
+            {"id": SPRINT_FIELD_ID, "name": "Sprint", "custom": True,
+             "schema": {"type": "array", "items": "json", "custom": "com.pyxis.greenhopper.jira:gh-sprint", "customId": 10020}},
+            {"id": STORY_POINTS_FIELD_ID, "name": "Story point estimate", "custom": True,
+             "schema": {"type": "number", "custom": "com.atlassian.jira.plugin.system.customfieldtypes:float", "customId": 10016}},
+        ],
+        "statuses": statuses,
+        "projects": [],
+        "boards": [],
+        "sprints": {},
+        "filters": {},
+        "issues": [],
+    }
+
+    next_issue_id, next_sprint_id = 10000, 1
+    for project_index in range(projects):
+        project_key = f"P{project_index + 1}" if projects > 1 else "PROJ"
+        project_id = str(10000 + project_index)
+        fixtures["projects"].append({"id": project_id, "key": project_key, "name": f"Projeto {project_key}"})
+
+        board_id = project_index + 1
+        filter_id = str(20000 + project_index)
+        fixtures["filters"][filter_id] = {
+            "id": filter_id, "name": f"Quadro {project_key}", "jql": f"project = {project_key} ORDER BY Rank ASC",
+        }
+        fixtures["boards"].append({
+            "id": board_id, "name": f"Quadro {project_key}", "type": "scrum",
+            "location": {"projectId": int(project_id), "projectKey": project_key}, "filterId": filter_id,
+        })
+
+        # Sprints quinzenais terminando em `now`; a última está ativa
+        sprints = []
+        first_sprint_start = now - timedelta(days=14 * sprints_per_board)
+        for index in range(sprints_per_board):
+            start = first_sprint_start + timedelta(days=14 * index)
+            end = start + timedelta(days=14)
+            is_active = index == sprints_per_board - 1
+            sprints.append({
+                "id": next_sprint_id, "name": f"{project_key} Sprint {index + 1}",
+                "state": "active" if is_active else "closed", "originBoardId": board_id,
+                "startDate": _format_datetime(start), "endDate": _format_datetime(end),
+                **({} if is_active else {"completeDate": _format_datetime(end)}),
+                "goal": f"Objetivo da sprint {index + 1}",
+            })
+            next_sprint_id += 1
+        fixtures["sprints"][str(board_id)] = sprints
+
+        span_seconds = int((now - first_sprint_start).total_seconds())
+        for number in range(1, issues_per_project + 1):
+            created = first_sprint_start + timedelta(seconds=rng.randrange(span_seconds))
+            final_step = rng.choices(range(len(_WORKFLOW)), weights=[2, 2, 1, 5])[0]
+            histories, moment = [], created
+            for step in range(1, final_step + 1):
+                moment = min(moment + timedelta(hours=rng.uniform(2, 24 * 6)), now)
+                previous, current = _WORKFLOW[step - 1], _WORKFLOW[step]
+                histories.append({
+                    "id": str(next_issue_id * 10 + step),
+                    "author": _user_json(rng.choice(_PEOPLE)),
+                    "created": _format_datetime(moment),
+                    "items": [{
+                        "field": "status", "fieldtype": "jira", "fieldId": "status",
+                        "from": previous[0], "fromString": previous[1], "to": current[0], "toString": current[1],
+                    }],
+                })
+            histories.reverse() # O Jira devolve o changelog do mais recente para o mais antigo
+
+            status_id, status_name, category = _WORKFLOW[final_step]
+            is_done = category == "done"
+            issue_type = rng.choice(_ISSUE_TYPES)
+            issue_sprints = [sprint for sprint in sprints if sprint["startDate"] <= _format_datetime(moment)][-2:]
+            fixtures["issues"].append({
+                "id": str(next_issue_id),
+                "key": f"{project_key}-{number}",
+                "fields": {
+                    "project": {"id": project_id, "key": project_key, "name": f"Projeto {project_key}"},
+                    "summary": f"Issue sintética {project_key}-{number}",
+                    "status": _status_json(status_id, status_name, category),
+                    "issuetype": {"id": str(_ISSUE_TYPES.index(issue_type) + 1), "name": issue_type},
+                    "priority": {"name": rng.choice(_PRIORITIES)},
+                    "assignee": _user_json(rng.choice(_PEOPLE)) if rng.random() < 0.85 else None,
+                    "reporter": _user_json(rng.choice(_PEOPLE)),
+                    "created": _format_datetime(created),
+                    "updated": _format_datetime(moment),
+                    "resolutiondate": _format_datetime(moment) if is_done else None,
+                    "resolution": {"name": "Done"} if is_done else None,
+                    "labels": rng.sample(["backend", "frontend", "infra", "ux"], k=rng.randrange(3)),
+                    "fixVersions": [],
+                    "timespent": rng.randrange(0, 40) * 1800 if is_done else None,
+                    "duedate": None,
+                    "description": None,
+                    "comment": {"comments": [], "maxResults": 0, "total": 0, "startAt": 0},
+                    SPRINT_FIELD_ID: [
+                        {"id": sprint["id"], "name": sprint["name"], "state": sprint["state"], "boardId": board_id,
+                         "startDate": sprint["startDate"], "endDate": sprint["endDate"]}
+                        for sprint in issue_sprints
+                    ] or None,
+                    STORY_POINTS_FIELD_ID: rng.choice([1, 2, 3, 5, 8, None]),
+                },
+                "changelog": {"startAt": 0, "maxResults": len(histories), "total": len(histories), "histories": histories},
+            })
+            next_issue_id += 1
+
+    # Como no Jira, a ordem padrão é da issue mais recente para a mais antiga
+    fixtures["issues"].sort(key=lambda raw: raw["fields"]["created"], reverse=True)
+    return fixtures
+
+
+# --- Avaliação (simplificada) de JQL ---
+
+_ORDER_BY_RE = re.compile(r"\s+ORDER\s+BY\s+.*$", re.IGNORECASE | re.DOTALL)
+_AND_RE = re.compile(r"\s+AND\s+", re.IGNORECASE)
+_CLAUSE_RE = re.compile(
+    r"^\s*(?P<field>'[^']+'|\"[^\"]+\"|[\w.]+)\s*(?P<op>not\s+in|in|!=|>=|<=|=|>|<|~)\s*(?P<value>.+?)\s*$",
+    re.IGNORECASE,
+)
+
+
+def _unquote(value):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+        return value[1:-1]
+    return value
+
+
+def _parse_values(value):
+    value = value.strip()
+    if value.startswith("(") and value.endswith(")"):
+        return [_unquote(item) for item in value[1:-1].split(",") if item.strip()]
+    return [_unquote(value)]
+
+
+class JqlMatcher:
+    """
+    Avalia as JQL que a aplicação gera: cláusulas ligadas por AND sobre projeto,
+    chave, status, tipo, versão, sprint, quadro, filtro e datas. Cláusulas não
+    suportadas (OR, funções...) são ignoradas e registadas na consola.
+    """
+
+    def __init__(self, jql, data):
+        self.data = data
+        self.clauses = []
+        jql = _ORDER_BY_RE.sub("", jql or "").strip()
+        for clause in filter(None, _AND_RE.split(jql)):
+            # Só com AND, os parênteses de agrupamento não mudam o resultado: removem-se os que sobram
+            clause = clause.strip().lstrip("(")
+            while clause.endswith(")") and clause.count(")") > clause.count("("):
+                clause = clause[:-1].rstrip()
+            match = _CLAUSE_RE.match(clause)
+            if not match or re.search(r"\sOR\s", clause, re.IGNORECASE):
+                print(f"[fake-jira] cláusula JQL ignorada: {clause!r}")
+                continue
+            field = _unquote(match.group("field")).lower()
+            self.clauses.append((field, match.group("op").lower(), _parse_values(match.group("value"))))
+        self._expand_board_and_filter_clauses()
+
+    def _expand_board_and_filter_clauses(self):
+        expanded = []
+        for field, op, values in self.clauses:
+            if field in ("board", "filter") and op == "=":
+                jql = self.data.board_jql(values[0]) if field == "board" else self.data.filter_jql(values[0])
+                if jql is not None:
+                    expanded.extend(JqlMatcher(jql, self.data).clauses)
+                    continue
+            expanded.append((field, op, values))
+        self.clauses = expanded
+
+    def matches(self, raw):
+        return all(self._matches_clause(raw, *clause) for clause in self.clauses)
+
+    def _matches_clause(self, raw, field, op, values):
+        fields = raw.get("fields", {})
+        if field in ("created", "updated", "resolutiondate", "resolved"):
+            actual = _parse_datetime(fields.get("resolutiondate" if field == "resolved" else field) or "")
+            expected = _parse_datetime(values[0])
+            if actual is None or expected is None:
+                return False
+            return {">=": actual >= expected, ">": actual > expected, "<=": actual <= expected,
+                    "<": actual < expected, "=": actual == expected}.get(op, True)
+
+        candidates = self._field_candidates(raw, fields, field)
+        if candidates is None:
+            print(f"[fake-jira] campo JQL não suportado: {field!r}")
+            return True
+        expected = {value.lower() for value in values}
+        found = any(str(candidate).lower() in expected for candidate in candidates)
+        if op in ("=", "in"):
+            return found
+        if op in ("!=", "not in"):
+            return not found
+        return True
+
+    def _field_candidates(self, raw, fields, field):
+        if field == "project":
+            project = fields.get("project") or {}
+            return [project.get("key"), project.get("id"), project.get("name")]
+        if field in ("key", "issuekey"):
+            return [raw.get("key"), raw.get("id")]
+        if field == "id":
+            return [raw.get("id")]
+        if field == "status":
+            status = fields.get("status") or {}
+            return [status.get("name"), status.get("id")]
+        if field == "statuscategory":
+            category = (fields.get("status") or {}).get("statusCategory") or {}
+            return [category.get("key"), category.get("name"), category.get("id")]
+        if field in ("issuetype", "type"):
+            issue_type = fields.get("issuetype") or {}
+            return [issue_type.get("name"), issue_type.get("id")]
+        if field in ("fixversion", "fixversions"):
+            return [value for version in fields.get("fixVersions") or [] for value in (version.get("id"), version.get("name"))]
+        if field == "sprint":
+            return [value for sprint in fields.get(SPRINT_FIELD_ID) or [] for value in (sprint.get("id"), sprint.get("name"))]
+        if field == "assignee":
+            assignee = fields.get("assignee") or {}
+            return [assignee.get("accountId"), assignee.get("displayName")]
+        if field == "labels":
+            return fields.get("labels") or []
+        return None
+
+
+# --- Dados e Respostas ---
+
+class FakeJiraData:
+    """Índices sobre as fixtures e construção das respostas JSON."""
+
+    def __init__(self, fixtures):
+        self.fixtures = fixtures
+        self.issues = fixtures.get("issues", [])
+        self.issues_by_ref = {}
+        for raw in self.issues:
+            self.issues_by_ref[raw["key"]] = raw
+            self.issues_by_ref[str(raw["id"])] = raw
+        self.projects = fixtures.get("projects", [])
+        self.boards = fixtures.get("boards", [])
+        self.filters = fixtures.get("filters", {})
+        self._created_count = 0
+        self._lock = threading.Lock()
+
+    def search(self, jql):
+        matcher = JqlMatcher(jql, self)
+        return [raw for raw in self.issues if matcher.matches(raw)]
+
+    def board_jql(self, board_id):
+        board = next((board for board in self.boards if str(board["id"]) == str(board_id)), None)
+        return self.filter_jql(board.get("filterId")) if board else None
+
+    def filter_jql(self, filter_id):
+        found = self.filters.get(str(filter_id))
+        return found["jql"] if found else None
+
+    def project(self, key_or_id):
+        return next((project for project in self.projects if key_or_id in (project["key"], project["id"])), None)
+
+    def render_issue(self, raw, fields, expand):
+        """Devolve a issue só com os campos pedidos (e o changelog quando `expand` o inclui)."""
+        all_fields = raw.get("fields", {})
+        wanted = set(fields or ["*navigable"])
+        if wanted & {"*all", "*navigable"}:
+            excluded = {name[1:] for name in wanted if name.startswith("-")} # Ex.: ["*all", "-comment"]
+            selected = {name: value for name, value in all_fields.items() if name not in excluded}
+        else:
+            selected = {name: all_fields.get(name) for name in wanted if name in all_fields}
+        rendered = {"expand": "renderedFields,names,schema,changelog", "id": raw["id"], "key": raw["key"],
+                    "self": f"/rest/api/3/issue/{raw['id']}", "fields": selected}
+        if "changelog" in expand:
+            rendered["changelog"] = raw.get("changelog") or {"startAt": 0, "maxResults": 0, "total": 0, "histories": []}
+        return rendered
+
+    def create_issue(self, payload):
+        with self._lock:
+            self._created_count += 1
+            number = self._created_count
+        project_key = (payload.get("fields", {}).get("project") or {}).get("key", "NEW")
+        issue_id = str(900000 + number)
+        return {"id": issue_id, "key": f"{project_key}-N{number}", "self": f"/rest/api/3/issue/{issue_id}"}
+
+
+def _split_list_param(values):
+    items = []
+    for value in values or []:
+        if isinstance(value, list):
+            items.extend(value)
+        else:
+            items.extend(part.strip() for part in str(value).split(",") if part.strip())
+    return items
+
+
+def _epoch_millis(value):
+    parsed = _parse_datetime(value) if isinstance(value, str) else None
+    return int(parsed.timestamp() * 1000) if parsed else value
+
+
+# --- Limitação de Taxa e Injeção de Falhas ---
+
+class FaultInjector:
+    """Latência, 429 aleatórios e limite de pedidos por segundo (janela deslizante de 1s)."""
+
+    def __init__(self, latency_ms=0, jitter_ms=0, error_rate=0.0, rate_limit=0, retry_after=1, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._recent_requests = []
+        self.stats = {"requests": 0, "throttled": 0}
+
+    def delay(self):
+        with self._lock:
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0
+        seconds = max(0.0, (self.latency_ms + jitter) / 1000)
+        if seconds:
+            time.sleep(seconds)
+
+    def check(self):
+        """Devolve `(limitado, cabeçalhos)`: se o pedido deve receber 429 e os cabeçalhos de limite a enviar."""
+        now = time.monotonic()
+        with self._lock:
+            self.stats["requests"] += 1
+            self._recent_requests = [moment for moment in self._recent_requests if now - moment < 1.0]
+            over_limit = self.rate_limit and len(self._recent_requests) >= self.rate_limit
+            injected = self.error_rate and self._rng.random() < self.error_rate
+            if not over_limit:
+                self._recent_requests.append(now)
+            remaining = max(0, self.rate_limit - len(self._recent_requests)) if self.rate_limit else None
+            if over_limit or injected:
+                self.stats["throttled"] += 1
+        headers = {}
+        if self.rate_limit:
+            headers.update({
+                "X-RateLimit-Limit": str(self.rate_limit), "X-RateLimit-FillRate": str(self.rate_limit),
+                "X-RateLimit-Interval-Seconds": "1", "X-RateLimit-Remaining": str(remaining),
+            })
+        if over_limit or injected:
+            headers["Retry-After"] = str(self.retry_after)
+            return True, headers
+        return False, headers
+
+
+# --- Servidor HTTP ---
+
+class FakeJiraHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # Keep-alive, como o Jira
+    server_version = "FakeJira/1.0"
+
+    routes = [
+        ("GET", r"/rest/api/[23]/serverInfo", "server_info"),
+        ("GET", r"/rest/api/[23]/myself", "myself"),
+        ("GET", r"/rest/api/[23]/field", "fields"),
+        ("GET", r"/rest/api/[23]/status", "statuses"),
+        ("GET", r"/rest/api/[23]/project", "projects"),
+        ("GET", r"/rest/api/[23]/project/(?P<project>[^/]+)", "project"),
+        ("GET", r"/rest/api/[23]/project/(?P<project>[^/]+)/statuses", "project_statuses"),
+        ("GET", r"/rest/api/[23]/filter/(?P<filter_id>\d+)", "filter"),
+        ("GET", r"/rest/api/[23]/search", "search"),
+        ("POST", r"/rest/api/[23]/search", "search"),
+        ("GET", r"/rest/api/[23]/search/jql", "enhanced_search"),
+        ("POST", r"/rest/api/[23]/search/jql", "enhanced_search"),
+        ("POST", r"/rest/api/[23]/search/approximate-count", "approximate_count"),
+        ("POST", r"/rest/api/[23]/changelog/bulkfetch", "changelog_bulkfetch"),
+        ("POST", r"/rest/api/[23]/issue", "create_issue"),
+        ("GET", r"/rest/agile/1\.0/board", "boards"),
+        ("GET", r"/rest/agile/1\.0/board/(?P<board_id>\d+)/configuration", "board_configuration"),
+        ("GET", r"/rest/agile/1\.0/board/(?P<board_id>\d+)/sprint", "board_sprints"),
+    ]
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method):
+        url = urlparse(self.path)
+        self.query = {name: values for name, values in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        try:
+            self.body = json.loads(body) if body else {}
+        except ValueError:
+            return self._reply(400, {"errorMessages": ["Corpo JSON inválido."]})
+
+        faults = self.server.faults
+        faults.delay()
+        throttled, rate_headers = faults.check()
+        if throttled:
+            return self._reply(429, {"errorMessages": ["Rate limit exceeded."]}, rate_headers)
+
+        for route_method, pattern, handler_name in self.routes:
+            match = re.fullmatch(pattern, url.path.rstrip("/"))
+            if match and route_method == method:
+                try:
+                    status, payload = getattr(self, f"handle_{handler_name}")(**match.groupdict())
+                except Exception as e:
+                    status, payload = 500, {"errorMessages": [f"Erro no servidor falso: {e}"]}
+                return self._reply(status, payload, rate_headers)
+        self._reply(404, {"errorMessages": [f"Endpoint não suportado: {method} {url.path}"]}, rate_headers)
+
+    def _reply(self, status, payload, headers=None):
+        content = json.dumps(payload).encode("utf-8")
+        response_headers = {"Content-Type": "application/json;charset=UTF-8", **(headers or {})}
+        if "gzip" in self.headers.get("Accept-Encoding", "") and len(content) > 1024:
+            content = gzip.compress(content, compresslevel=5)
+            response_headers["Content-Encoding"] = "gzip"
+        self.send_response(status)
+        for name, value in response_headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    # --- Parâmetros (GET: query string; POST: corpo JSON) ---
+
+    def _param(self, name, default=None):
+        if name in self.body:
+            return self.body[name]
+        values = self.query.get(name)
+        return values[0] if values else default
+
+    def _list_param(self, name):
+        if name in self.body:
+            return _split_list_param([self.body[name]])
+        return _split_list_param(self.query.get(name))
+
+    def _page_size(self, default=50):
+        requested = int(self._param("maxResults", default) or default)
+        return max(1, min(requested, self.server.max_page_size))
+
+    # --- Endpoints ---
+
+    def handle_server_info(self):
+        return 200, {"baseUrl": self.server.base_url, "version": "1001.0.0", "versionNumbers": [1001, 0, 0],
+                     "deploymentType": self.server.deployment_type, "buildNumber": 100000,
+                     "serverTitle": "Fake Jira"}
+
+    def handle_myself(self):
+        return 200, _user_json("Utilizador de Testes")
+
+    def handle_fields(self):
+        return 200, self.server.data.fixtures.get("fields", [])
+
+    def handle_statuses(self):
+        return 200, self.server.data.fixtures.get("statuses", [])
+
+    def handle_projects(self):
+        return 200, self.server.data.projects
+
+    def handle_project(self, project):
+        found = self.server.data.project(project)
+        if not found:
+            return 404, {"errorMessages": [f"Projeto '{project}' não encontrado."]}
+        return 200, found
+
+    def handle_project_statuses(self, project):
+        if not self.server.data.project(project):
+            return 404, {"errorMessages": [f"Projeto '{project}' não encontrado."]}
+        statuses = self.server.data.fixtures.get("statuses", [])
+        return 200, [{"id": str(index + 1), "name": name, "subtask": False, "statuses": statuses}
+                     for index, name in enumerate(_ISSUE_TYPES)]
+
+    def handle_filter(self, filter_id):
+        found = self.server.data.filters.get(filter_id)
+        if not found:
+            return 404, {"errorMessages": [f"Filtro {filter_id} não encontrado."]}
+        return 200, found
+
+    def handle_search(self):
+        data = self.server.data
+        matched = data.search(self._param("jql", ""))
+        start_at = int(self._param("startAt", 0) or 0)
+        max_results = self._page_size()
+        fields, expand = self._list_param("fields"), self._list_param("expand")
+        page = matched[start_at:start_at + max_results]
+        return 200, {"expand": "schema,names", "startAt": start_at, "maxResults": max_results, "total": len(matched),
+                     "issues": [data.render_issue(raw, fields, expand) for raw in page]}
+
+    def handle_enhanced_search(self):
+        data = self.server.data
+        matched = data.search(self._param("jql", ""))
+        start_at = int(self._param("nextPageToken") or 0)
+        max_results = self._page_size()
+        fields, expand = self._list_param("fields") or ["id"], self._list_param("expand")
+        page = matched[start_at:start_at + max_results]
+        response = {"issues": [data.render_issue(raw, fields, expand) for raw in page],
+                    "isLast": start_at + max_results >= len(matched)}
+        if not response["isLast"]:
+            response["nextPageToken"] = str(start_at + max_results)
+        return 200, response
+
+    def handle_approximate_count(self):
+        return 200, {"count": len(self.server.data.search(self._param("jql", "")))}
+
+    def handle_changelog_bulkfetch(self):
+        data = self.server.data
+        refs = self.body.get("issueIdsOrKeys") or []
+        field_ids = set(self.body.get("fieldIds") or [])
+        max_results = max(1, min(int(self.body.get("maxResults") or 1000), 10000))
+        offset = int(self.body.get("nextPageToken") or 0)
+
+        # Paginação pelo número total de históricos do pedido, como no Jira Cloud
+        flattened = []
+        for ref in refs:
+            raw = data.issues_by_ref.get(str(ref))
+            if raw is None:
+                continue
+            for history in (raw.get("changelog") or {}).get("histories", []):
+                items = [item for item in history.get("items", []) if not field_ids or item.get("fieldId", item.get("field")) in field_ids]
+                if items:
+                    flattened.append((raw["id"], {**history, "created": _epoch_millis(history.get("created")), "items": items}))
+
+        page = flattened[offset:offset + max_results]
+        grouped = {}
+        for issue_id, history in page:
+            grouped.setdefault(issue_id, []).append(history)
+        response = {"issueChangeLogs": [{"issueId": issue_id, "changeHistories": histories} for issue_id, histories in grouped.items()]}
+        if offset + max_results < len(flattened):
+            response["nextPageToken"] = str(offset + max_results)
+        return 200, response
+
+    def handle_create_issue(self):
+        return 201, self.server.data.create_issue(self.body)
+
+    def handle_boards(self):
+        boards = self.server.data.boards
+        project = self._param("projectKeyOrId")
+        if project:
+            boards = [board for board in boards if project in (board["location"]["projectKey"], str(board["location"]["projectId"]))]
+        return 200, self._agile_page([{key: value for key, value in board.items() if key != "filterId"} for board in boards])
+
+    def handle_board_configuration(self, board_id):
+        board = next((board for board in self.server.data.boards if str(board["id"]) == board_id), None)
+        if not board:
+            return 404, {"errorMessages": [f"Quadro {board_id} não encontrado."]}
+        return 200, {"id": board["id"], "name": board["name"], "type": board["type"],
+                     "filter": {"id": board["filterId"]},
+                     "columnConfig": {"columns": [{"name": name, "statuses": [{"id": status_id}]} for status_id, name, _ in _WORKFLOW]}}
+
+    def handle_board_sprints(self, board_id):
+        sprints = self.server.data.fixtures.get("sprints", {}).get(board_id, [])
+        states = set(self._list_param("state"))
+        if states:
+            sprints = [sprint for sprint in sprints if sprint["state"] in states]
+        return 200, self._agile_page(sprints)
+
+    def _agile_page(self, values):
+        start_at = int(self._param("startAt", 0) or 0)
+        max_results = self._page_size()
+        page = values[start_at:start_at + max_results]
+        return {"maxResults": max_results, "startAt": start_at, "total": len(values),
+                "isLast": start_at + len(page) >= len(values), "values": page}
+
+
+class FakeJiraServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, fixtures, faults=None, max_page_size=100, deployment_type="Cloud", verbose=False):
+        super().__init__(address, FakeJiraHandler)
+        self.data = FakeJiraData(fixtures)
+        self.faults = faults or FaultInjector()
+        self.max_page_size = max_page_size
+        self.deployment_type = deployment_type
+        self.verbose = verbose
+
+    def handle_error(self, request, client_address):
+        # Clientes que fecham ligações keep-alive não são erros do servidor
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return
+        super().handle_error(request, client_address)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_fake_jira(fixtures=None, host="127.0.0.1", port=0, **options):
+    """Arranca o servidor numa thread em segundo plano (útil em scripts de medição). Devolve o servidor."""
+    faults = options.pop("faults", None) or FaultInjector(**{
+        key: options.pop(key) for key in ("latency_ms", "jitter_ms", "error_rate", "rate_limit", "retry_after", "seed")
+        if key in options
+    })
+    server = FakeJiraServer((host, port), fixtures or build_synthetic_fixtures(), faults=faults, **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor Jira falso para testes de carga do Gauge Metrics.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--fixtures", help="Ficheiro JSON com fixtures gravadas (em vez das sintéticas).")
+    parser.add_argument("--dump-fixtures", help="Grava as fixtures sintéticas neste ficheiro e termina.")
+    parser.add_argument("--projects", type=int, default=1, help="Projetos sintéticos.")
+    parser.add_argument("--issues", type=int, default=1000, help="Issues sintéticas por projeto.")
+    parser.add_argument("--sprints", type=int, default=12, help="Sprints sintéticas por quadro.")
+    parser.add_argument("--seed", type=int, default=42, help="Semente das fixtures e das falhas injetadas.")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Latência adicionada a cada resposta.")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Variação aleatória (±) da latência.")
+    parser.add_argument("--page-size", type=int, default=100, help="Máximo de resultados por página.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probabilidade de responder 429 a um pedido.")
+    parser.add_argument("--rate-limit", type=int, default=0, help="Pedidos por segundo antes de responder 429 (0 = sem limite).")
+    parser.add_argument("--retry-after", type=int, default=1, help="Valor do cabeçalho Retry-After nas respostas 429.")
+    parser.add_argument("--deployment", choices=["Cloud", "Server"], default="Cloud", help="deploymentType anunciado em /serverInfo.")
+    parser.add_argument("--verbose", action="store_true", help="Mostra cada pedido na consola.")
+    args = parser.parse_args()
+
+    if args.fixtures:
+        with open(args.fixtures, encoding="utf-8") as fixtures_file:
+            fixtures = json.load(fixtures_file)
+    else:
+        fixtures = build_synthetic_fixtures(args.projects, args.issues, args.sprints, args.seed)
+
+    if args.dump_fixtures:
+        with open(args.dump_fixtures, "w", encoding="utf-8") as fixtures_file:
+            json.dump(fixtures, fixtures_file, ensure_ascii=False)
+        print(f"Fixtures gravadas em {args.dump_fixtures} ({len(fixtures['issues'])} issues).")
+        return
+
+    faults = FaultInjector(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit, args.retry_after, args.seed)
+    server = FakeJiraServer((args.host, args.port), fixtures, faults=faults, max_page_size=args.page_size,
+                            deployment_type=args.deployment, verbose=args.verbose)
+    print(f"Jira falso em {server.base_url} ({len(fixtures['issues'])} issues). Ctrl+C para terminar.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Pedidos: {faults.stats['requests']}, respostas 429: {faults.stats['throttled']}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# tools/replay_jira_webhooks.py
+
+"""
+Reproduz eventos de webhook do Jira gravados (issue criada, atualizada ou
+apagada), para testar a atualização no sítio do repositório local de issues.
+
+Os eventos podem vir de ficheiros JSON (um evento ou uma lista), JSONL (um
+evento por linha) ou de uma pasta com esses ficheiros (lidos por ordem de nome).
+
+Dois modos:
+
+    # Envia cada evento, assinado, para a API (POST /api/webhooks/jira)
+    python tools/replay_jira_webhooks.py tools/webhook_samples --url http://127.0.0.1:8000/api/webhooks/jira --secret segredo
+
+    # Aplica os eventos diretamente ao repositório SQLite (sem API)
+    python tools/replay_jira_webhooks.py tools/webhook_samples --store .cache/issue_store.sqlite3 --server-url http://127.0.0.1:8089
+
+Com o servidor falso (`tools/fake_jira_server.py`), os exemplos em
+`tools/webhook_samples/` alteram, criam e apagam issues do projeto PROJ.
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import sys
+import urllib.error
+import urllib.parse
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def load_events(paths):
+    """Lê os eventos dos ficheiros/pastas indicados, pela ordem dada."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(
+                os.path.join(path, name) for name in sorted(os.listdir(path))
+                if name.endswith((".json", ".jsonl"))
+            )
+        else:
+            files.append(path)
+
+    events = []
+    for file_path in files:
+        with open(file_path, encoding="utf-8") as events_file:
+            if file_path.endswith(".jsonl"):
+                events.extend(json.loads(line) for line in events_file if line.strip())
+            else:
+                content = json.load(events_file)
+                events.extend(content if isinstance(content, list) else [content])
+    return events
+
+
+def post_event(url, event, secret, server_url=None):
+    """Envia um evento assinado (X-Hub-Signature: sha256=...) para a API. Devolve `(status, resposta)`."""
+    body = json.dumps(event).encode("utf-8")
+    signature = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    if server_url:
+        url = f"{url}{'&' if '?' in url else '?'}{urllib.parse.urlencode({'server_url': server_url})}"
+    request = urllib.request.Request(
+        url, data=body, method="POST",
+        headers={"Content-Type": "application/json", "X-Hub-Signature": f"sha256={signature}"},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.status, json.loads(response.read() or b"null")
+    except urllib.error.HTTPError as e:
+        return e.code, e.read().decode("utf-8", "replace")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reproduz eventos de webhook do Jira gravados.")
+    parser.add_argument("paths", nargs="+", help="Ficheiros .json/.jsonl ou pastas com eventos.")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="Endpoint da API que recebe os webhooks (POST).")
+    target.add_argument("--store", help="Caminho do repositório SQLite a atualizar diretamente.")
+    parser.add_argument("--secret", default=os.environ.get("GAUGE_JIRA_WEBHOOK_SECRET"),
+                        help="Segredo para assinar os eventos (por omissão, GAUGE_JIRA_WEBHOOK_SECRET).")
+    parser.add_argument("--server-url", help="URL do Jira usado pela aplicação, se diferente do 'self' das issues.")
+    args = parser.parse_args()
+
+    events = load_events(args.paths)
+    if args.url and not args.secret:
+        parser.error("--secret (ou GAUGE_JIRA_WEBHOOK_SECRET) é obrigatório com --url.")
+
+    if args.store:
+        from issue_store import get_issue_store
+        from issue_webhooks import WebhookEventError, apply_issue_event
+        store = get_issue_store(args.store)
+
+    failures = 0
+    for event in events:
+        label = f"{event.get('webhookEvent')} {(event.get('issue') or {}).get('key')}"
+        if args.url:
+            status, result = post_event(args.url, event, args.secret, args.server_url)
+            ok = 200 <= status < 300
+        else:
+            try:
+                status, result, ok = "local", apply_issue_event(event, store, args.server_url), True
+            except WebhookEventError as e:
+                status, result, ok = "erro", str(e), False
+        failures += not ok
+        print(f"[{status}] {label}: {result}")
+
+    print(f"{len(events)} eventos reproduzidos, {failures} com erro.")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
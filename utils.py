@@ -27,7 +27,10 @@ import sib_api_v3_sdk
 import io
 import base64
 import requests
-from config import COLOR_THEMES
+from config import (
+    COLOR_THEMES, ISSUE_PROCESSING_PARALLEL_THRESHOLD, ISSUE_PROCESSING_CHUNK_SIZE, ISSUE_PROCESSING_MAX_WORKERS,
+    ISSUE_PROCESSING_TIMEOUT_SECONDS, DATAFRAME_CATEGORY_MAX_UNIQUE_RATIO
+)
 from sklearn.linear_model import LinearRegression
 import html
 from io import BytesIO
@@ -36,7 +39,10 @@ from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib import colors
 from reportlab.lib.units import inch
 import unicodedata
+import time
 from stqdm import stqdm
+import multiprocessing
+import threading
 from typing import Optional, Any, Dict
 try:
     from pymongo import MongoClient
@@ -165,32 +171,90 @@ def save_shared_chart_config(new_config: Dict[str, Any]):
     except Exception as e:
         st.error(f"Erro ao salvar a configuração compartilhada no MongoDB: {e}")
 
-@st.cache_data(ttl=900, show_spinner=False)
-def load_and_process_project_data(_jira_client: JIRA, project_key: str, _user_data: dict):
-    # --- 1. Importações Locais ---
-    from jira_connector import get_project_issues, get_jira_statuses, get_jira_fields
-    from metrics_calculator import find_completion_date, calculate_cycle_time, calculate_time_in_status, filter_ignored_issues
-    
-    user_data = _user_data
-    
+_MANDATORY_JIRA_FIELDS = [
+    'Issue Type', 'Status', 'Created', 'Summary', 'Resolution', 'Assignee'
+]
+
+_STANDARD_FIELD_ID_TO_ATTRIBUTE_MAP = {
+    'Summary': 'summary', 'Issue Type': 'issuetype', 'Status': 'status', 'Priority': 'priority',
+    'Resolution': 'resolution', 'Assignee': 'assignee', 'Reporter': 'reporter', 'Creator': 'creator',
+    'Created': 'created', 'Updated': 'updated', 'DueDate': 'duedate', 'Components': 'components',
+    'Affects Versions': 'versions', 'Fix Versions': 'fixVersions', 'Labels': 'labels',
+    'Description': 'description', 'Environment': 'environment', 'Security Level': 'security',
+    'Time Spent': 'timespent', 'Time Estimate': 'timeestimate', 'Original Estimate': 'timeoriginalestimate',
+    'StatusCategory': 'statuscategory', 'Parent': 'parent',
+}
+
+_PROCESSED_BY_DEFAULT = {'ID', 'Issue', 'Tipo de Issue', 'Status', 'Data de Criação',
+                         'Data de Conclusão', 'Lead Time (dias)', 'Cycle Time (dias)'}
+
+def _normalize_jira_field_type(raw_type):
+    normalized = str(raw_type or '').strip().lower()
+    if normalized in {'number', 'float', 'integer', 'int', 'double', 'long', 'short', 'decimal', 'numeric'}:
+        return 'Numérico'
+    if normalized in {'date', 'datetime'}:
+        return 'Data'
+    if normalized in {'hours', 'horas'}:
+        return 'Horas'
+    return 'Texto'
+
+def _extract_value(raw_value, field_identifier_for_debug=""):
+    if raw_value is None: return None
+    try:
+        if isinstance(raw_value, (int, float, bool)): return raw_value
+        if isinstance(raw_value, str) and raw_value.isdigit():
+            try: return int(raw_value)
+            except ValueError: pass
+        if isinstance(raw_value, str):
+            try:
+                numeric_value = pd.to_numeric(raw_value.replace(',', '.'), errors='raise')
+                return numeric_value.item() if hasattr(numeric_value, 'item') else numeric_value
+            except Exception:
+                pass
+        if isinstance(raw_value, dict):
+            # Objeto JSON da API (utilizador, status, opção...), na mesma ordem dos atributos
+            for key in ('displayName', 'name', 'value', 'key'):
+                if key in raw_value: return raw_value[key]
+            return str(raw_value)
+        if hasattr(raw_value, 'displayName'): return raw_value.displayName
+        if hasattr(raw_value, 'name'): return raw_value.name 
+        if hasattr(raw_value, 'value'): return raw_value.value 
+        if isinstance(raw_value, str):
+            try:
+                dt_obj = pd.to_datetime(raw_value).tz_localize(None).normalize()
+                if dt_obj.hour == 0 and dt_obj.minute == 0 and dt_obj.second == 0: return dt_obj.date()
+                return dt_obj
+            except (ValueError, TypeError): pass
+        if isinstance(raw_value, list):
+            extracted_items = []
+            for item in raw_value:
+                if isinstance(item, dict):
+                    item_value = item.get('name') or item.get('value') or item.get('displayName')
+                    if item_value: extracted_items.append(item_value)
+                elif hasattr(item, 'name'): extracted_items.append(item.name)
+                elif hasattr(item, 'value'): extracted_items.append(item.value)
+                elif hasattr(item, 'displayName'): extracted_items.append(item.displayName)
+                elif isinstance(item, str): extracted_items.append(item)
+            return ', '.join(filter(None, extracted_items)) if extracted_items else None
+        return str(raw_value)
+    except Exception:
+        return None 
+
+def _build_processing_context(_jira_client, project_key, user_data, consumers):
     """
-    Carrega, processa e enriquece os dados de um projeto Jira.
+    Reúne tudo o que o processamento das issues precisa e que não depende delas
+    (configuração do projeto, campos habilitados, mapeamentos, status...).
     """
-    # --- 2. Inicialização de Variáveis ---
+    from jira_connector import get_jira_statuses, get_jira_fields
+    from jira_metadata import get_jira_metadata
+
     project_config = get_project_config(project_key) or {}
     estimation_config = project_config.get('estimation_field', {})
     timespent_config = project_config.get('timespent_field', {})
-    
-    estimation_field_id = estimation_config.get('id') if estimation_config else None
-    timespent_field_id = timespent_config.get('id') if timespent_config else None
-
-    MANDATORY_JIRA_FIELDS = [
-        'Issue Type', 'Status', 'Created', 'Summary', 'Resolution', 'Assignee'
-    ]
 
     # Combina campos padrão habilitados + obrigatórios
     user_enabled_standard_fields_ids = list(
-        set(user_data.get('standard_fields', []) + MANDATORY_JIRA_FIELDS)
+        set(user_data.get('standard_fields', []) + _MANDATORY_JIRA_FIELDS)
     )
     
     # --- CORREÇÃO CRÍTICA: Ler Nomes E IDs dos campos customizados ---
@@ -205,16 +269,17 @@ def load_and_process_project_data(_jira_client: JIRA, project_key: str, _user_da
         for field in all_jira_fields
         if isinstance(field, dict) and field.get('id', '').startswith('customfield_')
     }
-
-    def normalize_jira_field_type(raw_type):
-        normalized = str(raw_type or '').strip().lower()
-        if normalized in {'number', 'float', 'integer', 'int', 'double', 'long', 'short', 'decimal', 'numeric'}:
-            return 'Numérico'
-        if normalized in {'date', 'datetime'}:
-            return 'Data'
-        if normalized in {'hours', 'horas'}:
-            return 'Horas'
-        return 'Texto'
+    # Extrator de cada campo, escolhido uma vez pelo tipo configurado ou pelo esquema do Jira
+    configured_field_types_by_id = {
+        f['id']: _normalize_jira_field_type(f['type'])
+        for f in global_configs.get('custom_fields', [])
+        if isinstance(f, dict) and f.get('id') and f.get('type')
+    }
+    field_extractors = {
+        field['id']: _field_extractor(field.get('schema'), configured_field_types_by_id.get(field['id']))
+        for field in all_jira_fields
+        if isinstance(field, dict) and field.get('id')
+    }
 
     if 'project_name' not in st.session_state or not st.session_state.project_name:
         try: 
@@ -223,15 +288,6 @@ def load_and_process_project_data(_jira_client: JIRA, project_key: str, _user_da
         except Exception: 
             st.session_state.project_name = project_key
 
-    with st.spinner(f"A carregar issues do projeto '{st.session_state.project_name}'..."):
-        # Agora passamos explicitamente os IDs dos campos customizados para o conector
-        raw_issues_list = get_project_issues(
-            _jira_client, 
-            project_key, 
-            standard_fields=user_enabled_standard_fields_ids,
-            custom_fields=user_enabled_custom_field_ids
-        )
-        
     # --- Tradutor de Status (Mantido) ---
     if 'status_category_mapping' in project_config and 'status_mapping' not in project_config:
         try:
@@ -252,14 +308,11 @@ def load_and_process_project_data(_jira_client: JIRA, project_key: str, _user_da
             project_config['status_mapping'] = new_status_mapping
         except Exception as e: st.error(f"Erro ao traduzir categorias de status: {e}")
 
-    issues = filter_ignored_issues(raw_issues_list, project_config)
-    if not issues: return pd.DataFrame(), [], project_config
-
     # --- CORREÇÃO CRÍTICA: Mapeamento de Campos por ID ---
     # Isto garante que o 'customfield_10276' ganhe o nome 'Nível de Atendimento'
     all_custom_field_id_to_name_map = { f['id']: f['name'] for f in global_configs.get('custom_fields', []) if isinstance(f, dict) and 'id' in f and 'name' in f }
     all_custom_field_name_to_type_map = {
-        f['name']: normalize_jira_field_type(f.get('type') or all_jira_custom_field_types_by_id.get(f.get('id')))
+        f['name']: _normalize_jira_field_type(f.get('type') or all_jira_custom_field_types_by_id.get(f.get('id')))
         for f in global_configs.get('custom_fields', [])
         if isinstance(f, dict) and 'name' in f
     }
@@ -279,141 +332,313 @@ def load_and_process_project_data(_jira_client: JIRA, project_key: str, _user_da
             if found_id:
                 user_custom_field_name_to_id_map[name] = found_id
 
-    strategic_field_id = next((fid for fid, fname in all_custom_field_id_to_name_map.items() if fname == strategic_field_name), None)
-
-    standard_field_id_to_attribute_map = {
-        'Summary': 'summary', 'Issue Type': 'issuetype', 'Status': 'status', 'Priority': 'priority',
-        'Resolution': 'resolution', 'Assignee': 'assignee', 'Reporter': 'reporter', 'Creator': 'creator',
-        'Created': 'created', 'Updated': 'updated', 'DueDate': 'duedate', 'Components': 'components',
-        'Affects Versions': 'versions', 'Fix Versions': 'fixVersions', 'Labels': 'labels',
-        'Description': 'description', 'Environment': 'environment', 'Security Level': 'security',
-        'Time Spent': 'timespent', 'Time Estimate': 'timeestimate', 'Original Estimate': 'timeoriginalestimate',
-        'StatusCategory': 'statuscategory', 'Parent': 'parent',
-    }
-
-    def extract_value(raw_value, field_identifier_for_debug=""):
-        if raw_value is None: return None
-        try:
-            if isinstance(raw_value, (int, float, bool)): return raw_value
-            if isinstance(raw_value, str) and raw_value.isdigit():
-                try: return int(raw_value)
-                except ValueError: pass
-            if isinstance(raw_value, str):
-                try:
-                    numeric_value = pd.to_numeric(raw_value.replace(',', '.'), errors='raise')
-                    return numeric_value.item() if hasattr(numeric_value, 'item') else numeric_value
-                except Exception:
-                    pass
-            if hasattr(raw_value, 'displayName'): return raw_value.displayName
-            if hasattr(raw_value, 'name'): return raw_value.name 
-            if hasattr(raw_value, 'value'): return raw_value.value 
-            if isinstance(raw_value, str):
-                try:
-                    dt_obj = pd.to_datetime(raw_value).tz_localize(None).normalize()
-                    if dt_obj.hour == 0 and dt_obj.minute == 0 and dt_obj.second == 0: return dt_obj.date()
-                    return dt_obj
-                except (ValueError, TypeError): pass
-            if isinstance(raw_value, list):
-                extracted_items = []
-                for item in raw_value:
-                    if hasattr(item, 'name'): extracted_items.append(item.name)
-                    elif hasattr(item, 'value'): extracted_items.append(item.value)
-                    elif hasattr(item, 'displayName'): extracted_items.append(item.displayName)
-                    elif isinstance(item, str): extracted_items.append(item)
-                return ', '.join(filter(None, extracted_items)) if extracted_items else None
-            return str(raw_value)
-        except Exception:
-            return None 
-
-    processed_issues_data = []
-    
     should_calc_time_in_status = project_config.get('calculate_time_in_status', False)
     all_project_statuses = []
     if should_calc_time_in_status:
-        try: all_project_statuses = list(set([s.name for s in _jira_client.project_statuses(project_key)]))
+        metadata = get_jira_metadata(_jira_client)
+        try: all_project_statuses = list(set([s['name'] for s in metadata.project_statuses(project_key)]))
         except Exception:
-            try: all_project_statuses = list(set([s.name for s in _jira_client.statuses()]))
+            try: all_project_statuses = list(set([s.name for s in metadata.statuses()]))
             except Exception: pass
 
-    processed_by_default = {'ID', 'Issue', 'Tipo de Issue', 'Status', 'Data de Criação',
-                             'Data de Conclusão', 'Lead Time (dias)', 'Cycle Time (dias)'}
-
-    for issue in stqdm(issues, desc="A processar issues"):
-        fields = issue.fields
-        issue_data = {
-            'ID': issue.key,
-            'Issue': getattr(fields, 'summary', None),
-            'Tipo de Issue': extract_value(getattr(fields, 'issuetype', None), f"{issue.key}-TipoIssue"),
-            'Status': extract_value(getattr(fields, 'status', None), f"{issue.key}-Status"),
-            'Data de Criação': extract_value(getattr(fields, 'created', None), f"{issue.key}-DataCriacao"),
-        }
-        
-        completion_date_raw = find_completion_date(issue, project_config)
-        completion_date_dt = pd.to_datetime(completion_date_raw, errors='coerce')
-        issue_data['Data de Conclusão'] = completion_date_dt.tz_localize(None).normalize() if pd.notna(completion_date_dt) else pd.NaT
-        
-        try:
-            dt_conclusao_ts = pd.to_datetime(issue_data.get('Data de Conclusão'), errors='coerce')
-            dt_criacao_ts = pd.to_datetime(issue_data.get('Data de Criação'), errors='coerce')
-
-            if pd.notna(dt_conclusao_ts) and pd.notna(dt_criacao_ts):
-                issue_data['Lead Time (dias)'] = (dt_conclusao_ts - dt_criacao_ts).days
-            else:
-                issue_data['Lead Time (dias)'] = None
-        except Exception:
-            issue_data['Lead Time (dias)'] = None
-            
-        issue_data['Cycle Time (dias)'] = calculate_cycle_time(issue, completion_date_raw, project_config)
-
-        # Processamento de Campos Padrão
-        for field_id in user_enabled_standard_fields_ids:
-            if field_id in processed_by_default or field_id in [estimation_field_id, timespent_field_id]:
-                continue
-
-            attribute_name = standard_field_id_to_attribute_map.get(field_id)
-            if attribute_name:
-                try:
-                    if field_id == 'StatusCategory':
-                        raw_value = getattr(getattr(fields, 'status', None), 'statusCategory', None)
-                    else:
-                        raw_value = getattr(fields, attribute_name, None)
-                    issue_data[field_id] = extract_value(raw_value, f"{issue.key}-{field_id}") 
-                except Exception:
-                    issue_data[field_id] = None
-            else:
-                try:
-                    # CORREÇÃO: Usa None em vez de 'NÃO ENCONTRADO'
-                    raw_value = getattr(fields, field_id, None)
-                    issue_data[field_id] = extract_value(raw_value, f"{issue.key}-{field_id}")
-                except Exception:
-                    issue_data[field_id] = None
-
-        # Processamento de Campos Customizados
-        for field_name, field_id in user_custom_field_name_to_id_map.items():
-            try:
-                # CORREÇÃO: Usa None em vez de 'NÃO ENCONTRADO'
-                raw_value = getattr(fields, field_id, None)
-                issue_data[field_name] = extract_value(raw_value, f"{issue.key}-{field_name}({field_id})")
-            except Exception:
-                issue_data[field_name] = None
-
-        if strategic_field_name and strategic_field_id:
-                if strategic_field_name not in issue_data:
-                    raw_value = getattr(fields, strategic_field_id, None)
-                    issue_data[strategic_field_name] = extract_value(raw_value, f"{issue.key}-{strategic_field_name}")
+    return {
+        'consumers': tuple(dict.fromkeys(('dashboard',) + tuple(consumers or ()))),
+        'project_config': project_config,
+        'estimation_field_id': estimation_config.get('id') if estimation_config else None,
+        'estimation_name': estimation_config.get('name') if estimation_config else None,
+        'timespent_field_id': timespent_config.get('id') if timespent_config else None,
+        'timespent_name': timespent_config.get('name') if timespent_config else None,
+        'standard_field_ids': user_enabled_standard_fields_ids,
+        'custom_field_ids': user_enabled_custom_field_ids,
+        'custom_field_name_to_id': user_custom_field_name_to_id_map,
+        'custom_field_name_to_type': all_custom_field_name_to_type_map,
+        'field_extractors': field_extractors,
+        'strategic_field_name': strategic_field_name,
+        'strategic_field_id': next((fid for fid, fname in all_custom_field_id_to_name_map.items() if fname == strategic_field_name), None),
+        'should_calc_time_in_status': should_calc_time_in_status,
+        'all_project_statuses': all_project_statuses,
+    }
 
-        if should_calc_time_in_status and all_project_statuses:
-            time_in_status_data = calculate_time_in_status(issue, all_project_statuses, issue_data['Data de Conclusão'])
-            for status_name, time_days in time_in_status_data.items():
-                issue_data[f'Tempo em: {status_name}'] = time_days
+# Datas ISO do Jira ('2024-03-05T10:22:33.123-0300' ou '2024-03-05') e números simples ('12', '-3', '2,5', '1e3')
+_ISO_DATE_RE = re.compile(r'^(\d{4})-(\d{2})-(\d{2})(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?)?$')
+_PLAIN_NUMBER_RE = re.compile(r'^[+-]?(?:\d+(?:[.,]\d*)?|[.,]\d+)(?:[eE][+-]?\d+)?$')
+_WORD_RE = re.compile(r'[^\W\d_]+')
+
+def _date_parser_words():
+    """Palavras que `pd.to_datetime` (via dateutil) ou `pd.to_numeric` podem aceitar num texto."""
+    from dateutil.parser import parserinfo
+    info = parserinfo()
+    words = {'now', 'today', 'nat', 'nan', 'inf', 'infinity', 'q', 'e'}
+    for group in (info.JUMP, info.UTCZONE, info.PERTAIN):
+        words.update(word.lower() for word in group)
+    for group in (info.WEEKDAYS, info.MONTHS, info.HMS, info.AMPM):
+        words.update(word.lower() for names in group for word in names)
+    return words
+
+_DATE_PARSER_WORDS = _date_parser_words()
+
+def _may_be_date_or_number(text):
+    """False quando o texto tem uma palavra que nenhum dos parsers aceita (ex.: 'Corrigir login')."""
+    for word in _WORD_RE.findall(text):
+        # Siglas curtas em maiúsculas podem ser fusos horários para o dateutil (ex.: 'BRT')
+        if word.lower() not in _DATE_PARSER_WORDS and not (word.isupper() and len(word) <= 5):
+            return False
+    return True
+
+def _extract_text_value(raw_value, fallback_cache):
+    """`_extract_value` para texto, sem pandas nos casos comuns (números e datas ISO)."""
+    if _PLAIN_NUMBER_RE.match(raw_value) and len(raw_value) < 16:
+        if raw_value.lstrip('+-').isdigit():
+            return int(raw_value)
+        return float(raw_value.replace(',', '.'))
+    match = _ISO_DATE_RE.match(raw_value)
+    if match:
+        # Tal como pd.to_datetime(...).tz_localize(None).normalize(): a data na hora local do texto
+        try: return date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+        except ValueError: pass
+    if not _may_be_date_or_number(raw_value):
+        return raw_value
+    # Texto ambíguo: o caminho original, uma vez por valor distinto da coluna
+    if raw_value not in fallback_cache:
+        fallback_cache[raw_value] = _extract_value(raw_value)
+    return fallback_cache[raw_value]
+
+# --- Extratores por tipo de campo ---
+# Cada coluna é convertida por um extrator escolhido uma vez, pelo esquema do campo
+# no Jira (ou pelo tipo configurado), em vez de adivinhar o tipo valor a valor.
+# Um valor com uma forma inesperada para o tipo segue o caminho genérico.
+
+def _extract_any(raw_value, fallback_cache):
+    """Extrator genérico: o mesmo resultado de `_extract_value`, sem pandas nos casos comuns."""
+    if raw_value is None or isinstance(raw_value, (int, float, bool)):
+        return raw_value
+    if isinstance(raw_value, str):
+        return _extract_text_value(raw_value, fallback_cache)
+    if isinstance(raw_value, dict):
+        return _extract_object(raw_value, fallback_cache)
+    return _extract_value(raw_value)
+
+def _extract_number(raw_value, fallback_cache):
+    if raw_value is None or isinstance(raw_value, (int, float)):
+        return raw_value
+    return _extract_any(raw_value, fallback_cache)
+
+def _extract_date(raw_value, fallback_cache):
+    if isinstance(raw_value, str):
+        match = _ISO_DATE_RE.match(raw_value)
+        if match:
+            try: return date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+            except ValueError: pass
+    return _extract_any(raw_value, fallback_cache)
+
+def _extract_object(raw_value, fallback_cache):
+    """Objeto JSON da API (utilizador, status, opção...): displayName, name, value ou key, por esta ordem."""
+    if isinstance(raw_value, dict):
+        for key in ('displayName', 'name', 'value', 'key'):
+            if key in raw_value: return raw_value[key]
+        return str(raw_value)
+    return _extract_any(raw_value, fallback_cache)
+
+def _extract_array(raw_value, fallback_cache):
+    if isinstance(raw_value, list):
+        return _extract_value(raw_value) # Junta os nomes/valores dos itens com ', '
+    return _extract_any(raw_value, fallback_cache)
+
+def _extract_string(raw_value, fallback_cache):
+    if isinstance(raw_value, str):
+        return raw_value
+    return _extract_any(raw_value, fallback_cache)
+
+_SCHEMA_TYPE_EXTRACTORS = {
+    'number': _extract_number,
+    'date': _extract_date, 'datetime': _extract_date,
+    'string': _extract_string,
+    'array': _extract_array,
+    'option': _extract_object, 'option-with-child': _extract_object, 'user': _extract_object,
+    'status': _extract_object, 'issuetype': _extract_object, 'priority': _extract_object,
+    'resolution': _extract_object, 'securitylevel': _extract_object, 'project': _extract_object,
+    'version': _extract_object, 'component': _extract_object, 'statusCategory': _extract_object,
+}
+_CONFIGURED_TYPE_EXTRACTORS = {'Numérico': _extract_number, 'Horas': _extract_number, 'Data': _extract_date}
+
+def _field_extractor(schema, configured_type=None):
+    """Escolhe o extrator de uma coluna: pelo tipo configurado (Numérico, Horas, Data) ou pelo esquema do Jira."""
+    if configured_type in _CONFIGURED_TYPE_EXTRACTORS:
+        return _CONFIGURED_TYPE_EXTRACTORS[configured_type]
+    return _SCHEMA_TYPE_EXTRACTORS.get((schema or {}).get('type'), _extract_any)
+
+def _extract_column(raw_values, extractor=None):
+    """Converte uma coluna inteira com o extrator indicado (ou o genérico)."""
+    extract = extractor or _extract_any
+    fallback_cache = {}
+    return [extract(raw_value, fallback_cache) for raw_value in raw_values]
+
+def _process_issue_columns(issues, ctx, show_progress=True):
+    """
+    Converte issues (já filtradas) nas colunas do DataFrame do projeto: `{coluna: lista}`.
+
+    Cada campo é recolhido numa só passagem e convertido de uma vez (ver
+    `_extract_column`); as métricas de fluxo (conclusão, Cycle Time, tempo em
+    status) são agrupamentos sobre a tabela de transições destas issues, e o
+    Lead Time é calculado sobre as colunas inteiras. O resultado é o das
+    antigas linhas por issue, com as colunas pela mesma ordem.
+    """
+    from metrics_calculator import calculate_completion_dates, calculate_cycle_times, calculate_time_in_status_matrix
+    from issue_records import get_fields, build_status_transitions
+
+    issues = list(issues)
+    if not issues:
+        return {}
+
+    project_config = ctx['project_config']
+    skipped_field_ids = [ctx['estimation_field_id'], ctx['timespent_field_id']]
+    strategic_field_name, strategic_field_id = ctx['strategic_field_name'], ctx['strategic_field_id']
+    all_project_statuses = ctx['all_project_statuses']
+
+    # Lê diretamente o dicionário 'fields' do JSON (sem navegação por atributos)
+    issue_fields = [get_fields(issue) for issue in issues]
+
+    def field_column(field_id):
+        extractor = ctx['field_extractors'].get(field_id)
+        return _extract_column([fields.get(field_id) for fields in issue_fields], extractor)
+
+    columns = {
+        'ID': [issue.key for issue in issues],
+        'Issue': [fields.get('summary') for fields in issue_fields],
+        'Tipo de Issue': field_column('issuetype'),
+        'Status': field_column('status'),
+        'Data de Criação': field_column('created'),
+    }
 
-        processed_issues_data.append(issue_data)
-        
-    df = pd.DataFrame(processed_issues_data)
+    # Datas de conclusão e Cycle Time (a partir das transições de status, lidas uma só vez)
+    transitions = build_status_transitions(stqdm(issues, desc="A processar issues") if show_progress else issues)
+    completion_dates = calculate_completion_dates(issues, project_config, transitions)
+    cycle_times = calculate_cycle_times(issues, completion_dates, project_config, transitions)
+
+    completion_ts = pd.DatetimeIndex(pd.to_datetime(
+        pd.Series([d.replace(tzinfo=None) if getattr(d, 'tzinfo', None) else d for d in completion_dates], dtype=object),
+        errors='coerce'
+    )).normalize()
+    created_ts = pd.DatetimeIndex(pd.to_datetime(pd.Series(columns['Data de Criação'], dtype=object), errors='coerce'))
+    lead_time_days = (completion_ts - created_ts).days
+
+    columns['Data de Conclusão'] = list(completion_ts)
+    columns['Lead Time (dias)'] = [None if pd.isna(days) else int(days) for days in lead_time_days]
+    columns['Cycle Time (dias)'] = cycle_times
+
+    # Campos Padrão
+    for field_id in ctx['standard_field_ids']:
+        if field_id in _PROCESSED_BY_DEFAULT or field_id in skipped_field_ids:
+            continue
+        if field_id == 'StatusCategory':
+            columns[field_id] = _extract_column(
+                [(fields.get('status') or {}).get('statusCategory') for fields in issue_fields], _extract_object
+            )
+        else:
+            columns[field_id] = field_column(_STANDARD_FIELD_ID_TO_ATTRIBUTE_MAP.get(field_id) or field_id)
+
+    # Campos Customizados
+    for field_name, field_id in ctx['custom_field_name_to_id'].items():
+        columns[field_name] = field_column(field_id)
+
+    if strategic_field_name and strategic_field_id and strategic_field_name not in columns:
+        columns[strategic_field_name] = field_column(strategic_field_id)
+
+    if ctx['should_calc_time_in_status'] and all_project_statuses:
+        time_in_status, statuses = calculate_time_in_status_matrix(issues, all_project_statuses, columns['Data de Conclusão'], transitions)
+        for column_index, status_name in enumerate(statuses):
+            columns[f'Tempo em: {status_name}'] = time_in_status[:, column_index].tolist()
+
+    return columns
+
+def _processing_snapshot(ctx):
+    """Cópia do contexto de processamento para enviar aos processos do pool (só com o necessário da config do projeto)."""
+    project_config = ctx['project_config'] or {}
+    return {**ctx, 'project_config': {'status_mapping': project_config.get('status_mapping', {})}}
+
+def _process_issue_chunk(raw_issues, ctx):
+    """Processa um bloco de issues (JSON da API) num processo do pool. Devolve `{coluna: lista}`."""
+    from issue_records import wrap_raw_issues
+    return _process_issue_columns(wrap_raw_issues(raw_issues), ctx, show_progress=False)
+
+# Pool de processos partilhado por todas as cargas (criado na primeira utilização).
+# Usa 'forkserver': o servidor do Streamlit tem várias threads (buscas, agendador,
+# pré-carregamento) e um fork com threads ativas pode bloquear o processo filho.
+_ISSUE_PROCESSING_POOL = None
+_ISSUE_PROCESSING_POOL_LOCK = threading.Lock()
+
+def _get_issue_processing_pool():
+    global _ISSUE_PROCESSING_POOL
+    with _ISSUE_PROCESSING_POOL_LOCK:
+        if _ISSUE_PROCESSING_POOL is None:
+            if 'forkserver' in multiprocessing.get_all_start_methods():
+                mp_context = multiprocessing.get_context('forkserver')
+                # O servidor importa este módulo uma vez; os processos do pool nascem dele já prontos
+                mp_context.set_forkserver_preload([__name__])
+            else:
+                mp_context = multiprocessing.get_context('spawn') # Windows
+            # multiprocessing.Pool (e não ProcessPoolExecutor): `terminate()` termina os processos presos
+            _ISSUE_PROCESSING_POOL = mp_context.Pool(processes=ISSUE_PROCESSING_MAX_WORKERS)
+        return _ISSUE_PROCESSING_POOL
+
+def _discard_issue_processing_pool(pool):
+    """Termina um pool com processos presos (que nunca terminariam sozinhos); a próxima carga cria outro."""
+    global _ISSUE_PROCESSING_POOL
+    with _ISSUE_PROCESSING_POOL_LOCK:
+        if _ISSUE_PROCESSING_POOL is pool:
+            _ISSUE_PROCESSING_POOL = None
+    pool.terminate()
+
+def _process_project_issues(issues, ctx, show_progress=True):
+    """
+    `_process_issue_columns` para um projeto inteiro, em paralelo quando compensa.
+
+    A partir de `ISSUE_PROCESSING_PARALLEL_THRESHOLD` issues, a lista é dividida em
+    blocos de `ISSUE_PROCESSING_CHUNK_SIZE`, processados num pool de processos com
+    uma cópia do contexto, e as colunas dos blocos são juntadas pela ordem original.
+    Abaixo do limite (ou se o pool falhar ou não responder em
+    `ISSUE_PROCESSING_TIMEOUT_SECONDS`), o processamento é em série.
+    """
+    issues = list(issues)
+    max_workers = ISSUE_PROCESSING_MAX_WORKERS
+    if len(issues) < ISSUE_PROCESSING_PARALLEL_THRESHOLD or (max_workers is not None and max_workers <= 1):
+        return _process_issue_columns(issues, ctx, show_progress)
+
+    chunk_size = max(1, ISSUE_PROCESSING_CHUNK_SIZE)
+    chunks = [[issue.raw for issue in issues[start:start + chunk_size]] for start in range(0, len(issues), chunk_size)]
+    snapshot = _processing_snapshot(ctx)
+    columns = {}
+    pool = None
+    try:
+        pool = _get_issue_processing_pool()
+        deadline = time.monotonic() + ISSUE_PROCESSING_TIMEOUT_SECONDS
+        results = [pool.apply_async(_process_issue_chunk, (chunk, snapshot)) for chunk in chunks]
+        for result in (stqdm(results, total=len(chunks), desc="A processar issues") if show_progress else results):
+            _extend_issue_columns(columns, result.get(timeout=max(0, deadline - time.monotonic())))
+    except Exception as e:
+        if pool is not None and isinstance(e, multiprocessing.TimeoutError):
+            _discard_issue_processing_pool(pool)
+        print(f"AVISO: Falha no processamento paralelo das issues ({e!r}). A processar em série.")
+        return _process_issue_columns(issues, ctx, show_progress)
+    return columns
+
+def _extend_issue_columns(columns, new_columns):
+    """Junta as colunas de mais uma página de issues às já processadas."""
+    for name, values in new_columns.items():
+        columns.setdefault(name, []).extend(values)
+    return columns
+
+def _finalize_project_dataframe(issue_columns, ctx):
+    """Monta o DataFrame final (renomeações, colunas esperadas, tipos) a partir das colunas processadas."""
+    df = pd.DataFrame(issue_columns)
+
+    user_enabled_standard_fields_ids = ctx['standard_field_ids']
+    user_custom_field_name_to_id_map = ctx['custom_field_name_to_id']
+    strategic_field_name = ctx['strategic_field_name']
+    estimation_field_id, estimation_name = ctx['estimation_field_id'], ctx['estimation_name']
+    timespent_field_id, timespent_name = ctx['timespent_field_id'], ctx['timespent_name']
 
     # Renomeações e Limpezas Finais
-    estimation_name = estimation_config.get('name') if estimation_config else None
-    timespent_name = timespent_config.get('name') if timespent_config else None
     rename_map_specific = {}
     ids_to_drop_specific = [] 
 
@@ -440,7 +665,7 @@ def load_and_process_project_data(_jira_client: JIRA, project_key: str, _user_da
     # IMPORTANTE: Usamos os NOMES mapeados, não os IDs
     all_expected_custom_names = list(user_custom_field_name_to_id_map.keys())
     
-    expected_cols_before_rename = set(list(processed_by_default) + all_expected_standard_ids + all_expected_custom_names)
+    expected_cols_before_rename = set(list(_PROCESSED_BY_DEFAULT) + all_expected_standard_ids + all_expected_custom_names)
     
     if strategic_field_name: expected_cols_before_rename.add(strategic_field_name)
     if estimation_field_id: 
@@ -465,14 +690,14 @@ def load_and_process_project_data(_jira_client: JIRA, project_key: str, _user_da
 
     df.rename(columns=rename_map_standard, inplace=True)
 
-    final_expected_col_names = set(list(processed_by_default) +
+    final_expected_col_names = set(list(_PROCESSED_BY_DEFAULT) +
                                      [standard_fields_map.get(fid, fid) for fid in all_expected_standard_ids] + 
                                      all_expected_custom_names)
     if strategic_field_name: final_expected_col_names.add(strategic_field_name)
     if estimation_name: final_expected_col_names.add(estimation_name)
     if timespent_name: final_expected_col_names.add(timespent_name)
-    if should_calc_time_in_status:
-        for status_name in all_project_statuses: final_expected_col_names.add(f'Tempo em: {status_name}')
+    if ctx['should_calc_time_in_status']:
+        for status_name in ctx['all_project_statuses']: final_expected_col_names.add(f'Tempo em: {status_name}')
 
     for col_name in final_expected_col_names:
             if col_name not in df.columns:
@@ -481,7 +706,7 @@ def load_and_process_project_data(_jira_client: JIRA, project_key: str, _user_da
     numeric_custom_columns = [
         field_name
         for field_name in all_expected_custom_names
-        if all_custom_field_name_to_type_map.get(field_name) in ['Numérico', 'Horas'] and field_name in df.columns
+        if ctx['custom_field_name_to_type'].get(field_name) in ['Numérico', 'Horas'] and field_name in df.columns
     ]
     for col_name in numeric_custom_columns:
         df[col_name] = pd.to_numeric(df[col_name], errors='coerce')
@@ -492,7 +717,144 @@ def load_and_process_project_data(_jira_client: JIRA, project_key: str, _user_da
     # Remove duplicados
     df = df.loc[:, ~df.columns.duplicated()]
 
-    return df, issues, project_config
+    return _compact_project_dataframe(df)
+
+def is_text_column(series):
+    """True para colunas de texto/categóricas (object, str ou category), qualquer que seja o tipo guardado."""
+    return (
+        pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+        or isinstance(series.dtype, pd.CategoricalDtype)
+    )
+
+def _compact_project_dataframe(df):
+    """
+    Reduz a memória do DataFrame do projeto (guardado na sessão de cada utilizador).
+
+    - texto com poucos valores distintos (Status, Tipo, Responsável, opções...) -> 'category';
+    - datas (objetos `date`/`datetime`) -> datetime64[ns];
+    - inteiros -> o menor tipo inteiro; decimais -> float32 só quando a conversão é exata.
+
+    Colunas com valores de tipos misturados ficam como estão.
+    """
+    df = df.copy()
+    for col in df.columns:
+        series = df[col]
+        if series.isna().all():
+            continue
+        if pd.api.types.is_bool_dtype(series):
+            continue
+        if pd.api.types.is_integer_dtype(series):
+            df[col] = pd.to_numeric(series, downcast='integer')
+        elif pd.api.types.is_float_dtype(series):
+            compact = series.astype('float32')
+            if (compact.astype('float64') == series)[series.notna()].all():
+                df[col] = compact
+        elif pd.api.types.is_datetime64_any_dtype(series):
+            df[col] = series.astype('datetime64[ns]')
+        elif is_text_column(series):
+            inferred = pd.api.types.infer_dtype(series, skipna=True)
+            if inferred in ('date', 'datetime'):
+                try: df[col] = pd.to_datetime(series).astype('datetime64[ns]')
+                except (ValueError, TypeError, OverflowError): pass # Datas fora do intervalo suportado
+            elif inferred == 'string' and series.nunique() <= DATAFRAME_CATEGORY_MAX_UNIQUE_RATIO * len(series):
+                df[col] = series.astype('category')
+    return df
+
+@st.cache_data(ttl=900, show_spinner=False)
+def load_and_process_project_data(_jira_client: JIRA, project_key: str, _user_data: dict, consumers: tuple = ('dashboard',), store_revision: int = None):
+    """
+    Carrega, processa e enriquece os dados de um projeto Jira.
+
+    `consumers` indica os consumidores de `FIELD_REQUIREMENTS` (jira_connector)
+    da página que pede os dados; o DataFrame base ('dashboard') é sempre incluído.
+    `store_revision` (`get_project_store_revision`) só entra na chave da cache,
+    para que os eventos dos webhooks cheguem às métricas sem esperar pelo TTL.
+    """
+    from jira_connector import get_project_issues
+    from metrics_calculator import filter_ignored_issues
+    from issue_records import compact_issue_records
+
+    ctx = _build_processing_context(_jira_client, project_key, _user_data, consumers)
+    project_config = ctx['project_config']
+
+    with st.spinner(f"A carregar issues do projeto '{st.session_state.project_name}'..."):
+        # Agora passamos explicitamente os IDs dos campos customizados para o conector.
+        # As issues chegam como RawIssue (JSON da API), sem construir jira.Issue.
+        raw_issues_list = get_project_issues(
+            _jira_client, 
+            project_key, 
+            standard_fields=ctx['standard_field_ids'],
+            custom_fields=ctx['custom_field_ids'],
+            issue_format="raw",
+            consumers=ctx['consumers'],
+            store_revision=store_revision
+        )
+
+    issues = filter_ignored_issues(raw_issues_list, project_config)
+    if not issues: return pd.DataFrame(), [], project_config
+
+    df = _finalize_project_dataframe(_process_project_issues(issues, ctx), ctx)
+    # As páginas guardam as issues na sessão: só a forma compacta (ver IssueRecord)
+    return df, compact_issue_records(issues), project_config
+
+def stream_project_data(_jira_client: JIRA, project_key: str, user_data: dict, consumers: tuple = ('dashboard',), min_interval_seconds: float = 1.0):
+    """
+    Versão progressiva de `load_and_process_project_data`.
+
+    Gera `(df, issues, project_config, carregadas, total, concluido)`: enquanto
+    as páginas chegam do Jira, entrega DataFrames provisórios (no máximo um a
+    cada `min_interval_seconds`); a última entrega (`concluido=True`) é igual ao
+    resultado de `load_and_process_project_data`.
+    """
+    from jira_connector import iter_project_issue_pages
+    from metrics_calculator import filter_ignored_issues
+    from issue_records import compact_issue_records
+
+    ctx = _build_processing_context(_jira_client, project_key, user_data, consumers)
+    project_config = ctx['project_config']
+
+    issues, columns = [], {}
+    loaded, total = 0, 0
+    last_yield_at = None # A primeira página é entregue logo
+    pages = iter_project_issue_pages(
+        _jira_client,
+        project_key,
+        standard_fields=ctx['standard_field_ids'],
+        custom_fields=ctx['custom_field_ids'],
+        issue_format="raw",
+        consumers=ctx['consumers']
+    )
+    for page_issues, loaded, total in pages:
+        page_issues = filter_ignored_issues(page_issues, project_config)
+        issues.extend(page_issues)
+        _extend_issue_columns(columns, _process_issue_columns(page_issues, ctx, show_progress=False))
+        throttled = last_yield_at is not None and time.monotonic() - last_yield_at < min_interval_seconds
+        if issues and loaded < total and not throttled:
+            yield _finalize_project_dataframe(columns, ctx), issues, project_config, loaded, total, False
+            last_yield_at = time.monotonic()
+
+    if not issues:
+        yield pd.DataFrame(), [], project_config, loaded, total, True
+        return
+    yield _finalize_project_dataframe(columns, ctx), compact_issue_records(issues), project_config, loaded, total, True
+
+# Consumidores (ver FIELD_REQUIREMENTS) das páginas abertas logo a seguir ao login:
+# Meu Dashboard e Métricas de Fluxo
+_WARMUP_CONSUMER_SETS = (('dashboard',), ('dashboard', 'flow_metrics', 'sla'))
+
+def start_project_warmup(_jira_client: JIRA, user_data: dict, project_keys: list):
+    """
+    Começa a sincronizar em segundo plano as issues dos projetos indicados, com
+    os mesmos campos que `load_and_process_project_data` pedirá para o Meu
+    Dashboard e as Métricas de Fluxo. Não bloqueia a página.
+    """
+    from jira_connector import start_background_warmup
+
+    standard_fields = list(set((user_data or {}).get('standard_fields', []) + _MANDATORY_JIRA_FIELDS))
+    custom_fields = (user_data or {}).get('enabled_custom_field_ids', [])
+    return start_background_warmup(
+        _jira_client, project_keys, standard_fields, custom_fields, consumer_sets=_WARMUP_CONSUMER_SETS
+    )
 
 def apply_filters(df, filters):
     """Aplica uma lista de filtros a um DataFrame de forma segura (VERSÃO CORRIGIDA)."""
@@ -743,6 +1105,7 @@ def should_convert_seconds_to_hours(chart_config: dict, measure_name: str | None
 
 def render_chart(chart_config, df, chart_key):
     """Renderiza um gráfico com base na configuração, com validação robusta e aplicação de tema de cores."""
+    from metrics_calculator import aggregate_time_in_status
     try:
         if not isinstance(chart_config, dict):
             st.error(f"Erro: A configuração deste gráfico é inválida e não pode ser renderizada.")
@@ -801,10 +1164,9 @@ def render_chart(chart_config, df, chart_key):
                 if selected_statuses:
                     cols_to_process = [f'Tempo em: {s}' for s in selected_statuses if f'Tempo em: {s}' in df_chart_filtered.columns]
                     if cols_to_process:
-                        if calc_method == "Soma":
-                            df_chart_filtered[measure] = df_chart_filtered[cols_to_process].sum(axis=1)
-                        else:
-                            df_chart_filtered[measure] = df_chart_filtered[cols_to_process].mean(axis=1)
+                        # Agregação por issue feita diretamente sobre a matriz issues × status
+                        time_in_status = df_chart_filtered[cols_to_process].to_numpy(dtype=float, na_value=np.nan)
+                        df_chart_filtered[measure] = aggregate_time_in_status(time_in_status, calc_method, axis=1)
                     else:
                         st.warning(f"Nenhuma coluna de status válida encontrada para '{measure}'. O gráfico pode ficar vazio.")
                         measure = None
@@ -831,16 +1193,19 @@ def render_chart(chart_config, df, chart_key):
             # Lógica de Agregação (agora usa 'measure' que PODE ser a coluna calculada)
             agg_col = None 
             if measure == "Contagem de Issues":
-                agg_df = df_chart_filtered.groupby(group_by_cols).size().reset_index(name='Contagem')
+                agg_df = df_chart_filtered.groupby(group_by_cols, observed=True).size().reset_index(name='Contagem')
                 agg_col = 'Contagem'
             elif agg == 'Contagem Distinta' and measure in df_chart_filtered.columns:
-                 agg_df = df_chart_filtered.groupby(group_by_cols)[measure].nunique().reset_index()
+                 agg_df = df_chart_filtered.groupby(group_by_cols, observed=True)[measure].nunique().reset_index()
                  agg_col = f"Contagem Distinta de {measure}"
                  agg_df.rename(columns={measure: agg_col}, inplace=True)
             elif measure in df_chart_filtered.columns: # Para medidas numéricas OU a coluna calculada de Tempo Status
                 agg_func_map = {'Soma': 'sum', 'Média': 'mean', 'Contagem': 'count'}
                 agg_name_map = {'Soma': 'Soma de', 'Média': 'Média de', 'Contagem': 'Contagem de'}
                 agg_function = agg_func_map.get(agg, 'sum')
+                if agg and agg.startswith('Percentil'): # Ex.: "Percentil 85" (medidas de Tempo em Status)
+                    agg_function = lambda values: aggregate_time_in_status(values.to_numpy(dtype=float)[:, None], agg, axis=0)[0]
+                    agg_name_map[agg] = f"{agg} de"
 
                 # Garante que a coluna é numérica antes de agregar
                 df_chart_filtered[measure] = pd.to_numeric(df_chart_filtered[measure], errors='coerce')
@@ -851,7 +1216,7 @@ def render_chart(chart_config, df, chart_key):
                      st.warning(f"Não há dados válidos para agregar a medida '{measure}' pela dimensão '{dimension}'.")
                      return
 
-                agg_df = valid_data_df.groupby(group_by_cols)[measure].agg(agg_function).reset_index()
+                agg_df = valid_data_df.groupby(group_by_cols, observed=True)[measure].agg(agg_function).reset_index()
 
                 agg_col = f"{agg_name_map.get(agg, 'Valor de')} {measure}"
                 agg_df.rename(columns={measure: agg_col}, inplace=True)
@@ -1111,7 +1476,7 @@ def render_chart(chart_config, df, chart_key):
                         if size_by and size_by != "Nenhum":
                             agg_dict[size_by] = 'mean'
 
-                        plot_df = plot_df.groupby(grouping_cols, as_index=False, dropna=False).agg(agg_dict)
+                        plot_df = plot_df.groupby(grouping_cols, as_index=False, dropna=False, observed=True).agg(agg_dict)
                         plot_df = plot_df.sort_values(by=period_start_col)
                         unique_periods = (
                             plot_df[[period_start_col, period_label_col]]
@@ -1191,18 +1556,21 @@ def render_chart(chart_config, df, chart_key):
             fig = None
             
             if chart_config.get('source_type') == 'jql':
-                from jira_connector import get_jql_issue_count
+                from jira_connector import get_jql_issue_counts
                 jql_a = chart_config.get('jql_a', '')
                 if not jql_a.strip():
                     st.warning("A Consulta JQL 1 (Valor A) é obrigatória e está vazia."); return
-                val_a = get_jql_issue_count(st.session_state.jira_client, jql_a)
+                jql_b = chart_config.get('jql_b', '')
+                jql_baseline = chart_config.get('jql_baseline', '')
+                # As três contagens seguem juntas (em paralelo e com cache por JQL)
+                jql_counts = get_jql_issue_counts(st.session_state.jira_client, [jql_a, jql_b, jql_baseline])
+                val_a = jql_counts.get(jql_a)
                 if not isinstance(val_a, (int, float)):
                     st.error(f"Erro ao processar a Consulta JQL 1 (Valor A): {val_a}"); return
                 
                 val_b = None
-                jql_b = chart_config.get('jql_b', '')
                 if jql_b.strip():
-                    val_b_raw = get_jql_issue_count(st.session_state.jira_client, jql_b)
+                    val_b_raw = jql_counts.get(jql_b)
                     if isinstance(val_b_raw, (int, float)): val_b = val_b_raw
                 
                 main_value = val_a
@@ -1213,9 +1581,8 @@ def render_chart(chart_config, df, chart_key):
                     elif op == "Subtrair (A - B)": main_value = val_a - val_b
                     elif op == "Multiplicar (A * B)": main_value = val_a * val_b
                 
-                jql_baseline = chart_config.get('jql_baseline', '')
                 if jql_baseline.strip():
-                    baseline_raw = get_jql_issue_count(st.session_state.jira_client, jql_baseline)
+                    baseline_raw = jql_counts.get(jql_baseline)
                     if isinstance(baseline_raw, (int, float)): baseline = baseline_raw
             
             else: 
@@ -1287,7 +1654,8 @@ def render_chart(chart_config, df, chart_key):
                         index=rows,
                         columns=cols or None,
                         aggfunc='size',
-                        fill_value=0
+                        fill_value=0,
+                        observed=True
                     ).reset_index()
                     if 0 in pivot_df.columns:
                         pivot_df = pivot_df.rename(columns={0: values})
@@ -1307,7 +1675,8 @@ def render_chart(chart_config, df, chart_key):
                         values=values,
                         index=rows,
                         columns=cols or None,
-                        aggfunc=agg_map.get(aggfunc, 'sum')
+                        aggfunc=agg_map.get(aggfunc, 'sum'),
+                        observed=True
                     ).reset_index()
 
                 theme_colors = COLOR_THEMES.get(color_theme, COLOR_THEMES[default_theme])
@@ -1337,7 +1706,7 @@ def render_chart(chart_config, df, chart_key):
 
             measure_col_for_plotting = measure
             if measure == "Contagem de Issues":
-                df_chart = df_chart_filtered.groupby(dimension).size().reset_index(name="Contagem de Issues")
+                df_chart = df_chart_filtered.groupby(dimension, observed=True).size().reset_index(name="Contagem de Issues")
                 df_chart = df_chart.sort_values(by=dimension)
                 measure_col_for_plotting = "Contagem de Issues"
             else:
@@ -1407,6 +1776,18 @@ def render_chart(chart_config, df, chart_key):
             st.error(f"**Mensagem:** {e}")
             st.code(traceback.format_exc())
 
+def prefetch_chart_jql_counts(jira_client, charts):
+    """Conta de uma só vez (em paralelo) todas as JQL dos indicadores indicados, deixando-as em cache para o `render_chart`."""
+    from jira_connector import get_jql_issue_counts
+    jqls = [
+        chart.get(key, '')
+        for chart in charts
+        if chart.get('type') == 'indicator' and chart.get('source_type') == 'jql'
+        for key in ('jql_a', 'jql_b', 'jql_baseline')
+    ]
+    if jira_client and any(jql.strip() for jql in jqls):
+        get_jql_issue_counts(jira_client, jqls)
+
 def combined_dimension_ui(df, categorical_cols, date_cols, key_suffix=""):
     st.markdown("###### **Criar Dimensão Combinada**")
     c1, c2 = st.columns(2)
@@ -1764,10 +2145,10 @@ def summarize_chart_data(chart_config, df):
             dimension = chart_config.get('dimension'); measure = chart_config.get('measure'); agg = chart_config.get('agg', 'Soma')
             if not dimension or not measure: return None
             if measure == 'Contagem de Issues':
-                summary_df = df_to_render.groupby(dimension).size().nlargest(5)
+                summary_df = df_to_render.groupby(dimension, observed=True).size().nlargest(5)
                 return f"No gráfico '{title}', a contagem de issues por '{dimension}' revela que os 5 maiores grupos são: {', '.join([f'{idx} ({val})' for idx, val in summary_df.items()])}."
             else:
-                summary_df = df_to_render.groupby(dimension)[measure].agg(agg.lower()).nlargest(5)
+                summary_df = df_to_render.groupby(dimension, observed=True)[measure].agg(agg.lower()).nlargest(5)
                 return f"No gráfico '{title}', a {agg.lower()} de '{measure}' por '{dimension}' revela que os 5 maiores grupos são: {', '.join([f'{idx} ({val:.1f})' for idx, val in summary_df.items()])}."
 
         elif chart_type == 'linha':